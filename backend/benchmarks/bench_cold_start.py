@@ -0,0 +1,112 @@
+# backend/benchmarks/bench_cold_start.py
+"""
+Cold-start cost of the app: import time and time until a worker serves requests.
+
+Each round runs in a fresh interpreter, so nothing is cached in sys.modules:
+
+- import       `import main` (module import only)
+- create_app   `main.create_app()` on top of the import, for trees that have it
+- ready        spawn `uvicorn main:app` and poll `/` until it answers 200
+
+It also lists the slowest top-level imports from `python -X importtime`, which
+is where to look when `import` grows.
+
+Run from backend/:
+    python -m benchmarks.bench_cold_start
+    python -m benchmarks.bench_cold_start --rounds 20 --top 15
+"""
+
+import argparse
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+import httpx
+
+_IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+_IMPORT_SNIPPET = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+_CREATE_SNIPPET = (
+    "import time; t = time.perf_counter(); import main; "
+    "main.create_app() if hasattr(main, 'create_app') else None; print(time.perf_counter() - t)"
+)
+
+
+def _timed_python(snippet: str) -> float:
+    out = subprocess.run([sys.executable, "-c", snippet], capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def time_to_ready(timeout: float = 30.0) -> float:
+    """Seconds from spawning a uvicorn worker until `/` answers 200."""
+    port = _free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/", timeout=0.5).status_code == 200:
+                    return time.perf_counter() - started
+            except httpx.TransportError:
+                pass
+            time.sleep(0.005)
+        raise RuntimeError("uvicorn did not become ready")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def slowest_imports(top: int) -> List[Tuple[str, float]]:
+    """Top-level packages pulled in by `import main`, by cumulative import time."""
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], capture_output=True, text=True)
+    totals: Dict[str, float] = {}
+    for line in out.stderr.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        # Depth 1 = imported directly by main or by the interpreter's own startup
+        if match and len(match.group(3)) == 3:
+            package = match.group(4).split(".")[0]
+            totals[package] = totals.get(package, 0.0) + int(match.group(2)) / 1e6
+    return sorted(totals.items(), key=lambda kv: kv[1], reverse=True)[:top]
+
+
+def _summary(values: List[float]) -> str:
+    return f"median {statistics.median(values) * 1000:7.1f} ms   min {min(values) * 1000:7.1f} ms"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list")
+    args = parser.parse_args()
+
+    env_note = {k: os.environ[k] for k in ("PARSER_STRATEGY",) if k in os.environ}
+    print(f"python {sys.version.split()[0]}; rounds: {args.rounds}; env: {env_note or '-'}")
+    imports = [_timed_python(_IMPORT_SNIPPET) for _ in range(args.rounds)]
+    creates = [_timed_python(_CREATE_SNIPPET) for _ in range(args.rounds)]
+    ready = [time_to_ready() for _ in range(args.rounds)]
+    print(f"{'import':<12}{_summary(imports)}")
+    print(f"{'create_app':<12}{_summary(creates)}")
+    print(f"{'ready':<12}{_summary(ready)}")
+    print("\nslowest imports under `import main` (cumulative):")
+    for package, seconds in slowest_imports(args.top):
+        print(f"  {package:<24}{seconds * 1000:8.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
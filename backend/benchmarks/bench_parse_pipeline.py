@@ -0,0 +1,219 @@
+# backend/benchmarks/bench_parse_pipeline.py
+"""
+Parse-pipeline benchmark with a stored baseline.
+
+Runs every stage of CV parsing over the synthetic corpus (benchmarks.corpus)
+and reports throughput, p50/p99 latency and peak Python memory per stage:
+
+- fitz_extract        PyMuPDF text extraction (utils.pdf_utils._extract_text)
+- extract_sections    main.extract_sections on the extracted text
+- spacy               utils.spacy_parser.parse_cv_with_spacy (skipped if SPACY_MODEL cannot load)
+- e2e_parse_cv        POST /parse-cv through the FastAPI TestClient, parse cache off
+
+Results are compared with benchmarks/baseline.json; the run exits non-zero when
+a stage's p50 grows past --max-slowdown (default 2x) or its peak memory past
+--max-memory-growth (default 1.5x). Baselines are machine-specific: refresh
+them with --save-baseline on the machine that runs the comparison.
+
+Run from backend/:
+    python -m benchmarks.bench_parse_pipeline
+    python -m benchmarks.bench_parse_pipeline --only fitz_extract,extract_sections --rounds 50
+    SPACY_MODEL=blank:en python -m benchmarks.bench_parse_pipeline --save-baseline
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+# Measure parsing, not the cache in front of it, and write nothing to the working directory
+os.environ["PARSE_CACHE_MAX_BYTES"] = "0"
+os.environ["PARSE_CACHE_PATH"] = ""
+os.environ["SEARCH_INDEX_PATH"] = ""
+os.environ["JOBS_DB_PATH"] = ""
+
+from benchmarks.corpus import corpus
+from utils.spacy_parser import SpacyUnavailable
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+WARMUP_ROUNDS = 2
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    index = min(len(sorted_values) - 1, max(0, int(round(q / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def measure(calls: List[Callable[[], object]], rounds: int) -> Dict[str, float]:
+    """Time every call `rounds` times, then take one untimed pass under tracemalloc."""
+    for _ in range(WARMUP_ROUNDS):
+        for call in calls:
+            call()
+
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for call in calls:
+            t0 = time.perf_counter()
+            call()
+            latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - started
+
+    # tracemalloc slows allocation-heavy code down, so it gets its own pass
+    tracemalloc.start()
+    for call in calls:
+        call()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "calls": len(latencies),
+        "throughput_per_s": round(len(latencies) / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 4),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 4),
+        "peak_mem_kib": round(peak / 1024, 1),
+    }
+
+
+def build_benches(pdfs: Dict[str, bytes]) -> Dict[str, Callable[[], List[Callable[[], object]]]]:
+    """Stage name -> factory returning one zero-argument call per corpus document."""
+    from utils.pdf_utils import _extract_text
+
+    texts = {name: _extract_text(pdf)[0] for name, pdf in pdfs.items()}
+
+    def fitz_extract():
+        return [lambda pdf=pdf: _extract_text(pdf) for pdf in pdfs.values()]
+
+    def extract_sections():
+        import main
+
+        return [lambda text=text: main.extract_sections(text) for text in texts.values()]
+
+    def spacy():
+        from utils import spacy_parser
+
+        spacy_parser.warm_up()
+        return [lambda text=text: spacy_parser.parse_cv_with_spacy(text) for text in texts.values()]
+
+    def e2e_parse_cv():
+        from fastapi.testclient import TestClient
+        import main
+
+        # main logs every parsed CV at INFO
+        logging.getLogger().setLevel(logging.WARNING)
+        client = TestClient(main.app)
+        client.__enter__()  # run lifespan startup; the process exits after the benchmark
+
+        def post(name: str, pdf: bytes):
+            response = client.post("/parse-cv", files={"file": (f"{name}.pdf", pdf, "application/pdf")})
+            response.raise_for_status()
+
+        return [lambda name=name, pdf=pdf: post(name, pdf) for name, pdf in pdfs.items()]
+
+    return {
+        "fitz_extract": fitz_extract,
+        "extract_sections": extract_sections,
+        "spacy": spacy,
+        "e2e_parse_cv": e2e_parse_cv,
+    }
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], max_slowdown: float, max_memory_growth: float) -> List[str]:
+    """Return one message per regression against the baseline."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base or "p50_ms" not in result or "p50_ms" not in base:
+            continue
+        if result["p50_ms"] > base["p50_ms"] * max_slowdown:
+            regressions.append(
+                f"{name}: p50 {result['p50_ms']:.3f} ms vs baseline {base['p50_ms']:.3f} ms "
+                f"({result['p50_ms'] / base['p50_ms']:.1f}x, limit {max_slowdown}x)"
+            )
+        # Ignore growth within a few KiB; tiny peaks are mostly interpreter noise
+        if result["peak_mem_kib"] > max(base["peak_mem_kib"] * max_memory_growth, base["peak_mem_kib"] + 64):
+            regressions.append(
+                f"{name}: peak memory {result['peak_mem_kib']:.0f} KiB vs baseline {base['peak_mem_kib']:.0f} KiB "
+                f"(limit {max_memory_growth}x)"
+            )
+    return regressions
+
+
+def print_table(results: Dict[str, Dict], baseline: Dict[str, Dict]) -> None:
+    print(f"{'stage':<18}{'calls':>7}{'ops/s':>11}{'p50 ms':>10}{'p99 ms':>10}{'peak KiB':>10}{'vs base':>9}")
+    for name, r in results.items():
+        if "skipped" in r:
+            print(f"{name:<18}  skipped: {r['skipped']}")
+            continue
+        base = baseline.get(name, {}).get("p50_ms")
+        ratio = f"{r['p50_ms'] / base:.2f}x" if base else "-"
+        print(
+            f"{name:<18}{r['calls']:>7}{r['throughput_per_s']:>11.1f}{r['p50_ms']:>10.3f}"
+            f"{r['p99_ms']:>10.3f}{r['peak_mem_kib']:>10.0f}{ratio:>9}"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=20, help="timed passes over the corpus per stage")
+    parser.add_argument("--only", help="comma-separated stages to run")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="write these results as the new baseline")
+    parser.add_argument("--max-slowdown", type=float, default=2.0)
+    parser.add_argument("--max-memory-growth", type=float, default=1.5)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    pdfs = corpus()
+    benches = build_benches(pdfs)
+    names = args.only.split(",") if args.only else list(benches)
+    unknown = [n for n in names if n not in benches]
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(unknown)}")
+
+    results: Dict[str, Dict] = {}
+    for name in names:
+        try:
+            calls = benches[name]()
+        except (ImportError, OSError, SpacyUnavailable) as e:
+            # e.g. the spaCy model is not installed on this machine
+            results[name] = {"skipped": str(e).splitlines()[0]}
+            continue
+        results[name] = measure(calls, args.rounds)
+
+    baseline: Dict[str, Dict] = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    print(f"corpus: {len(pdfs)} PDFs, {sum(map(len, pdfs.values())) // 1024} KiB; rounds: {args.rounds}")
+    print_table(results, baseline)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        measured = {name: r for name, r in results.items() if "skipped" not in r}
+        with open(args.baseline, "w") as f:
+            json.dump({**baseline, **measured}, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"baseline written to {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline, args.max_slowdown, args.max_memory_growth)
+    if regressions:
+        print("\nREGRESSION against baseline:", file=sys.stderr)
+        for message in regressions:
+            print(f"  {message}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
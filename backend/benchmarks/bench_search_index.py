@@ -0,0 +1,116 @@
+# backend/benchmarks/bench_search_index.py
+"""
+Search-index benchmark at recruiter scale (utils.search_index).
+
+Parses synthetic CVs (benchmarks.corpus text through the section splitter)
+until --sections entries exist (default 100k), then measures:
+
+- bulk indexing     CVs and entries per second through `SearchIndex.index()`
+- incremental       latency of re-indexing one CV into the full index, as
+                    happens after each /parse-cv
+- queries           p50/p95/p99 latency of typical searches, run --rounds times
+
+The synthetic vocabulary is small, so common terms match a large share of the
+index (the worst case for ranking). Every RARE_EVERY-th CV also gets a "Flink"
+project, for the selective queries recruiters mostly run.
+
+Run from backend/:
+    python -m benchmarks.bench_search_index
+    python -m benchmarks.bench_search_index --sections 20000 --rounds 200
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from benchmarks.corpus import cv_text
+from utils.search_index import SearchIndex
+from utils.section_splitter import split_sections
+
+LAYOUTS = ("caps", "titlecase", "dense")
+RARE_EVERY = 500
+RARE_ENTRY = {"title": "Stream processor", "text": "Stream processor | Flink, Kafka\nBuilt windowed aggregations over clickstream events."}
+
+# (label, query, sections, match all terms)
+QUERIES: Tuple[Tuple[str, str, Optional[Sequence[str]], bool], ...] = (
+    ("common term", "kafka", None, True),
+    ("common, projects only", "kafka", ("projects",), True),
+    ("two terms", "kafka redis", None, True),
+    ("phrase", '"reduced latency"', None, True),
+    ("prefix", "migr*", None, True),
+    ("any of three", "flink rust kubernetes", None, False),
+    ("rare term", "flink", None, True),
+    ("rare, projects only", "flink", ("projects",), True),
+    ("no match", "haskell", None, True),
+)
+
+
+def synthetic_cvs(sections: int) -> List[Tuple[str, Dict[str, List[Dict[str, str]]]]]:
+    """(cv_hash, parsed sections) pairs totalling at least `sections` entries."""
+    cvs, total, seed = [], 0, 0
+    while total < sections:
+        parsed = split_sections(cv_text(LAYOUTS[seed % len(LAYOUTS)], 1, seed=seed))
+        if seed % RARE_EVERY == 0:
+            parsed.setdefault("projects", []).append(RARE_ENTRY)
+        cvs.append((f"{seed:064x}", parsed))
+        total += sum(len(items) for items in parsed.values())
+        seed += 1
+    return cvs
+
+
+def _ms(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))] * 1000
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sections", type=int, default=100_000, help="CV entries to index")
+    parser.add_argument("--rounds", type=int, default=100, help="timed runs per query")
+    parser.add_argument("--limit", type=int, default=20, help="results per query")
+    parser.add_argument("--path", help="index file to use (default: a temp file, removed afterwards)")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    cvs = synthetic_cvs(args.sections)
+    entries = sum(len(items) for _, parsed in cvs for items in parsed.values())
+    print(f"corpus: {len(cvs)} CVs, {entries} entries (generated in {time.perf_counter() - started:.1f}s)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.path or os.path.join(tmp, "search_index.sqlite3")
+        index = SearchIndex(path)
+        try:
+            started = time.perf_counter()
+            for cv_hash, parsed in cvs:
+                index.index(cv_hash, f"{cv_hash[-8:]}.pdf", parsed)
+            index.flush()
+            elapsed = time.perf_counter() - started
+            size_mib = sum(os.path.getsize(path + suffix) for suffix in ("", "-wal") if os.path.exists(path + suffix)) / 2**20
+            print(f"bulk index: {elapsed:.1f}s, {len(cvs) / elapsed:.0f} CVs/s, {entries / elapsed:.0f} entries/s, {size_mib:.1f} MiB")
+
+            updates = []
+            for cv_hash, parsed in cvs[:: max(1, len(cvs) // args.rounds)][: args.rounds]:
+                t0 = time.perf_counter()
+                index.index(cv_hash, None, parsed).result()
+                updates.append(time.perf_counter() - t0)
+            print(f"incremental re-index of one CV: p50 {_ms(updates, 50):.2f} ms, p99 {_ms(updates, 99):.2f} ms\n")
+
+            print(f"{'query':<24}{'hits':>6}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+            for label, query, sections, match_all in QUERIES:
+                hits = len(index.search(query, sections, args.limit, 0, match_all))
+                latencies = []
+                for _ in range(args.rounds):
+                    t0 = time.perf_counter()
+                    index.search(query, sections, args.limit, 0, match_all)
+                    latencies.append(time.perf_counter() - t0)
+                print(f"{label:<24}{hits:>6}{_ms(latencies, 50):>9.2f}{_ms(latencies, 95):>9.2f}{_ms(latencies, 99):>9.2f}")
+        finally:
+            index.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
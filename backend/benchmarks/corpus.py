@@ -0,0 +1,114 @@
+# backend/benchmarks/corpus.py
+"""
+Deterministic synthetic CV PDFs for the benchmarks.
+
+Every document is generated from a fixed seed, so two runs (or two machines)
+benchmark byte-identical input. Layouts cover the header styles the parsers
+have to cope with:
+
+- "caps"       upper-case headers in body font ("PROJECTS")
+- "titlecase"  Title Case headers in a larger bold font ("Work Experience")
+- "dense"      caps headers, many short items per section
+- "appendix"   a one-page CV followed by pages of unrelated text
+
+Run from backend/ to write the corpus to disk for manual inspection:
+    python -m benchmarks.corpus /tmp/cv-corpus
+"""
+
+import os
+import random
+import sys
+from typing import Dict, List, Tuple
+
+LAYOUTS = ("caps", "titlecase", "dense", "appendix")
+PAGE_COUNTS = (1, 3, 10)
+
+_HEADERS = {
+    "caps": ("EDUCATION", "PROJECTS", "EXPERIENCE", "SKILLS", "POSITIONS OF RESPONSIBILITY", "ACHIEVEMENTS"),
+    "titlecase": ("Education", "Personal Projects", "Work Experience", "Technical Skills",
+                  "Positions of Responsibility", "Achievements"),
+}
+_TECH = ("Python", "Go", "Rust", "Kafka", "Redis", "React", "FastAPI", "PostgreSQL", "Docker", "Kubernetes")
+_WORDS = ("built", "designed", "scaled", "shipped", "reduced", "latency", "service", "pipeline", "users",
+          "throughput", "tests", "cache", "queue", "api", "dashboard", "migration", "on-call", "costs")
+_ROLES = ("Software Engineer", "Backend Intern", "Data Engineer", "Research Assistant", "SRE")
+_COMPANIES = ("Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries")
+
+LINES_PER_PAGE = 48
+LINE_HEIGHT = 14
+
+
+def _sentence(rng: random.Random, words: int = 10) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(words)).capitalize() + "."
+
+
+def cv_lines(layout: str, pages: int, seed: int = 0) -> List[Tuple[str, str]]:
+    """(style, text) lines of a CV; style is "header", "item" or "body"."""
+    rng = random.Random(f"{layout}:{pages}:{seed}")
+    headers = _HEADERS["titlecase" if layout == "titlecase" else "caps"]
+    target = LINES_PER_PAGE * (1 if layout == "appendix" else pages)
+    items_per_section = 6 if layout == "dense" else 2
+    body_lines = 1 if layout == "dense" else 3
+
+    lines: List[Tuple[str, str]] = [("header", "Jane Doe"), ("body", "jane@example.com | +1 555 0100")]
+    while len(lines) < target:
+        for header in headers:
+            lines.append(("header", header))
+            for _ in range(items_per_section):
+                if "Project" in header or "PROJECT" in header:
+                    lines.append(("item", f"{rng.choice(_TECH)} {rng.choice(_WORDS).title()} | "
+                                          f"{', '.join(rng.sample(_TECH, 3))}"))
+                elif "Experience" in header or "EXPERIENCE" in header:
+                    lines.append(("item", f"{rng.choice(_ROLES)} at {rng.choice(_COMPANIES)}"))
+                else:
+                    lines.append(("item", _sentence(rng, 4)))
+                lines.extend(("body", _sentence(rng)) for _ in range(body_lines))
+                lines.append(("body", ""))
+            if len(lines) >= target:
+                break
+    del lines[target:]
+    if layout == "appendix":
+        lines.extend(("body", f"appendix line {i}: {_sentence(rng)}") for i in range(LINES_PER_PAGE * (pages - 1)))
+    return lines
+
+
+def cv_text(layout: str, pages: int, seed: int = 0) -> str:
+    """Plain text of a synthetic CV, as page.get_text() would roughly return it."""
+    return "\n".join(text for _, text in cv_lines(layout, pages, seed)) + "\n"
+
+
+def cv_pdf(layout: str, pages: int, seed: int = 0) -> bytes:
+    """Render a synthetic CV to PDF bytes."""
+    import fitz
+
+    doc = fitz.open()
+    page = None
+    y = 0
+    for style, text in cv_lines(layout, pages, seed):
+        if page is None or y > LINES_PER_PAGE * LINE_HEIGHT + 50:
+            page = doc.new_page()
+            y = 60
+        if style == "header" and layout == "titlecase":
+            page.insert_text((50, y), text, fontname="hebo", fontsize=13)
+        elif style == "item" and layout == "titlecase":
+            page.insert_text((50, y), text, fontname="hebo", fontsize=10)
+        elif text:
+            page.insert_text((50, y), text, fontname="helv", fontsize=10)
+        y += LINE_HEIGHT
+    data = doc.tobytes(garbage=3, deflate=True, no_new_id=True)
+    doc.close()
+    return data
+
+
+def corpus(page_counts=PAGE_COUNTS, layouts=LAYOUTS, seed: int = 0) -> Dict[str, bytes]:
+    """name -> PDF bytes for every layout/page-count combination."""
+    return {f"{layout}-{pages}p": cv_pdf(layout, pages, seed) for layout in layouts for pages in page_counts}
+
+
+if __name__ == "__main__":
+    out = sys.argv[1] if len(sys.argv) > 1 else "cv-corpus"
+    os.makedirs(out, exist_ok=True)
+    for name, data in corpus().items():
+        with open(os.path.join(out, f"{name}.pdf"), "wb") as f:
+            f.write(data)
+        print(f"{name}.pdf  {len(data)} bytes")
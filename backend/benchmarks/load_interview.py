@@ -0,0 +1,272 @@
+# backend/benchmarks/load_interview.py
+"""
+Capacity test for the AI endpoints against the mock Gemini server.
+
+Starts benchmarks.mock_gemini and one uvicorn worker of the app (pointed at the
+mock through GEMINI_BASE_URL), then ramps the number of concurrent virtual
+users. Each user runs interview sessions (a first question, then follow-up
+turns with session_id + answer) and, with probability --quick-review, a quick
+review of a fresh section. Sections are unique per request so the response
+cache never answers for the upstream.
+
+Per concurrency step it reports throughput, p50/p95/p99 latency, errors,
+event-loop lag of the app (from /metrics), peak in-flight upstream calls and
+the number of upstream connections the app opened (from the mock's /stats),
+degraded answers served while the upstream guard refused calls, and finally
+the highest step that met the latency SLO.
+
+Run from backend/:
+    python -m benchmarks.load_interview
+    python -m benchmarks.load_interview --steps 8,32,128,256 --latency lognormal:1.5,0.6 --rate-429 0.02
+    python -m benchmarks.load_interview --steps 32 --error-rate 1.0 --request-timeout 2
+    python -m benchmarks.load_interview --app-url http://127.0.0.1:5000 --mock-url http://127.0.0.1:8787
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+_SAMPLE_RE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{[^}]*\})?\s+([0-9.eE+\-]+|NaN|\+Inf|-Inf)$')
+
+
+def parse_prometheus(text: str) -> Dict[Tuple[str, str], float]:
+    """(metric name, label string) -> value for every sample in an exposition."""
+    samples = {}
+    for line in text.splitlines():
+        match = _SAMPLE_RE.match(line)
+        if match:
+            samples[(match.group(1), match.group(2) or "")] = float(match.group(3))
+    return samples
+
+
+def histogram_delta(before: Dict, after: Dict, name: str) -> Dict[str, float]:
+    """Mean and approximate p99 (bucket upper bound) of a histogram between two scrapes."""
+    count = after.get((f"{name}_count", ""), 0) - before.get((f"{name}_count", ""), 0)
+    total = after.get((f"{name}_sum", ""), 0) - before.get((f"{name}_sum", ""), 0)
+    if count <= 0:
+        return {"mean": 0.0, "p99": 0.0}
+    buckets = []
+    for (metric, labels), value in after.items():
+        if metric == f"{name}_bucket":
+            bound = float(re.search(r'le="([^"]+)"', labels).group(1))
+            buckets.append((bound, value - before.get((metric, labels), 0)))
+    p99 = next((bound for bound, cumulative in sorted(buckets) if cumulative >= 0.99 * count), float("inf"))
+    return {"mean": total / count, "p99": p99}
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q / 100 * len(sorted_values)))]
+
+
+class Step:
+    """Results of one concurrency step."""
+
+    def __init__(self, users: int):
+        self.users = users
+        self.latencies: List[float] = []
+        self.errors: Dict[str, int] = {}
+        self.sessions = 0
+        self.degraded = 0
+        self.upstream_inflight_peak = 0.0
+
+    def record(self, started: float, status: Optional[int]) -> None:
+        if status == 200:
+            self.latencies.append(time.perf_counter() - started)
+        else:
+            key = str(status or "transport")
+            self.errors[key] = self.errors.get(key, 0) + 1
+
+
+async def _call(client: httpx.AsyncClient, step: Step, path: str, payload: Dict) -> Optional[Dict]:
+    started = time.perf_counter()
+    try:
+        response = await client.post(path, json=payload)
+    except httpx.TransportError:
+        step.record(started, None)
+        return None
+    step.record(started, response.status_code)
+    if response.status_code != 200:
+        return None
+    result = response.json()
+    step.degraded += bool(result.get("degraded"))
+    return result
+
+
+async def virtual_user(client: httpx.AsyncClient, step: Step, deadline: float, turns: int, quick_review: float) -> None:
+    rng = random.Random()
+    while time.perf_counter() < deadline:
+        section = {"title": f"Project {uuid.uuid4().hex[:8]}", "text": f"Built a service handling {rng.randint(1, 10**6)} rps."}
+        if rng.random() < quick_review:
+            await _call(client, step, "/quick-review", section)
+            continue
+        result = await _call(client, step, "/mock-interview", {"section": section, "history": []})
+        if result is None:
+            continue
+        for _ in range(turns - 1):
+            if time.perf_counter() >= deadline:
+                break
+            answer = {"section": section, "session_id": result["session_id"], "answer": "I would shard by user id."}
+            result = await _call(client, step, "/mock-interview", answer)
+            if result is None:
+                break
+        step.sessions += 1
+
+
+async def _poll_inflight(client: httpx.AsyncClient, step: Step, deadline: float) -> None:
+    while time.perf_counter() < deadline:
+        samples = parse_prometheus((await client.get("/metrics")).text)
+        step.upstream_inflight_peak = max(step.upstream_inflight_peak, samples.get(("upstream_ai_inflight", ""), 0))
+        await asyncio.sleep(0.5)
+
+
+async def run_step(
+    app_url: str,
+    mock_url: str,
+    users: int,
+    seconds: float,
+    turns: int,
+    quick_review: float,
+    request_timeout: Optional[float] = None,
+) -> Dict:
+    step = Step(users)
+    limits = httpx.Limits(max_connections=users + 2, max_keepalive_connections=users + 2)
+    headers = {"X-Request-Timeout": f"{request_timeout:g}"} if request_timeout else None
+    async with httpx.AsyncClient(base_url=app_url, timeout=120, limits=limits, headers=headers) as client, \
+            httpx.AsyncClient(base_url=mock_url, timeout=10) as mock:
+        await mock.post("/stats/reset")
+        before = parse_prometheus((await client.get("/metrics")).text)
+        started = time.perf_counter()
+        deadline = started + seconds
+        await asyncio.gather(
+            _poll_inflight(client, step, deadline),
+            *(virtual_user(client, step, deadline, turns, quick_review) for _ in range(users)),
+        )
+        elapsed = time.perf_counter() - started
+        after = parse_prometheus((await client.get("/metrics")).text)
+        upstream = (await mock.get("/stats")).json()
+
+    latencies = sorted(step.latencies)
+    lag = histogram_delta(before, after, "event_loop_lag_seconds")
+    requests = len(latencies) + sum(step.errors.values())
+    return {
+        "users": users,
+        "rps": len(latencies) / elapsed,
+        "sessions": step.sessions,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "error_rate": sum(step.errors.values()) / requests if requests else 0.0,
+        "errors": step.errors,
+        "degraded": step.degraded,
+        "loop_lag_mean": lag["mean"],
+        "loop_lag_p99": lag["p99"],
+        "upstream_inflight_peak": step.upstream_inflight_peak,
+        "upstream_connections": upstream["connections"],
+        "upstream_throttled": upstream["throttled"],
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(url: str, path: str) -> None:
+    for _ in range(150):
+        try:
+            httpx.get(url + path, timeout=1)
+            return
+        except httpx.TransportError:
+            time.sleep(0.1)
+    raise RuntimeError(f"{url} did not come up")
+
+
+def spawn(args) -> Tuple[str, str, List[subprocess.Popen]]:
+    """Start the mock and one app worker; returns their URLs and processes."""
+    mock_port, app_port = _free_port(), _free_port()
+    mock_cmd = [sys.executable, "-m", "benchmarks.mock_gemini", "--port", str(mock_port), "--latency", args.latency,
+                "--error-rate", str(args.error_rate), "--rate-429", str(args.rate_429)]
+    env = {
+        **os.environ,
+        "GEMINI_BASE_URL": f"http://127.0.0.1:{mock_port}/v1beta",
+        "GEMINI_API_KEY": os.getenv("GEMINI_API_KEY", "load-test"),
+        "EVENT_LOOP_LAG_INTERVAL": "0.05",
+        # Keep the job store out of the working directory
+        "JOBS_DB_PATH": "",
+    }
+    if args.gemini_concurrency:
+        env["GEMINI_MAX_CONCURRENCY"] = str(args.gemini_concurrency)
+    app_cmd = [sys.executable, "-m", "uvicorn", "main:app", "--port", str(app_port), "--log-level", "warning"]
+    processes = [subprocess.Popen(mock_cmd), subprocess.Popen(app_cmd, env=env)]
+    mock_url, app_url = f"http://127.0.0.1:{mock_port}", f"http://127.0.0.1:{app_port}"
+    _wait_ready(mock_url, "/stats")
+    _wait_ready(app_url, "/")
+    return app_url, mock_url, processes
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", default="1,8,32,128", help="comma-separated concurrent users per step")
+    parser.add_argument("--step-seconds", type=float, default=15)
+    parser.add_argument("--turns", type=int, default=4, help="interview turns per session")
+    parser.add_argument("--quick-review", type=float, default=0.2, help="fraction of iterations that call /quick-review")
+    parser.add_argument("--slo-p99", type=float, default=5.0, help="p99 seconds a step must stay under")
+    parser.add_argument("--app-url", help="use a running app instead of spawning one (requires --mock-url)")
+    parser.add_argument("--mock-url")
+    parser.add_argument("--latency", default="lognormal:0.8,0.5", help="mock upstream latency spec")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--gemini-concurrency", type=int, help="GEMINI_MAX_CONCURRENCY for the spawned app")
+    parser.add_argument("--request-timeout", type=float, help="X-Request-Timeout seconds sent with every AI request")
+    args = parser.parse_args()
+
+    processes: List[subprocess.Popen] = []
+    if args.app_url:
+        if not args.mock_url:
+            parser.error("--app-url needs --mock-url for upstream stats")
+        app_url, mock_url = args.app_url, args.mock_url
+    else:
+        app_url, mock_url, processes = spawn(args)
+
+    results = []
+    try:
+        print(f"{'users':>6}{'req/s':>9}{'sess':>6}{'p50 s':>8}{'p95 s':>8}{'p99 s':>8}{'err %':>7}"
+              f"{'lag ms':>8}{'lag p99':>9}{'up inflt':>9}{'up conns':>9}{'429s':>6}{'degr':>6}")
+        for users in (int(u) for u in args.steps.split(",")):
+            r = asyncio.run(run_step(
+                app_url, mock_url, users, args.step_seconds, args.turns, args.quick_review, args.request_timeout
+            ))
+            results.append(r)
+            print(f"{r['users']:>6}{r['rps']:>9.1f}{r['sessions']:>6}{r['p50']:>8.2f}{r['p95']:>8.2f}{r['p99']:>8.2f}"
+                  f"{r['error_rate'] * 100:>7.1f}{r['loop_lag_mean'] * 1000:>8.1f}{r['loop_lag_p99'] * 1000:>9.1f}"
+                  f"{r['upstream_inflight_peak']:>9.0f}{r['upstream_connections']:>9}{r['upstream_throttled']:>6}{r['degraded']:>6}")
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+    within_slo = [r for r in results if r["p99"] <= args.slo_p99 and r["error_rate"] < 0.01]
+    if within_slo:
+        best = max(within_slo, key=lambda r: r["users"])
+        print(f"\nOne worker held {best['users']} concurrent users (p99 {best['p99']:.2f}s <= {args.slo_p99}s, "
+              f"{best['rps']:.1f} req/s).")
+    else:
+        print(f"\nNo step met p99 <= {args.slo_p99}s with <1% errors.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+# backend/benchmarks/load_upload_rss.py
+"""
+Peak-memory load test for /parse-cv uploads.
+
+Starts the API under uvicorn in a subprocess, fires N parallel uploads of a
+synthetic PDF padded to the requested size, and samples the resident memory of
+the server process (and of its PDF worker processes) while they run.
+
+Run from backend/:
+    python -m benchmarks.load_upload_rss                    # 50 x 10 MB, spooled to disk
+    python -m benchmarks.load_upload_rss --in-memory        # keep every upload in memory, for comparison
+    python -m benchmarks.load_upload_rss --parallel 20 --size-mb 5
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import httpx
+
+CV_TEXT = (
+    "Jane Doe\n\nEDUCATION\nBSc Computer Science | State University\n\n"
+    "PROJECTS\nChat App | Python, Kafka\nBuilt a chat service\n\n"
+    "EXPERIENCE\nEngineer at Acme\nShipped things\n\nSKILLS\nPython, Go\n"
+)
+
+
+def synthetic_pdf(size_bytes: int) -> bytes:
+    """A one-page CV whose file size is padded with an incompressible attachment."""
+    import fitz
+
+    doc = fitz.open()
+    doc.new_page().insert_text((50, 72), CV_TEXT)
+    doc.embfile_add("padding.bin", os.urandom(size_bytes))
+    return doc.tobytes()
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _rss_kb(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except FileNotFoundError:
+        pass
+    return 0
+
+
+def _children(pid: int):
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(p) for p in f.read().split()]
+    except FileNotFoundError:
+        return []
+
+
+class RssSampler(threading.Thread):
+    """Polls /proc for the peak RSS of a process and of the process plus its children."""
+
+    def __init__(self, pid: int, interval: float = 0.02):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.peak_server_kb = 0
+        self.peak_total_kb = 0
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.is_set():
+            server = _rss_kb(self.pid)
+            total = server + sum(_rss_kb(child) for child in _children(self.pid))
+            self.peak_server_kb = max(self.peak_server_kb, server)
+            self.peak_total_kb = max(self.peak_total_kb, total)
+            time.sleep(self.interval)
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+
+async def _upload(client: httpx.AsyncClient, url: str, payload: bytes) -> int:
+    response = await client.post(url, files={"file": ("cv.pdf", payload, "application/pdf")})
+    return response.status_code
+
+
+async def _fire(url: str, payload: bytes, parallel: int):
+    limits = httpx.Limits(max_connections=parallel)
+    async with httpx.AsyncClient(timeout=300, limits=limits) as client:
+        start = time.perf_counter()
+        statuses = await asyncio.gather(*(_upload(client, url, payload) for _ in range(parallel)))
+        return statuses, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--parallel", type=int, default=50)
+    parser.add_argument("--size-mb", type=float, default=10)
+    parser.add_argument("--in-memory", action="store_true", help="raise UPLOAD_SPOOL_THRESHOLD so nothing is spooled")
+    args = parser.parse_args()
+
+    size = int(args.size_mb * 1024 * 1024)
+    payload = synthetic_pdf(size)
+    port = _free_port()
+    env = {
+        **os.environ,
+        "PDF_MAX_UPLOAD_BYTES": str(len(payload) + 1024 * 1024),
+        # Let every upload through to extraction instead of measuring 503s
+        "PDF_MAX_QUEUE": str(args.parallel),
+        # The parse cache would short-circuit every upload after the first
+        "PARSE_CACHE_MAX_BYTES": "0",
+        # Keep the search index and job store out of the working directory
+        "SEARCH_INDEX_PATH": "",
+        "JOBS_DB_PATH": "",
+    }
+    if args.in_memory:
+        env["UPLOAD_SPOOL_THRESHOLD"] = str(len(payload) + 1)
+
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    try:
+        base = f"http://127.0.0.1:{port}"
+        for _ in range(100):
+            try:
+                httpx.get(base + "/", timeout=1)
+                break
+            except httpx.TransportError:
+                time.sleep(0.1)
+        idle_kb = _rss_kb(server.pid)
+        sampler = RssSampler(server.pid)
+        sampler.start()
+        statuses, elapsed = asyncio.run(_fire(base + "/parse-cv", payload, args.parallel))
+        sampler.stop()
+    finally:
+        server.terminate()
+        server.wait()
+
+    mode = "in-memory" if args.in_memory else "spooled"
+    ok = sum(1 for s in statuses if s == 200)
+    print(f"{args.parallel} x {len(payload) / 1e6:.1f} MB uploads ({mode}): {ok}/{len(statuses)} OK in {elapsed:.1f}s")
+    print(f"  server RSS idle       {idle_kb / 1024:8.1f} MiB")
+    print(f"  server RSS peak       {sampler.peak_server_kb / 1024:8.1f} MiB")
+    print(f"  server+workers peak   {sampler.peak_total_kb / 1024:8.1f} MiB")
+    print(f"  per upload (peak-idle){(sampler.peak_server_kb - idle_kb) / 1024 / args.parallel:8.2f} MiB")
+
+
+if __name__ == "__main__":
+    main()
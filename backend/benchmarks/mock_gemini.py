@@ -0,0 +1,164 @@
+# backend/benchmarks/mock_gemini.py
+"""
+Local stand-in for the Gemini API, for load tests.
+
+Serves `models/{model}:generateContent` and `:streamGenerateContent?alt=sse`
+under /v1beta with a configurable latency distribution, error rate and 429
+rate, and returns text the app can parse (interview JSON, quick-review JSON
+arrays, batched question-bank arrays, plain-text summaries). Point the app at it with
+GEMINI_BASE_URL=http://127.0.0.1:<port>/v1beta and any GEMINI_API_KEY.
+
+Run from backend/:
+    python -m benchmarks.mock_gemini --port 8787 --latency lognormal:0.8,0.5 --rate-429 0.02
+
+Latency specs (seconds): fixed:S, uniform:LO,HI, lognormal:MEDIAN,SIGMA.
+GET /stats reports requests, in-flight peak and distinct client connections;
+POST /stats/reset clears them.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+from typing import Callable, Dict, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """Turn a latency spec into a sampler of delays in seconds."""
+    kind, _, params = spec.partition(":")
+    values = [float(v) for v in params.split(",") if v]
+    if kind == "fixed" and len(values) == 1:
+        return lambda rng: values[0]
+    if kind == "uniform" and len(values) == 2:
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "lognormal" and len(values) == 2:
+        mu = math.log(values[0])
+        return lambda rng: rng.lognormvariate(mu, values[1])
+    raise ValueError(f"Bad latency spec {spec!r}; use fixed:S, uniform:LO,HI or lognormal:MEDIAN,SIGMA")
+
+
+def _reply_text(prompt: str, rng: random.Random) -> str:
+    """Something shaped like what the app asked for."""
+    if "one object per entry" in prompt:
+        entries = len(re.findall(r"^Entry \d+:$", prompt, re.MULTILINE))
+        return json.dumps([
+            {"entry": n, "next_question": f"What was the hardest part of entry {n}?",
+             "points": [f"Key point {i} about entry {n}." for i in range(1, 6)]}
+            for n in range(1, entries + 1)
+        ])
+    if "JSON array of strings" in prompt:
+        return json.dumps([f"Key point {i} about the section." for i in range(1, 6)])
+    if "keeping notes" in prompt:
+        return "Covered design trade-offs and testing; answers were solid but brief."
+    question = f"How would you scale this to {rng.choice((10, 100, 1000))}x the traffic?"
+    if "first open-ended question" in prompt:
+        return json.dumps({"next_question": question})
+    return json.dumps({"feedback": "Good answer; mention concrete numbers.", "next_question": question})
+
+
+def create_mock_app(
+    latency: str = "lognormal:0.8,0.5",
+    error_rate: float = 0.0,
+    rate_429: float = 0.0,
+    retry_after: float = 1.0,
+    stream_chunks: int = 8,
+    seed: Optional[int] = None,
+) -> FastAPI:
+    app = FastAPI(title="Mock Gemini")
+    sample_latency = parse_latency(latency)
+    rng = random.Random(seed)
+    stats: Dict[str, object] = {}
+
+    def reset() -> None:
+        stats.update(requests=0, streams=0, errors=0, throttled=0, inflight=0, max_inflight=0)
+        stats["connections"] = set()
+
+    reset()
+
+    def fault() -> Optional[JSONResponse]:
+        roll = rng.random()
+        if roll < rate_429:
+            stats["throttled"] += 1
+            return JSONResponse({"error": {"code": 429, "status": "RESOURCE_EXHAUSTED"}}, status_code=429,
+                                headers={"Retry-After": f"{retry_after:g}"})
+        if roll < rate_429 + error_rate:
+            stats["errors"] += 1
+            return JSONResponse({"error": {"code": 503, "status": "UNAVAILABLE"}}, status_code=503)
+        return None
+
+    @app.post("/v1beta/models/{target}")
+    async def models(target: str, request: Request):
+        model, _, method = target.partition(":")
+        body = await request.json()
+        prompt = " ".join(
+            part.get("text", "") for content in body.get("contents", []) for part in content.get("parts", [])
+        )
+        stats["requests"] += 1
+        stats["connections"].add(tuple(request.client or ()))
+        stats["inflight"] += 1
+        stats["max_inflight"] = max(stats["max_inflight"], stats["inflight"])
+        streaming = False
+        try:
+            error = fault()
+            if error is not None:
+                await asyncio.sleep(sample_latency(rng) / 10)
+                return error
+            text = _reply_text(prompt, rng)
+            if method == "streamGenerateContent":
+                stats["streams"] += 1
+                streaming = True
+                return StreamingResponse(_stream(text, sample_latency(rng)), media_type="text/event-stream")
+            await asyncio.sleep(sample_latency(rng))
+            return {"candidates": [{"content": {"parts": [{"text": text}], "role": "model"}}], "modelVersion": model}
+        finally:
+            if not streaming:
+                stats["inflight"] -= 1
+
+    async def _stream(text: str, total: float):
+        size = max(1, math.ceil(len(text) / stream_chunks))
+        pieces = [text[i:i + size] for i in range(0, len(text), size)]
+        try:
+            for piece in pieces:
+                await asyncio.sleep(total / len(pieces))
+                chunk = {"candidates": [{"content": {"parts": [{"text": piece}], "role": "model"}}]}
+                yield f"data: {json.dumps(chunk)}\r\n\r\n"
+        finally:
+            stats["inflight"] -= 1
+
+    @app.get("/stats")
+    async def get_stats():
+        return {**stats, "connections": len(stats["connections"])}
+
+    @app.post("/stats/reset")
+    async def reset_stats():
+        reset()
+        return {"reset": True}
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--latency", default="lognormal:0.8,0.5")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of calls answered with 503")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="fraction of calls answered with 429")
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--stream-chunks", type=int, default=8)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    app = create_mock_app(args.latency, args.error_rate, args.rate_429, args.retry_after, args.stream_chunks, args.seed)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
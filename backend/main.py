@@ -3,18 +3,45 @@ backend/main.py
 ----------------
 FastAPI backend for CV parsing, mock interview, and quick review.
 Production-ready with modular parsing, async calls, and error handling.
+
+`create_app()` builds the app; `app` is the instance uvicorn serves
+(`uvicorn main:app`, or `uvicorn main:create_app --factory`). Heavy modules
+(PyMuPDF, numpy, spaCy, httpx) are imported on first use, not at start-up.
 """
 
 import os
 import re
 import json
+import math
+import time
+import asyncio
 import logging
-from typing import List, Dict, Optional
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from contextlib import asynccontextmanager, nullcontext
+from typing import Any, List, Dict, Literal, Optional, Sequence, Tuple, Union, get_args
+from fastapi import APIRouter, FastAPI, HTTPException, UploadFile, File, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
-import httpx
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
 from dotenv import load_dotenv
+from starlette.concurrency import run_in_threadpool
+
+from utils.pdf_utils import get_pdf_extractor, shutdown_pdf_extractor
+from utils.parse_cache import get_parse_cache, close_parse_cache, parse_cache_key_from_digest
+from utils.ai_clients import get_gemini_client, close_gemini_client
+from utils.section_splitter import default_splitter, parse_sections_param, split_sections
+from utils.batch_parse import BatchLimits, collect_batch_pdfs, stream_batch_results
+from utils.response_cache import get_response_cache, close_response_cache, section_fingerprint
+from utils.interview_sessions import InterviewSession, get_session_store, get_history_compactor
+from utils.metrics import MetricsMiddleware, metrics_response_body, stage, start_event_loop_monitor
+from utils.spacy_parser import (
+    PARSER_VERSION as SPACY_PARSER_VERSION, SpacyPipeGroup, SpacyUnavailable, parse_cv_with_spacy, warm_up as warm_up_spacy,
+)
+from utils.uploads import SpooledPdf, UploadLimitMiddleware, max_upload_bytes, spool_upload
+from utils.question_bank import PrecomputeItem, close_question_bank, get_question_bank, precompute_enabled
+from utils.jobs import FINISHED_STATES, JobQueue, close_job_queue, get_job_queue, jobs_enabled
+from utils.encoding import CompressionMiddleware, OrjsonResponse, parse_fields_param, shape_sections
+from utils.upstream_guard import DeadlineMiddleware, UpstreamUnavailable
+from utils.search_index import MAX_RESULTS as SEARCH_MAX_RESULTS, close_search_index, get_search_index
 
 # Load environment variables securely
 load_dotenv()
@@ -23,20 +50,35 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="CV Parsing & Mock Interview API")
-
-# Configure CORS for frontend domains
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=[
-        "http://localhost:5173",
-        "http://localhost:3000",
-        # add production frontend URLs here
-    ],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+router = APIRouter()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    loop_monitor = start_event_loop_monitor()
+    if app.state.parser_strategy == "spacy":
+        # Load the model now rather than on the first upload; a missing one is
+        # logged here and answered with 503 by spacy-mode parses
+        try:
+            await run_in_threadpool(warm_up_spacy)
+        except SpacyUnavailable as e:
+            logger.error(f"spaCy parse mode unavailable: {e}")
+    if jobs_enabled():
+        jobs = get_job_queue()
+        register_job_handlers(jobs)
+        await jobs.start()
+    yield
+    if loop_monitor is not None:
+        loop_monitor.cancel()
+    # Stop job workers before the pools and clients they use
+    await close_job_queue()
+    await close_question_bank()
+    await close_gemini_client()
+    # Release PDF worker processes/threads on shutdown
+    shutdown_pdf_extractor()
+    close_parse_cache()
+    close_response_cache()
+    # Waits for queued index writes
+    close_search_index()
 
 # Pydantic models for request validation
 class Section(BaseModel):
@@ -51,130 +93,427 @@ class HistoryTurn(BaseModel):
 class InterviewRequest(BaseModel):
     section: Section
     history: List[HistoryTurn] = Field(default_factory=list)
+    # Server-held transcript: send the session_id from the previous response and
+    # the new answer instead of re-uploading the whole history every turn
+    session_id: Optional[str] = None
+    answer: Optional[str] = None
+
+class CvSectionItem(BaseModel):
+    title: str
+    text: str
+
+class CvSections(BaseModel):
+    """
+    Canonical /parse-cv result; `?sections=` returns a subset of the keys, and
+    `?fields=` / `?compact=true` only change how items are encoded (utils.encoding).
+    """
+    projects: List[CvSectionItem] = Field(default_factory=list)
+    experience: List[CvSectionItem] = Field(default_factory=list)
+    education: List[CvSectionItem] = Field(default_factory=list)
+    skills: List[CvSectionItem] = Field(default_factory=list)
+    extracurricular: List[CvSectionItem] = Field(default_factory=list)
+
+class EncodedCvSectionItem(BaseModel):
+    """A /parse-cv item as sent with `?fields=` or `?compact=true`."""
+    title: Optional[Union[str, List[int]]] = Field(
+        None, description="Item title, or its [start, end] offsets into `text` with compact=true; absent if not in `fields`"
+    )
+    text: Optional[str] = Field(None, description="Item text; absent if not in `fields`")
+
+class EncodedCvSections(BaseModel):
+    """/parse-cv result with `?fields=` or `?compact=true` (see CvSections)."""
+    projects: List[EncodedCvSectionItem] = Field(default_factory=list)
+    experience: List[EncodedCvSectionItem] = Field(default_factory=list)
+    education: List[EncodedCvSectionItem] = Field(default_factory=list)
+    skills: List[EncodedCvSectionItem] = Field(default_factory=list)
+    extracurricular: List[EncodedCvSectionItem] = Field(default_factory=list)
 
 # --- PDF parsing helper function ---
-def extract_sections(cv_text: str) -> Dict[str, List[Dict[str, str]]]:
+# Bump whenever extract_sections output changes so cached parses are invalidated
+PARSER_VERSION = "regex-2"
+LAYOUT_PARSER_VERSION = "layout-1"
+
+# text: flattened page text split by utils.section_splitter (stops reading early)
+# layout: headings found from font size/weight by utils.layout_extract
+# spacy: projects/experience headers matched by utils.spacy_parser
+# The default comes from PARSER_STRATEGY; `?mode=` overrides it per request.
+ParseMode = Literal["text", "layout", "spacy"]
+
+PARSER_VERSIONS = {"text": PARSER_VERSION, "layout": LAYOUT_PARSER_VERSION, "spacy": SPACY_PARSER_VERSION}
+
+def extract_sections(cv_text: str, sections: Optional[Sequence[str]] = None) -> Dict[str, List[Dict[str, str]]]:
     """
     Extract CV sections such as projects, experience, education, skills, extracurricular, etc.
-    Uses regex-based heuristics for flexibility.
+    Headers are found in a single pass by utils.section_splitter (see DEFAULT_HEADERS to extend).
+
+    Args:
+        sections: Only return these sections (default: all).
 
     Returns:
         Dictionary of section name -> list of {title, text} entries.
     """
-    # Normalize line endings
-    text = cv_text.replace('\r\n', '\n')
-    
-    # Define section headers with regex patterns; can be extended
-    patterns = {
-        "projects": r'PROJECTS?\n(.*?)(?=\n[A-Z\s]{5,}\n|\Z)',
-        "experience": r'EXPERIENCE\n(.*?)(?=\n[A-Z\s]{5,}\n|\Z)',
-        "education": r'EDUCATION\n(.*?)(?=\n[A-Z\s]{5,}\n|\Z)',
-        "skills": r'SKILLS?\n(.*?)(?=\n[A-Z\s]{5,}\n|\Z)',
-        "extracurricular": r'(EXTRA-?CURRICULAR|ACTIVITIES|POSITIONS?)\n(.*?)(?=\n[A-Z\s]{5,}\n|\Z)'
-    }
-
-    sections = {}
-    for section, pattern in patterns.items():
-        match = re.search(pattern, text, re.DOTALL | re.IGNORECASE)
-        if not match:
-            sections[section] = []
-            continue
-        content = match.group(1).strip()
-
-        # Split content into items based on newlines, bullet points, or lines starting with capitalized words
-        items = re.split(r'\n(?=[A-Z][a-zA-Z\s]+\s*\||\n[A-Z][a-zA-Z\s]+ at|^\s*-\s*)', content)
-        if len(items) <= 1 and '\n\n' in content:
-            items = [p.strip() for p in content.split('\n\n') if p.strip()]
-
-        entries = []
-        for item in items:
-            if not item.strip():
-                continue
-            first_line = item.split('\n')[0].strip()
-            title = first_line.split('|')[0].strip() if '|' in first_line else first_line
-            entries.append({"title": title, "text": item.strip()})
-        sections[section] = entries
-    return sections
+    return split_sections(cv_text, sections)
 
 # --- API Endpoints ---
 
-@app.post("/parse-cv", summary="Parse CV PDF and extract structured sections")
-async def parse_cv(file: UploadFile = File(...)):
+PARSE_MODE_DESCRIPTION = (
+    "Parser strategy (default: PARSER_STRATEGY): `text` splits on capitalised headers, "
+    "`layout` detects headings from font metrics, `spacy` matches headers with spaCy"
+)
+FIELDS_DESCRIPTION = "Comma-separated item fields to return (`title`, `text`); `fields=title` lists titles only"
+COMPACT_DESCRIPTION = "Send each item's title as [start, end] offsets into its text instead of repeating it"
+
+# Documented with `responses` rather than response_model: the body is rendered
+# by orjson and its shape depends on `fields` and `compact`
+PARSE_CV_RESPONSES = {
+    200: {
+        "model": Union[CvSections, EncodedCvSections],
+        "description": "Parsed sections: CvSections by default, EncodedCvSections with `fields` or `compact`",
+    },
+}
+
+@router.post("/parse-cv", responses=PARSE_CV_RESPONSES, summary="Parse CV PDF and extract structured sections")
+async def parse_cv(
+    request: Request,
+    file: UploadFile = File(...),
+    sections: Optional[str] = Query(None, description="Comma-separated sections to return, e.g. projects,experience"),
+    mode: Optional[ParseMode] = Query(None, description=PARSE_MODE_DESCRIPTION),
+    precompute: Optional[bool] = Query(
+        None, description="Precompute first interview questions and quick reviews in the background (default: PRECOMPUTE_QUESTIONS)"
+    ),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    compact: bool = Query(False, description=COMPACT_DESCRIPTION),
+):
+    wanted = validate_parse_params(file, sections)
+    wanted_fields = validate_fields_param(fields)
+    with stage("upload_read"):
+        upload = await spool_upload(file)
+    with upload:
+        parsed = await parse_pdf_upload(upload, request, wanted, mode or request.app.state.parser_strategy)
+    if precompute_enabled(precompute):
+        schedule_precompute(upload.sha256, parsed)
+    with stage("serialize"):
+        return OrjsonResponse(shape_sections(parsed, wanted_fields, compact), headers={"X-CV-Hash": upload.sha256})
+
+def validate_parse_params(file: UploadFile, sections: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Reject non-PDF uploads and unknown sections with 400; returns the wanted sections."""
     if file.content_type != "application/pdf":
         raise HTTPException(status_code=400, detail="Only PDF files are accepted.")
-    
     try:
-        import fitz  # PyMuPDF
-        pdf_bytes = await file.read()
-        doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-        cv_text = "".join(page.get_text() for page in doc)
-        doc.close()
+        return parse_sections_param(sections)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def validate_fields_param(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    try:
+        return parse_fields_param(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+async def parse_pdf_upload(
+    upload: SpooledPdf,
+    request: Optional[Request] = None,
+    sections: Optional[Sequence[str]] = None,
+    mode: ParseMode = "text",
+    spacy_group: Optional[SpacyPipeGroup] = None,
+) -> Dict[str, List[Dict[str, str]]]:
+    """
+    Shared /parse-cv pipeline: parse cache, pooled extraction, then sectioning.
+    In spacy mode, `spacy_group` batches the tokenizing with other PDFs of a batch.
+
+    In text mode extraction stops at the first page after which all wanted
+    sections are complete, so `sections` only trims work, never changes their
+    content. Layout mode needs document-wide font statistics and spaCy mode the
+    whole text, so both read every page.
+    """
+    version = PARSER_VERSIONS[mode]
+    cache_key = parse_cache_key_from_digest(upload.sha256, version)
+    cached = await get_parse_cache().get(cache_key)
+    if cached is not None:
+        logger.info("Parsed CV served from cache")
+        return cached if sections is None else {name: cached[name] for name in sections}
+    if sections is not None:
+        # A subset parse may have read only part of the PDF, so it gets its own entry
+        cache_key = parse_cache_key_from_digest(upload.sha256, f"{version}:{','.join(sections)}")
+        cached = await get_parse_cache().get(cache_key)
+        if cached is not None:
+            logger.info("Parsed CV served from cache")
+            return cached
+
+    if mode == "layout":
+        return await parse_pdf_layout(upload, request, sections, cache_key)
+    if mode == "spacy":
+        return await parse_pdf_spacy(upload, request, sections, cache_key, spacy_group)
+
+    try:
+        # Extraction runs on the shared PDF pool so the event loop stays free
+        cv_text = await get_pdf_extractor().extract_text(
+            upload.source, request, stop_after=default_splitter.section_names if sections is None else sections
+        )
         if not cv_text.strip():
             raise HTTPException(status_code=400, detail="Extracted text from PDF is empty.")
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"PDF processing error: {e}")
         raise HTTPException(status_code=500, detail=f"Error processing PDF: {str(e)}")
 
-    sections = extract_sections(cv_text)
-    logger.info(f"Parsed CV sections: {list(sections.keys())}")
-    return sections
+    with stage("sectioning"):
+        parsed = extract_sections(cv_text, sections)
+    await get_parse_cache().put(cache_key, parsed)
+    index_parsed(upload, parsed)
+    logger.info(f"Parsed CV sections: {list(parsed.keys())}")
+    return parsed
 
-@app.post("/mock-interview", summary="Generate mock interview questions and feedback")
-async def mock_interview(req: InterviewRequest):
-    api_key = os.getenv("GEMINI_API_KEY")
-    if not api_key:
-        logger.error("GEMINI_API_KEY missing")
-        raise HTTPException(status_code=500, detail="AI API key not configured.")
-    
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash-latest:generateContent?key={api_key}"
+def index_parsed(upload: SpooledPdf, parsed: Dict[str, List[Dict[str, str]]]) -> None:
+    """
+    Queue a fresh parse for /search (utils.search_index). Cache hits are not
+    re-indexed: the parse that filled the cache already was.
+    """
+    index = get_search_index()
+    if index is not None:
+        index.index(upload.sha256, upload.filename, parsed)
+
+async def parse_pdf_layout(
+    upload: SpooledPdf, request: Optional[Request], sections: Optional[Sequence[str]], cache_key: str
+) -> Dict[str, List[Dict[str, str]]]:
+    """Layout mode: extraction and sectioning both run in one pool job."""
+    # numpy comes with it, so only pay for the import when layout mode is used
+    from utils.layout_extract import extract_layout_sections
+
+    try:
+        parsed = await get_pdf_extractor().run(extract_layout_sections, upload.source, request, sections)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"PDF processing error: {e}")
+        raise HTTPException(status_code=500, detail=f"Error processing PDF: {str(e)}")
+    if parsed is None:
+        raise HTTPException(status_code=400, detail="Extracted text from PDF is empty.")
+    await get_parse_cache().put(cache_key, parsed)
+    index_parsed(upload, parsed)
+    logger.info(f"Parsed CV sections (layout): {list(parsed.keys())}")
+    return parsed
+
+async def parse_pdf_spacy(
+    upload: SpooledPdf,
+    request: Optional[Request],
+    sections: Optional[Sequence[str]],
+    cache_key: str,
+    group: Optional[SpacyPipeGroup] = None,
+) -> Dict[str, List[Dict[str, str]]]:
+    """spaCy mode: only projects and experience are recognised; other sections come back empty."""
+    with group.member() if group is not None else nullcontext() as member:
+        try:
+            cv_text = await get_pdf_extractor().extract_text(upload.source, request)
+            if not cv_text.strip():
+                raise HTTPException(status_code=400, detail="Extracted text from PDF is empty.")
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"PDF processing error: {e}")
+            raise HTTPException(status_code=500, detail=f"Error processing PDF: {str(e)}")
+
+        with stage("sectioning"):
+            # Tokenizing is CPU-bound; keep it off the event loop. Batch members share nlp.pipe calls
+            try:
+                if member is not None:
+                    found = await member.parse(cv_text)
+                else:
+                    found = await run_in_threadpool(parse_cv_with_spacy, cv_text)
+            except SpacyUnavailable as e:
+                # The model loads on first use, so a missing one shows up here rather than at startup
+                logger.error(f"spaCy parse mode unavailable: {e}")
+                raise HTTPException(status_code=503, detail=f"spaCy parse mode is unavailable: {e}")
+    parsed = {name: found.get(name, []) for name in (default_splitter.section_names if sections is None else sections)}
+    await get_parse_cache().put(cache_key, parsed)
+    index_parsed(upload, parsed)
+    logger.info(f"Parsed CV sections (spacy): {list(parsed.keys())}")
+    return parsed
+
+@router.post("/parse-cv/batch", summary="Parse many CV PDFs (multipart files and/or zip archives) as NDJSON")
+async def parse_cv_batch(
+    request: Request,
+    files: List[UploadFile] = File(...),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    compact: bool = Query(False, description=COMPACT_DESCRIPTION),
+):
+    """
+    Streams one NDJSON line per PDF in completion order, each either
+    {"index", "filename", "status": 200, "sections"} or {"index", "filename", "status", "error"},
+    followed by a {"summary": ...} line.
+    """
+    wanted_fields = validate_fields_param(fields)
+    limits = BatchLimits()
+    entries = await collect_batch_pdfs(files, limits)
+    concurrency = limits.concurrency or get_pdf_extractor().max_workers
+    mode = request.app.state.parser_strategy
+    # spaCy mode tokenizes each wave of extracted PDFs in one nlp.pipe call
+    spacy_group = SpacyPipeGroup() if mode == "spacy" else None
+
+    async def parse(upload: SpooledPdf) -> Dict:
+        parsed = await parse_pdf_upload(upload, mode=mode, spacy_group=spacy_group)
+        return shape_sections(parsed, wanted_fields, compact)
+
+    return StreamingResponse(
+        stream_batch_results(entries, parse, concurrency),
+        media_type="application/x-ndjson",
+    )
+
+# Bump when a prompt template changes so cached AI responses are invalidated
+FIRST_QUESTION_PROMPT_VERSION = "first-question-1"
+QUICK_REVIEW_PROMPT_VERSION = "quick-review-1"
+
+def response_cache_key(prompt_version: str, section: Section) -> str:
+    return f"{prompt_version}:{section_fingerprint(section.title, section.text)}"
+
+# Entries whose first question and quick review are precomputed after a parse
+PRECOMPUTE_SECTIONS = ("projects", "experience")
+
+def schedule_precompute(cv_hash: str, parsed: Dict[str, List[Dict[str, str]]]) -> None:
+    """
+    Queue the background question-bank job for a parsed CV (utils.question_bank).
+    Its results land under the same response-cache keys as the first
+    /mock-interview turn and /quick-review, which then answer from the cache.
+    """
+    client = get_gemini_client()
+    if not client.api_key:
+        return
+    items = []
+    for name in PRECOMPUTE_SECTIONS:
+        for entry in parsed.get(name, []):
+            section = Section(title=entry["title"], text=entry["text"])
+            items.append(PrecomputeItem(
+                section.title,
+                section.text,
+                response_cache_key(FIRST_QUESTION_PROMPT_VERSION, section),
+                response_cache_key(QUICK_REVIEW_PROMPT_VERSION, section),
+            ))
+    get_question_bank().schedule(cv_hash, items, client)
+
+# Endpoints whose Gemini calls share one request deadline (GEMINI_DEADLINE, X-Request-Timeout)
+AI_PATHS = ("/mock-interview", "/mock-interview/stream", "/quick-review")
+
+def degraded_answers_enabled() -> bool:
+    """AI_DEGRADED_ANSWERS=0 answers refused Gemini calls with 503 instead of a fallback."""
+    return os.getenv("AI_DEGRADED_ANSWERS", "1") == "1"
+
+def upstream_unavailable(e: UpstreamUnavailable) -> HTTPException:
+    """503 with Retry-After for a Gemini call the upstream guard refused."""
+    return HTTPException(
+        status_code=503,
+        detail=f"AI service temporarily unavailable ({e.reason}).",
+        headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))},
+    )
+
+def degraded_first_question(section: Section) -> Dict:
+    """Opening question asked without Gemini while it is unavailable; never cached."""
+    return {
+        "next_question": f"Walk me through '{section.title}': what problem did it solve, and what was your part in it?",
+        "degraded": True,
+    }
+
+def degraded_quick_review(section: Section) -> Dict:
+    """Quick review made of the section's own first sentences while Gemini is unavailable; never cached."""
+    sentences = [s.strip(" -*\u2022") for s in re.split(r"(?<=[.!?])\s+|\n+", section.text)]
+    return {"points": [s for s in sentences if s][:5] or [section.title], "degraded": True}
+
+def build_interview_contents(section: Section, turns: List[Dict], summary: str = "") -> List[Dict]:
+    """
+    Build the Gemini `contents` payload for the next interview turn from the
+    verbatim recent turns and the running summary of older ones.
+    """
     history_payload = []
+    if summary:
+        history_payload.append({"role": "user", "parts": [{"text": f"Notes on the interview so far: {summary}"}]})
 
     # Prepare conversational history for AI prompt
-    for turn in req.history:
-        if turn.question:
-            history_payload.append({"role": "model", "parts": [{"text": turn.question}]})
-        if turn.answer:
-            history_payload.append({"role": "user", "parts": [{"text": turn.answer}]})
+    for turn in turns:
+        if turn.get("question"):
+            history_payload.append({"role": "model", "parts": [{"text": turn["question"]}]})
+        if turn.get("answer"):
+            history_payload.append({"role": "user", "parts": [{"text": turn["answer"]}]})
 
     # Construct prompt depending on state (first question or follow-up)
-    if not req.history:
+    if not turns:
         prompt = (
             f"You are a senior technical interviewer. "
-            f"Project Title: '{req.section.title}', Description: '{req.section.text}'. "
+            f"Project Title: '{section.title}', Description: '{section.text}'. "
             f"Ask the first open-ended question. Respond ONLY with JSON: "
             '{"next_question": "Your question here."}'
         )
-        contents = [{"parts": [{"text": prompt}]}]
-    else:
-        last_answer = req.history[-1].answer or ""
-        prompt = (
-            f"You are a senior technical interviewer. "
-            f"Project: '{req.section.title}'. Candidate's last answer: '{last_answer}'. "
-            f"Provide a JSON with 'feedback' (brief, constructive) and 'next_question' (follow-up)."
-        )
-        history_payload.append({"role": "user", "parts": [{"text": prompt}]})
-        contents = history_payload
+        return [{"parts": [{"text": prompt}]}]
 
-    payload = {
-        "contents": contents,
-        "generationConfig": {"response_mime_type": "application/json"},
-    }
+    last_answer = turns[-1].get("answer") or ""
+    prompt = (
+        f"You are a senior technical interviewer. "
+        f"Project: '{section.title}'. Candidate's last answer: '{last_answer}'. "
+        f"Provide a JSON with 'feedback' (brief, constructive) and 'next_question' (follow-up)."
+    )
+    history_payload.append({"role": "user", "parts": [{"text": prompt}]})
+    return history_payload
+
+async def open_interview_turn(req: InterviewRequest, client) -> Tuple[InterviewSession, List[Dict]]:
+    """
+    Resolve the server-held session for this request and record the new answer.
 
+    Requests without a known session_id start a session seeded from `history`.
+    Returns the session and the size-bounded contents for the next turn.
+    """
+    store = get_session_store()
+    session = store.get(req.session_id) if req.session_id else None
+    if session is None:
+        if req.session_id and not req.history:
+            raise HTTPException(status_code=404, detail="Interview session expired; resend the full history.")
+        session = store.create(req.section.title, req.section.text, [t.model_dump() for t in req.history])
+    if req.answer is not None:
+        session.record_answer(req.answer)
+    summary, recent = await get_history_compactor().compact(session, client)
+    return session, build_interview_contents(req.section, recent, summary)
+
+def parse_interview_json(raw_text: str) -> Dict:
+    """Robust JSON extraction from an interview response."""
     try:
-        async with httpx.AsyncClient(timeout=90) as client:
-            resp = await client.post(url, json=payload)
-            resp.raise_for_status()
-            result = resp.json()
-            raw_text = result["candidates"][0]["content"]["parts"][0]["text"]
+        return json.loads(raw_text)
+    except json.JSONDecodeError:
+        match = re.search(r"```json\n(.*)\n```", raw_text, re.DOTALL)
+        if match:
+            return json.loads(match.group(1))
+        raise HTTPException(status_code=500, detail="Malformed AI JSON response.")
+
+async def run_interview_turn(req: InterviewRequest) -> Dict:
+    """One /mock-interview turn; shared by the endpoint and interview jobs."""
+    import httpx
+
+    client = get_gemini_client()
+    if not client.api_key:
+        logger.error("GEMINI_API_KEY missing")
+        raise HTTPException(status_code=500, detail="AI API key not configured.")
+
+    async def ask(contents):
+        raw_text = await client.generate_content(contents)
+        return parse_interview_json(raw_text)
 
-            # Robust JSON extraction from response
+    try:
+        session, contents = await open_interview_turn(req, client)
+        if not session.turns:
+            # The first question depends only on the section: cache it and coalesce duplicates
+            cache_key = response_cache_key(FIRST_QUESTION_PROMPT_VERSION, req.section)
             try:
-                return json.loads(raw_text)
-            except json.JSONDecodeError:
-                match = re.search(r"```json\n(.*)\n```", raw_text, re.DOTALL)
-                if match:
-                    return json.loads(match.group(1))
-                raise HTTPException(status_code=500, detail="Malformed AI JSON response.")
+                result = await get_response_cache().get_or_compute(cache_key, lambda: ask(contents))
+            except UpstreamUnavailable:
+                if not degraded_answers_enabled():
+                    raise
+                result = degraded_first_question(req.section)
+        else:
+            result = await ask(contents)
+        session.record_response(result)
+        return {**result, "session_id": session.id}
+    except HTTPException:
+        raise
+    except UpstreamUnavailable as e:
+        logger.warning(f"Mock interview turn refused: {e}")
+        raise upstream_unavailable(e)
     except httpx.HTTPStatusError as e:
         logger.error(f"AI API HTTP error: {e.response.text}")
         raise HTTPException(status_code=502, detail="AI service returned error.")
@@ -182,13 +521,74 @@ async def mock_interview(req: InterviewRequest):
         logger.error(f"Unexpected error in mock interview endpoint: {e}")
         raise HTTPException(status_code=500, detail="Unexpected server error.")
 
-@app.post("/quick-review", summary="Generate quick review bullet points for a CV section")
-async def quick_review(req: Section):
-    api_key = os.getenv("GEMINI_API_KEY")
-    if not api_key:
+@router.post("/mock-interview", summary="Generate mock interview questions and feedback")
+async def mock_interview(req: InterviewRequest):
+    return await run_interview_turn(req)
+
+def sse_event(event: str, data) -> str:
+    """Format one Server-Sent Events frame."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@router.post("/mock-interview/stream", summary="Stream mock interview tokens over Server-Sent Events")
+async def mock_interview_stream(req: InterviewRequest):
+    """
+    Same as /mock-interview, but forwards Gemini tokens as they arrive.
+
+    Emits `token` events ({"text": ...}) while generating, then a single `result`
+    event with the parsed {feedback, next_question, session_id} JSON, or an `error` event.
+    """
+    client = get_gemini_client()
+    if not client.api_key:
+        logger.error("GEMINI_API_KEY missing")
         raise HTTPException(status_code=500, detail="AI API key not configured.")
 
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash-latest:generateContent?key={api_key}"
+    import httpx
+
+    session, contents = await open_interview_turn(req, client)
+    cache_key = None if session.turns else response_cache_key(FIRST_QUESTION_PROMPT_VERSION, req.section)
+
+    async def events():
+        chunks = []
+        try:
+            result = await get_response_cache().get(cache_key) if cache_key else None
+            if result is None:
+                async for text in client.stream_generate_content(contents):
+                    chunks.append(text)
+                    yield sse_event("token", {"text": text})
+                result = parse_interview_json("".join(chunks))
+                if cache_key:
+                    await get_response_cache().set(cache_key, result)
+            session.record_response(result)
+            yield sse_event("result", {**result, "session_id": session.id})
+        except HTTPException as e:
+            yield sse_event("error", {"detail": e.detail})
+        except UpstreamUnavailable as e:
+            if cache_key and not chunks and degraded_answers_enabled():
+                result = degraded_first_question(req.section)
+                session.record_response(result)
+                yield sse_event("result", {**result, "session_id": session.id})
+            else:
+                error = upstream_unavailable(e)
+                yield sse_event("error", {"detail": error.detail, "retry_after": int(error.headers["Retry-After"])})
+        except httpx.HTTPStatusError as e:
+            logger.error(f"AI API HTTP error: {e.response.text}")
+            yield sse_event("error", {"detail": "AI service returned error."})
+        except Exception as e:
+            logger.error(f"Unexpected error in mock interview stream: {e}")
+            yield sse_event("error", {"detail": "Unexpected server error."})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Disable proxy buffering so tokens reach the browser immediately
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+async def generate_quick_review(req: Section) -> Dict:
+    """Quick-review bullets for a section; shared by the endpoint and quick-review jobs."""
+    client = get_gemini_client()
+    if not client.api_key:
+        raise HTTPException(status_code=500, detail="AI API key not configured.")
 
     prompt = (
         f"Given the following CV section title and content, "
@@ -197,31 +597,275 @@ async def quick_review(req: Section):
         "Return the response as a JSON array of strings."
     )
 
-    payload = {
-        "contents": [{"parts": [{"text": prompt}]}],
-        "generationConfig": {"response_mime_type": "application/json"},
-    }
+    async def review():
+        raw_text = await client.generate_content([{"parts": [{"text": prompt}]}])
 
-    try:
-        async with httpx.AsyncClient(timeout=90) as client:
-            resp = await client.post(url, json=payload)
-            resp.raise_for_status()
-            result = resp.json()
-            raw_text = result["candidates"][0]["content"]["parts"][0]["text"]
+        try:
+            points = json.loads(raw_text)
+            if not isinstance(points, list):
+                raise ValueError("Response is not a JSON list")
+            return {"points": points}
+        except Exception:
+            # fallback: parse markdown list bullets if AI doesn't return clean JSON
+            bullets = re.findall(r"^\s*[-*]\s+(.*)$", raw_text, re.MULTILINE)
+            return {"points": bullets or [raw_text]}
 
-            try:
-                points = json.loads(raw_text)
-                if not isinstance(points, list):
-                    raise ValueError("Response is not a JSON list")
-                return {"points": points}
-            except Exception:
-                # fallback: parse markdown list bullets if AI doesn't return clean JSON
-                bullets = re.findall(r"^\s*[-*]\s+(.*)$", raw_text, re.MULTILINE)
-                return {"points": bullets or [raw_text]}
+    try:
+        # Depends only on the section: cache it and coalesce duplicate requests
+        cache_key = response_cache_key(QUICK_REVIEW_PROMPT_VERSION, req)
+        return await get_response_cache().get_or_compute(cache_key, review)
+    except UpstreamUnavailable as e:
+        logger.warning(f"Quick review refused: {e}")
+        if degraded_answers_enabled():
+            return degraded_quick_review(req)
+        raise upstream_unavailable(e)
     except Exception as e:
         logger.error(f"Quick review generation error: {e}")
         raise HTTPException(status_code=500, detail="Failed to generate quick review.")
 
-@app.get("/", summary="Health check endpoint")
+@router.post("/quick-review", summary="Generate quick review bullet points for a CV section")
+async def quick_review(req: Section):
+    return await generate_quick_review(req)
+
+# --- Background jobs (utils.jobs) ---
+
+JobPriority = Literal["high", "normal", "low"]
+
+class JobRequest(BaseModel):
+    kind: Literal["quick_review", "mock_interview"]
+    # Body of the matching endpoint: a Section for quick_review, an InterviewRequest for mock_interview
+    payload: Dict[str, Any]
+    priority: JobPriority = "normal"
+
+JOB_PAYLOAD_MODELS = {"quick_review": Section, "mock_interview": InterviewRequest}
+
+# Seconds between status checks for a job owned by another worker process
+JOB_EVENTS_POLL_SECONDS = 1.0
+JOB_EVENTS_KEEPALIVE_SECONDS = 15.0
+
+async def run_parse_job(payload: Tuple[SpooledPdf, Optional[Tuple[str, ...]], ParseMode]) -> Dict:
+    upload, sections, mode = payload
+    return await parse_pdf_upload(upload, None, sections, mode)
+
+def register_job_handlers(jobs: JobQueue) -> None:
+    jobs.register("parse_cv", run_parse_job)
+    jobs.register("quick_review", generate_quick_review)
+    jobs.register("mock_interview", run_interview_turn)
+
+def job_user(request: Request) -> str:
+    """
+    Fairness key for the job queue: the client address. Clients can set any
+    X-User-Id, so the header is only used with JOBS_TRUST_USER_HEADER=1, behind
+    a proxy that sets it from an authenticated identity.
+    """
+    if os.getenv("JOBS_TRUST_USER_HEADER", "0") == "1" and request.headers.get("X-User-Id"):
+        return request.headers["X-User-Id"]
+    return request.client.host if request.client else "anonymous"
+
+def job_accepted(job_id: str) -> OrjsonResponse:
+    status_url = f"/jobs/{job_id}"
+    return OrjsonResponse(
+        {"id": job_id, "state": "queued", "status_url": status_url, "events_url": f"{status_url}/events"},
+        status_code=202,
+        headers={"Location": status_url},
+    )
+
+@router.post("/jobs", status_code=202, summary="Queue a quick review or mock interview turn as a background job")
+async def create_job(req: JobRequest, request: Request):
+    try:
+        payload = JOB_PAYLOAD_MODELS[req.kind].model_validate(req.payload)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
+    return job_accepted(await get_job_queue().submit(req.kind, payload, job_user(request), req.priority))
+
+@router.post("/jobs/parse-cv", status_code=202, summary="Queue a CV PDF parse as a background job")
+async def create_parse_job(
+    request: Request,
+    file: UploadFile = File(...),
+    sections: Optional[str] = Query(None, description="Comma-separated sections to return, e.g. projects,experience"),
+    mode: Optional[ParseMode] = Query(None, description=PARSE_MODE_DESCRIPTION),
+    priority: JobPriority = Query("normal"),
+):
+    wanted = validate_parse_params(file, sections)
+    upload = await spool_upload(file)
+    try:
+        job_id = await get_job_queue().submit(
+            "parse_cv",
+            (upload, wanted, mode or request.app.state.parser_strategy),
+            job_user(request),
+            priority,
+            meta={"filename": file.filename, "bytes": upload.size},
+            cleanup=upload.close,
+        )
+    except Exception:
+        upload.close()
+        raise
+    return job_accepted(job_id)
+
+@router.get("/jobs/stats", summary="Job queue depth per priority, running jobs and counters")
+def job_stats():
+    return get_job_queue().stats()
+
+@router.get("/jobs/{job_id}", summary="Job state, and its result or error once finished")
+async def job_status(job_id: str):
+    status = await get_job_queue().status(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired.")
+    return status
+
+@router.get("/jobs/{job_id}/events", summary="Stream job state changes over Server-Sent Events")
+async def job_events(job_id: str):
+    """
+    Emits a `status` event (same body as GET /jobs/{id}) on every state change
+    and closes after the `done` or `failed` one.
+    """
+    jobs = get_job_queue()
+    if await jobs.status(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired.")
+
+    async def events():
+        last_state = None
+        while True:
+            # Watch before reading so a change while the frame is sent is not missed
+            changed = jobs.watch(job_id)
+            status = await jobs.status(job_id)
+            if status is None:
+                yield sse_event("error", {"detail": "Job expired."})
+                return
+            if status["state"] != last_state:
+                last_state = status["state"]
+                yield sse_event("status", status)
+            else:
+                yield ": keep-alive\n\n"
+            if status["state"] in FINISHED_STATES:
+                return
+            if changed is None:
+                await asyncio.sleep(JOB_EVENTS_POLL_SECONDS)
+                continue
+            try:
+                await asyncio.wait_for(changed.wait(), JOB_EVENTS_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/metrics", summary="Prometheus metrics", include_in_schema=False)
+def metrics():
+    body, content_type = metrics_response_body()
+    return Response(content=body, media_type=content_type)
+
+@router.get("/pdf-executor/stats", summary="PDF extraction pool queue depth and per-stage timings")
+def pdf_executor_stats():
+    return get_pdf_extractor().stats()
+
+@router.get("/parse-cache/stats", summary="Parse cache hit, miss and eviction counters")
+def parse_cache_stats():
+    return get_parse_cache().stats()
+
+@router.get("/response-cache/stats", summary="AI response cache hit, miss and coalescing counters")
+def response_cache_stats():
+    return get_response_cache().stats()
+
+@router.get("/upstream/stats", summary="Gemini circuit breaker state, adaptive rate limit and shed calls")
+def upstream_stats():
+    return get_gemini_client().guard.status()
+
+@router.get("/search", summary="Ranked full-text search over the sections of every parsed CV")
+async def search_cvs(
+    q: str = Query(..., min_length=1, description='Words and "quoted phrases" to find; `kube*` matches prefixes'),
+    sections: Optional[str] = Query(None, description="Comma-separated sections to search, e.g. projects,experience"),
+    match: Literal["all", "any"] = Query("all", description="Require all terms, or rank entries matching any of them"),
+    limit: int = Query(20, ge=1, le=SEARCH_MAX_RESULTS),
+    offset: int = Query(0, ge=0),
+):
+    """
+    Best matches first, one result per CV entry: {cv_hash, filename, section,
+    position, title, snippet, score}. Matched words in `snippet` are wrapped in **.
+    """
+    index = get_search_index()
+    if index is None:
+        raise HTTPException(status_code=503, detail="Search is disabled; set SEARCH_INDEX_PATH to enable it.")
+    try:
+        wanted = parse_sections_param(sections)
+        started = time.perf_counter()
+        with stage("search"):
+            results = await run_in_threadpool(index.search, q, wanted, limit, offset, match == "all")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"query": q, "results": results, "took_ms": round((time.perf_counter() - started) * 1000, 2)}
+
+@router.get("/search/stats", summary="Search index size and indexing counters")
+async def search_stats():
+    index = get_search_index()
+    if index is None:
+        raise HTTPException(status_code=503, detail="Search is disabled; set SEARCH_INDEX_PATH to enable it.")
+    return await run_in_threadpool(index.stats)
+
+@router.get("/precompute/{cv_hash}", summary="Progress of the background question precompute for a parsed CV")
+def precompute_status(cv_hash: str):
+    job = get_question_bank().get(cv_hash)
+    if job is None:
+        raise HTTPException(status_code=404, detail="No precompute job for this CV.")
+    return job.status()
+
+@router.get("/", summary="Health check endpoint")
 def health_check():
     return {"status": "ok"}
+
+def create_app(parser_strategy: Optional[str] = None) -> FastAPI:
+    """
+    Build the API: every endpoint, middleware and the lifespan that owns the
+    shared pools, caches and job workers.
+
+    Args:
+        parser_strategy: Default /parse-cv mode (`text`, `layout` or `spacy`);
+            falls back to PARSER_STRATEGY, then `text`.
+    """
+    strategy = parser_strategy or os.getenv("PARSER_STRATEGY", "text")
+    if strategy not in get_args(ParseMode):
+        raise ValueError(f"Unknown parser strategy {strategy!r}; expected one of {', '.join(get_args(ParseMode))}")
+
+    app = FastAPI(title="CV Parsing & Mock Interview API", lifespan=lifespan, default_response_class=OrjsonResponse)
+    app.state.parser_strategy = strategy
+    app.include_router(router)
+
+    # Cut oversized upload bodies off with 413 while they stream in (PDF_MAX_UPLOAD_BYTES, BATCH_MAX_BYTES)
+    app.add_middleware(
+        UploadLimitMiddleware,
+        limits={
+            "/parse-cv": max_upload_bytes(),
+            "/parse-cv/batch": BatchLimits().max_bytes,
+            "/jobs/parse-cv": max_upload_bytes(),
+        },
+    )
+
+    # Configure CORS for frontend domains
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=[
+            "http://localhost:5173",
+            "http://localhost:3000",
+            # add production frontend URLs here
+        ],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        # Lets the frontend read the CV hash /precompute/{cv_hash} is keyed by, and 503 back-off hints
+        expose_headers=["X-CV-Hash", "Retry-After"],
+    )
+
+    # Deadline for the Gemini calls of AI requests (GEMINI_DEADLINE, X-Request-Timeout header)
+    app.add_middleware(DeadlineMiddleware, paths=AI_PATHS)
+
+    # br/gzip for JSON and NDJSON bodies (COMPRESSION_MIN_BYTES, COMPRESSION_ENCODINGS)
+    app.add_middleware(CompressionMiddleware)
+
+    # Latency/size histograms per route, plus optional Server-Timing (SERVER_TIMING_HEADER=1)
+    app.add_middleware(MetricsMiddleware)
+    return app
+
+app = create_app()
@@ -0,0 +1,45 @@
+# backend/tests/test_batch_parse.py
+"""Per-file errors for zip members of a batch."""
+
+import asyncio
+import io
+import json
+import struct
+import zipfile
+
+from fastapi import UploadFile
+from starlette.datastructures import Headers
+
+from utils.batch_parse import BatchLimits, collect_batch_pdfs, stream_batch_results
+
+PDF = b"%PDF-1.4\n" + b"0" * 1000
+
+
+def _zip_with_lying_member() -> bytes:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("liar.pdf", PDF)
+        archive.writestr("good.pdf", PDF)
+    data = bytearray(buf.getvalue())
+    # The central directory claims liar.pdf is empty
+    struct.pack_into("<I", data, data.find(b"PK\x01\x02") + 24, 0)
+    return bytes(data)
+
+
+def test_zip_member_with_a_false_size_fails_on_its_own():
+    async def scenario():
+        upload = UploadFile(
+            io.BytesIO(_zip_with_lying_member()), filename="cvs.zip", headers=Headers({"content-type": "application/zip"})
+        )
+        entries = await collect_batch_pdfs([upload], BatchLimits(max_files=10, max_bytes=100_000))
+
+        async def parse(pdf):
+            return {"bytes": pdf.size}
+
+        return [json.loads(line) async for line in stream_batch_results(entries, parse, 2)]
+
+    lines = asyncio.run(scenario())
+    by_name = {line["filename"]: line for line in lines[:-1]}
+    assert by_name["liar.pdf"]["status"] == 400
+    assert by_name["good.pdf"] == {"index": 1, "filename": "good.pdf", "sections": {"bytes": len(PDF)}, "status": 200}
+    assert lines[-1] == {"summary": {"files": 2, "succeeded": 1, "failed": 1}}
@@ -0,0 +1,36 @@
+# backend/tests/test_interview_sessions.py
+"""Turn bookkeeping of server-held interview sessions."""
+
+from utils.interview_sessions import HistoryCompactor, InterviewSession
+
+
+def test_retried_answer_replaces_instead_of_adding_a_turn():
+    session = InterviewSession("Cache", "Built a cache.")
+    session.record_response({"next_question": "Why LRU?"})
+    session.record_answer("Because of recency.")
+    # The turn failed upstream and the client resends its answer
+    session.record_answer("Because of recency, mostly.")
+    assert session.turns == [{"question": "Why LRU?", "answer": "Because of recency, mostly.", "feedback": None}]
+
+    session.record_response({"feedback": "Good.", "next_question": "What about TTLs?"})
+    session.record_answer("Per entry.")
+    assert [t["answer"] for t in session.turns] == ["Because of recency, mostly.", "Per entry."]
+
+
+def test_answer_after_feedback_only_response_starts_a_new_turn():
+    session = InterviewSession("Cache", "Built a cache.", [{"question": "Why LRU?", "answer": None, "feedback": None}])
+    session.record_answer("Recency.")
+    session.record_response({"feedback": "Fine."})
+    session.record_answer("Also frequency.")
+    assert len(session.turns) == 2
+    assert session.turns[-1] == {"question": None, "answer": "Also frequency.", "feedback": None}
+
+
+def test_fold_point_ignores_section_text():
+    # Follow-up prompts do not carry the section text, so a long one must not force folding
+    session = InterviewSession("Cache", "x" * 50000)
+    for i in range(3):
+        session.record_response({"next_question": f"Q{i}?"})
+        session.record_answer(f"A{i}.")
+    compactor = HistoryCompactor(keep_recent=4, budget_chars=2000, summary_max_chars=500)
+    assert compactor._fold_point(session) == 0
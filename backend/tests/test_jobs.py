@@ -0,0 +1,107 @@
+# backend/tests/test_jobs.py
+"""Job queue configuration, and failing jobs whose owning worker is gone."""
+
+import asyncio
+import socket
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from utils.jobs import JobQueue, JobStore, get_job_queue
+
+
+async def _noop(payload):
+    return payload
+
+
+def _insert_owner(store: JobStore, instance: str, host: str, pid: int, heartbeat_at: float) -> None:
+    with store._lock:
+        store._db.execute(
+            "INSERT INTO job_owners (instance, host, pid, heartbeat_at) VALUES (?, ?, ?, ?)",
+            (instance, host, pid, heartbeat_at),
+        )
+        store._db.commit()
+
+
+def test_restart_with_the_same_pid_fails_predecessor_jobs(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    before = JobQueue(JobStore(path))
+    before.register("echo", _noop)
+    before.store.heartbeat(before.instance)
+    job_id = asyncio.run(before.submit("echo", {}, "user"))
+    before.store.mark_running(job_id)
+    # The process dies without closing its queue; its replacement gets the same pid
+
+    async def restart():
+        after = JobQueue(JobStore(path))
+        await after.start()
+        status = await after.status(job_id)
+        await after.close()
+        return status
+
+    status = asyncio.run(restart())
+    assert status["state"] == "failed"
+    assert status["status_code"] == 503
+
+
+def test_live_and_stale_workers_on_other_hosts(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    now = time.time()
+    _insert_owner(store, "live", "elsewhere", 1, now)
+    _insert_owner(store, "stale", "elsewhere", 1, now - 3600)
+    store.create("live-job", "echo", "user", "normal", None, "live")
+    store.create("stale-job", "echo", "user", "normal", None, "stale")
+    store.create("own-job", "echo", "user", "normal", None, "me")
+
+    assert store.fail_orphaned("me") == 1
+    assert store.get("live-job")["state"] == "queued"
+    assert store.get("stale-job")["state"] == "failed"
+    assert store.get("own-job")["state"] == "queued"
+    store.close()
+
+
+def test_same_host_peer_with_live_pid_is_left_alone(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    # pid 1 always exists; on this host it is never this test's own process
+    _insert_owner(store, "peer", socket.gethostname(), 1, time.time())
+    store.create("peer-job", "echo", "user", "normal", None, "peer")
+    assert store.fail_orphaned("me") == 0
+    assert store.get("peer-job")["state"] == "queued"
+    store.close()
+
+
+def test_queue_is_disabled_without_a_db_path(monkeypatch, tmp_path):
+    monkeypatch.delenv("JOBS_DB_PATH", raising=False)
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(HTTPException) as e:
+        get_job_queue()
+    assert e.value.status_code == 503
+    assert not list(tmp_path.iterdir())
+
+
+def test_busy_store_does_not_block_the_event_loop(tmp_path):
+    async def scenario():
+        queue = JobQueue(JobStore(str(tmp_path / "jobs.sqlite3")))
+        queue.register("echo", _noop)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        # Another writer holds the store while the job is submitted
+        queue.store._lock.acquire()
+        asyncio.get_running_loop().call_later(0.2, queue.store._lock.release)
+        ticking = asyncio.create_task(ticker())
+        job_id = await queue.submit("echo", {}, "user")
+        ticking.cancel()
+        status = await queue.status(job_id)
+        queue.store.close()
+        return ticks, status
+
+    ticks, status = asyncio.run(scenario())
+    assert ticks >= 5
+    assert status["state"] == "queued"
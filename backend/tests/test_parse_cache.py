@@ -0,0 +1,44 @@
+# backend/tests/test_parse_cache.py
+"""Bounds and threading of the persistent parse-cache tier."""
+
+import asyncio
+
+from utils.parse_cache import ParseCache
+
+
+def test_disk_tier_keeps_the_newest_entries(tmp_path):
+    path = str(tmp_path / "parse_cache.sqlite3")
+
+    async def scenario():
+        cache = ParseCache(max_bytes=0, path=path, disk_max_entries=3)
+        for i in range(5):
+            await cache.put(f"cv{i}", {"projects": [{"title": str(i), "text": str(i)}]})
+        await cache.put("cv4", {"projects": []})
+        assert [await cache.get(f"cv{i}") is not None for i in range(5)] == [False, False, True, True, True]
+        assert cache.stats()["disk_entries"] == 3
+        cache.close()
+
+        # The bound holds across restarts
+        reopened = ParseCache(max_bytes=0, path=path, disk_max_entries=2)
+        await reopened.put("cv5", {})
+        assert [await reopened.get(f"cv{i}") is not None for i in (3, 4, 5)] == [False, True, True]
+        reopened.close()
+
+    asyncio.run(scenario())
+
+
+def test_busy_disk_tier_does_not_block_memory_hits(tmp_path):
+    async def scenario():
+        cache = ParseCache(path=str(tmp_path / "parse_cache.sqlite3"))
+        await cache.put("hot", {"skills": []})
+        # A slow disk read or write holds the SQLite tier
+        cache._db_lock.acquire()
+        asyncio.get_running_loop().call_later(0.2, cache._db_lock.release)
+        cold = asyncio.ensure_future(cache.get("cold"))
+        hot = await asyncio.wait_for(cache.get("hot"), 0.1)
+        assert not cold.done()
+        assert await cold is None
+        cache.close()
+        return hot
+
+    assert asyncio.run(scenario()) == {"skills": []}
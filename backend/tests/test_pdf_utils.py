@@ -0,0 +1,69 @@
+# backend/tests/test_pdf_utils.py
+"""Queue bounds of the shared PDF extractor."""
+
+import asyncio
+import os
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from utils.pdf_utils import PdfExtractor
+
+release = threading.Event()
+
+
+def _uncancellable(source, cancel_event):
+    # Like a running process-pool job: ignores cancel_event until it is done
+    release.wait(5)
+    return "text", {"started_at": 0.0, "open": 0.0, "extract": 0.0, "pages": 1, "page_count": 1}
+
+
+def test_abandoned_job_keeps_its_slot_until_the_pool_finishes_it():
+    async def scenario():
+        extractor = PdfExtractor(kind="thread", max_workers=1, max_queue=0)
+        caller = asyncio.create_task(extractor.run(_uncancellable, b"%PDF"))
+        await asyncio.sleep(0.05)
+        caller.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+
+        # The worker is still busy with the abandoned job, so there is no room
+        with pytest.raises(HTTPException) as rejected:
+            await extractor.run(_uncancellable, b"%PDF")
+        assert rejected.value.status_code == 503
+
+        release.set()
+        for _ in range(100):
+            if extractor.stats()["pending"] == 0:
+                break
+            await asyncio.sleep(0.01)
+        stats = extractor.stats()
+        assert (stats["pending"], stats["cancelled"], stats["rejected"]) == (0, 1, 1)
+        assert await extractor.run(_uncancellable, b"%PDF") == "text"
+        extractor.shutdown()
+
+    release.clear()
+    asyncio.run(scenario())
+
+
+def _crash(source, cancel_event):
+    os._exit(1)
+
+
+def _extract(source, cancel_event):
+    return "text", {"started_at": 0.0, "open": 0.0, "extract": 0.0, "pages": 1, "page_count": 1}
+
+
+def test_pool_is_rebuilt_after_a_worker_dies():
+    async def scenario():
+        extractor = PdfExtractor(kind="process", max_workers=1, max_queue=1)
+        with pytest.raises(HTTPException) as crashed:
+            await extractor.run(_crash, b"%PDF")
+        assert crashed.value.status_code == 503
+        assert await extractor.run(_extract, b"%PDF") == "text"
+        stats = extractor.stats()
+        assert (stats["pool_restarts"], stats["pending"], stats["failed"], stats["completed"]) == (1, 0, 1, 1)
+        extractor.shutdown()
+
+    asyncio.run(scenario())
@@ -0,0 +1,59 @@
+# backend/tests/test_question_bank.py
+"""Deduplication of precompute jobs per CV."""
+
+import asyncio
+import json
+
+from utils.question_bank import PrecomputeItem, QuestionBank
+from utils.response_cache import MemoryBackend, ResponseCache
+
+
+class FakeClient:
+    def __init__(self):
+        self.prompts = []
+
+    async def generate_content(self, contents, json_response=True):
+        prompt = contents[0]["parts"][0]["text"]
+        self.prompts.append(prompt)
+        entries = prompt.count("\nTitle: ")
+        return json.dumps([{"entry": n, "next_question": f"Q{n}?", "points": ["p"]} for n in range(1, entries + 1)])
+
+
+def item(name: str) -> PrecomputeItem:
+    return PrecomputeItem(name, f"{name} text", f"fq:{name}", f"qr:{name}")
+
+
+def test_full_precompute_after_a_subset_one_adds_the_missing_entries():
+    async def scenario():
+        bank = QuestionBank(ResponseCache(MemoryBackend()), batch_size=10)
+        client = FakeClient()
+        # e.g. /parse-cv?sections=skills&precompute=true: nothing to precompute
+        subset = bank.schedule("cv", [], client)
+        await subset.task
+        assert subset.state == "done"
+
+        job = bank.schedule("cv", [item("a"), item("b")], client)
+        await job.task
+        again = bank.schedule("cv", [item("a"), item("b")], client)
+        await again.task
+        return job, again, client
+
+    job, again, client = asyncio.run(scenario())
+    assert again is job
+    assert job.status()["entries"] == 2 and job.done == 2 and job.state == "done"
+    assert len(client.prompts) == 1
+
+
+def test_entries_added_while_a_job_runs_are_precomputed_after_it():
+    async def scenario():
+        bank = QuestionBank(ResponseCache(MemoryBackend()), batch_size=10)
+        client = FakeClient()
+        job = bank.schedule("cv", [item("a")], client)
+        assert bank.schedule("cv", [item("a"), item("b")], client) is job
+        await job.task
+        return job, await bank.cache.peek("fq:b"), client
+
+    job, first_question, client = asyncio.run(scenario())
+    assert job.state == "done" and job.done == 2
+    assert first_question == {"next_question": "Q1?"}
+    assert len(client.prompts) == 2
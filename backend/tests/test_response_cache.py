@@ -0,0 +1,32 @@
+# backend/tests/test_response_cache.py
+"""SQLite response-cache backend calls stay off the event loop."""
+
+import asyncio
+
+from utils.response_cache import ResponseCache, SqliteBackend
+
+
+def test_busy_sqlite_backend_does_not_block_the_event_loop(tmp_path):
+    async def scenario():
+        cache = ResponseCache(SqliteBackend(str(tmp_path / "response_cache.sqlite3")))
+        await cache.set("key", {"points": ["a"]})
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        # Another request holds the connection
+        cache.backend._lock.acquire()
+        asyncio.get_running_loop().call_later(0.2, cache.backend._lock.release)
+        ticking = asyncio.create_task(ticker())
+        value = await cache.get_or_compute("key", lambda: asyncio.sleep(0, {"points": ["b"]}))
+        ticking.cancel()
+        cache.close()
+        return ticks, value
+
+    ticks, value = asyncio.run(scenario())
+    assert ticks >= 5
+    assert value == {"points": ["a"]}
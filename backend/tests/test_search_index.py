@@ -0,0 +1,50 @@
+# backend/tests/test_search_index.py
+"""Consistency of SearchIndex queries under concurrent re-indexing."""
+
+from utils.search_index import SearchIndex, get_search_index
+
+
+class _Rows(list):
+    def fetchall(self):
+        return list(self)
+
+
+class _ReindexAfterRanking:
+    """Reader connection that lets a re-index commit right after the rank query."""
+
+    def __init__(self, db, reindex):
+        self._db = db
+        self._reindex = reindex
+
+    def execute(self, sql, params=()):
+        cursor = self._db.execute(sql, params)
+        if "bm25(" in sql:
+            rows = _Rows(cursor.fetchall())
+            self._reindex()
+            return rows
+        return cursor
+
+    def rollback(self):
+        self._db.rollback()
+
+
+def test_reindex_between_rank_and_page_queries(tmp_path):
+    index = SearchIndex(str(tmp_path / "index.sqlite3"))
+    try:
+        index.index("a" * 64, "a.pdf", {"projects": [{"title": "Stream processor", "text": "Flink and Kafka"}]}).result()
+        db = index._reader()
+        index._readers.db = _ReindexAfterRanking(
+            db, lambda: index.index("a" * 64, None, {"projects": [{"title": "Web app", "text": "Django"}]}).result()
+        )
+        results = index.search("flink")
+        assert [(r["filename"], r["title"]) for r in results] == [("a.pdf", "Stream processor")]
+        index._readers.db = db
+        assert index.search("flink") == []
+        assert [r["title"] for r in index.search("django")] == ["Web app"]
+    finally:
+        index.close()
+
+
+def test_disabled_by_default(monkeypatch):
+    monkeypatch.delenv("SEARCH_INDEX_PATH", raising=False)
+    assert get_search_index() is None
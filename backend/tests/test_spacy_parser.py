@@ -0,0 +1,45 @@
+# backend/tests/test_spacy_parser.py
+"""nlp.pipe batching of spaCy-mode parses."""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("spacy")
+
+from utils import spacy_parser
+
+CV = "Projects\nChatApp | Python\nBuilt a chat app\n\nSearch | Rust\nIndexed docs\nExperience\nEngineer at Acme\nDid things"
+
+
+@pytest.fixture(autouse=True)
+def blank_model(monkeypatch):
+    # No model download needed: matching headers only uses the tokenizer
+    monkeypatch.setattr(spacy_parser, "SPACY_MODEL", "blank:en")
+    monkeypatch.setattr(spacy_parser, "_nlp", None)
+    monkeypatch.setattr(spacy_parser, "_matcher", None)
+
+
+def test_batch_matches_single_parses():
+    texts = [CV, CV.replace("ChatApp", "Compiler"), "No headers here"]
+    assert spacy_parser.parse_cvs_with_spacy(texts) == [spacy_parser.parse_cv_with_spacy(t) for t in texts]
+
+
+def test_group_tokenizes_a_wave_in_one_pipe_call():
+    group = spacy_parser.SpacyPipeGroup()
+    texts = [CV.replace("ChatApp", f"App{i}") for i in range(6)]
+
+    async def member(i):
+        with group.member() as m:
+            # Staggered "extraction"; one member has no text to parse (e.g. a cache hit)
+            await asyncio.sleep(0.01 * i)
+            if i == 5:
+                return None
+            return await m.parse(texts[i])
+
+    async def scenario():
+        return await asyncio.gather(*(member(i) for i in range(6)))
+
+    results = asyncio.run(scenario())
+    assert results == [spacy_parser.parse_cv_with_spacy(t) for t in texts[:5]] + [None]
+    assert group.stats() == {"parses": 5, "pipe_calls": 1}
@@ -0,0 +1,30 @@
+# backend/tests/test_uploads.py
+"""413 responses of the upload size middleware."""
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from utils.uploads import MULTIPART_OVERHEAD, UploadLimitMiddleware
+
+
+def _client(limit: int) -> TestClient:
+    app = FastAPI()
+
+    @app.post("/upload")
+    async def upload(request: Request):
+        return {"bytes": len(await request.body())}
+
+    app.add_middleware(UploadLimitMiddleware, limits={"/upload": limit})
+    return TestClient(app)
+
+
+def test_rejection_reports_the_configured_limit():
+    client = _client(100_000)
+    # Multipart framing is allowed on top of the limit
+    assert client.post("/upload", content=b"x" * (100_000 + MULTIPART_OVERHEAD)).status_code == 200
+
+    declared = client.post("/upload", content=b"x" * (100_001 + MULTIPART_OVERHEAD))
+    streamed = client.post("/upload", content=iter([b"x" * (100_001 + MULTIPART_OVERHEAD)]))
+    for response in (declared, streamed):
+        assert response.status_code == 413
+        assert response.json() == {"detail": "Upload exceeds the 100000 byte limit."}
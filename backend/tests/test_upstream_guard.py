@@ -0,0 +1,59 @@
+# backend/tests/test_upstream_guard.py
+"""Circuit breaker accounting of upstream timeouts in GeminiClient."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from utils.ai_clients import GeminiClient
+from utils.upstream_guard import AdaptiveRateLimiter, CircuitBreaker, UpstreamGuard, UpstreamUnavailable, request_deadline
+
+
+def hanging_client(latency_target: float, calls: list) -> GeminiClient:
+    """A client whose upstream never answers: every attempt runs into its read timeout."""
+
+    async def hang(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        await asyncio.sleep(request.extensions["timeout"]["read"])
+        raise httpx.ReadTimeout("upstream hung", request=request)
+
+    guard = UpstreamGuard(AdaptiveRateLimiter(latency_target=latency_target), CircuitBreaker(failure_threshold=3, cooldown=60))
+    client = GeminiClient(api_key="test", max_retries=0, timeout=90.0, guard=guard)
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(hang))
+    return client
+
+
+async def call_within(client: GeminiClient, deadline: float) -> None:
+    with request_deadline(deadline):
+        await client.generate_content([{"role": "user", "parts": [{"text": "hi"}]}])
+
+
+def test_hanging_upstream_opens_breaker():
+    async def scenario():
+        calls = []
+        client = hanging_client(latency_target=0.05, calls=calls)
+        for _ in range(3):
+            with pytest.raises(httpx.TimeoutException):
+                await call_within(client, 0.2)
+        assert client.guard.breaker.state == CircuitBreaker.OPEN
+        with pytest.raises(UpstreamUnavailable) as refused:
+            await call_within(client, 0.2)
+        assert refused.value.reason == "circuit_open"
+        assert len(calls) == 3
+        await client.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_short_deadline_timeout_is_not_an_upstream_failure():
+    async def scenario():
+        client = hanging_client(latency_target=10.0, calls=[])
+        for _ in range(5):
+            with pytest.raises(httpx.TimeoutException):
+                await call_within(client, 0.05)
+        assert client.guard.breaker.state == CircuitBreaker.CLOSED
+        assert client.guard.breaker.consecutive_failures == 0
+        await client.aclose()
+
+    asyncio.run(scenario())
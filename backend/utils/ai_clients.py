@@ -0,0 +1,350 @@
+# backend/utils/ai_clients.py
+"""
+Shared Gemini client used by every AI endpoint.
+
+One `GeminiClient` is created on the first AI call and closed at shutdown, so
+all requests reuse the same pooled (HTTP/2 when `h2` is installed) keep-alive
+connections instead of paying a TCP+TLS handshake per call. A semaphore caps
+in-flight upstream calls, and 429/5xx responses are retried with jittered
+exponential backoff that honours `Retry-After`. Each attempt is admitted by an
+`UpstreamGuard` (utils.upstream_guard: adaptive rate limit, circuit breaker,
+request deadline), which caps the attempt's timeout at the time left and raises
+`UpstreamUnavailable` instead of letting a doomed call wait. httpx is imported
+with the client, keeping it (and its TLS setup) out of worker start-up.
+
+Configuration:
+- GEMINI_API_KEY           API key (sent as the x-goog-api-key header)
+- GEMINI_MODEL             model name (default gemini-1.5-flash-latest)
+- GEMINI_MAX_CONCURRENCY   max in-flight upstream calls (default 16)
+- GEMINI_MAX_RETRIES       retries on 429/5xx/transport errors (default 3)
+- GEMINI_BASE_URL          API root (default the public v1beta endpoint); point it
+                           at benchmarks/mock_gemini.py for load tests
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Optional
+
+from utils.metrics import UPSTREAM_INFLIGHT, UPSTREAM_RETRIES, UPSTREAM_SECONDS, observe_stage
+from utils.upstream_guard import UpstreamGuard, deadline_remaining, guard_from_env
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+GEMINI_BASE_URL = "https://generativelanguage.googleapis.com/v1beta"
+DEFAULT_MODEL = "gemini-1.5-flash-latest"
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class _InflightSemaphore(asyncio.Semaphore):
+    """Semaphore that mirrors the number of held slots in the upstream_ai_inflight gauge."""
+
+    async def __aenter__(self):
+        await super().__aenter__()
+        UPSTREAM_INFLIGHT.inc()
+
+    async def __aexit__(self, *exc):
+        UPSTREAM_INFLIGHT.dec()
+        await super().__aexit__(*exc)
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _retry_after_seconds(response: "httpx.Response") -> Optional[float]:
+    """Parse a Retry-After header given either as seconds or as an HTTP date."""
+    value = response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class GeminiClient:
+    """
+    Pooled async client for the Gemini `generateContent` API.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str],
+        model: str = DEFAULT_MODEL,
+        base_url: str = GEMINI_BASE_URL,
+        max_concurrency: int = 16,
+        max_retries: int = 3,
+        timeout: float = 90.0,
+        backoff_base: float = 0.5,
+        backoff_cap: float = 8.0,
+        max_retry_after: float = 30.0,
+        guard: Optional[UpstreamGuard] = None,
+    ):
+        import httpx
+
+        self.api_key = api_key
+        self.model = model
+        self.base_url = base_url.rstrip("/")
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.max_retry_after = max_retry_after
+        self.timeout = timeout
+        self.guard = guard or UpstreamGuard()
+        self._semaphore = _InflightSemaphore(max_concurrency)
+        http2 = _http2_available()
+        if not http2:
+            logger.warning("h2 not installed; Gemini client falls back to HTTP/1.1 keep-alive")
+        self._client = httpx.AsyncClient(
+            http2=http2,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_concurrency,
+                max_keepalive_connections=max_concurrency,
+                keepalive_expiry=60.0,
+            ),
+            headers={"x-goog-api-key": api_key or ""},
+        )
+
+    def _backoff(self, attempt: int) -> float:
+        # "Full jitter" exponential backoff
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    def _retry_delay(self, attempt: int, response: Optional["httpx.Response"] = None) -> Optional[float]:
+        """
+        Seconds to wait before retrying, or None if the failure should be surfaced.
+
+        `response` is None for transport errors.
+        """
+        if attempt >= self.max_retries:
+            return None
+        if response is None:
+            return self._backoff(attempt)
+        if response.status_code not in RETRYABLE_STATUS:
+            return None
+        retry_after = _retry_after_seconds(response)
+        if retry_after is None:
+            return self._backoff(attempt)
+        # Upstream wants us to back off longer than any request should wait
+        return retry_after if retry_after <= self.max_retry_after else None
+
+    def _attempt_timeout(self) -> float:
+        """Timeout of the next attempt: the client timeout, capped at the request deadline."""
+        remaining = self.guard.check_deadline()
+        return self.timeout if remaining is None else min(self.timeout, remaining)
+
+    def _record_transport_error(self, error: Exception, seconds: float) -> None:
+        """
+        Count a failed attempt against the breaker. A timeout is skipped only when
+        the request deadline ran out before upstream had `latency_target` seconds:
+        a short caller deadline says nothing about upstream health, but an attempt
+        that waited that long without an answer does.
+        """
+        import httpx
+
+        remaining = deadline_remaining()
+        if (
+            isinstance(error, httpx.TimeoutException)
+            and remaining is not None
+            and remaining <= 0
+            and seconds < self.guard.limiter.latency_target
+        ):
+            return
+        self.guard.record(None, seconds)
+
+    def _give_up(self, response: Optional["httpx.Response"], delay: Optional[float]) -> bool:
+        """
+        Whether to surface the failure instead of retrying (`delay` is None once
+        retries are exhausted). A 429 that is not retried, or any failure whose
+        retry would overrun the request deadline, becomes UpstreamUnavailable so
+        it is answered like a shed call rather than as an upstream error.
+        """
+        if delay is not None and self.guard.fits(delay):
+            return False
+        if response is not None and response.status_code == 429:
+            raise self.guard.refuse("throttled", retry_after=_retry_after_seconds(response) or delay or 1.0)
+        if delay is not None:
+            raise self.guard.refuse("deadline")
+        return True
+
+    def _url(self, method: str) -> str:
+        return f"{self.base_url}/models/{self.model}:{method}"
+
+    async def post(self, method: str, payload: Dict[str, Any]) -> "httpx.Response":
+        """
+        POST `payload` to `models/{model}:{method}` with concurrency limiting and retries.
+
+        Raises httpx.HTTPStatusError once retries are exhausted, like `raise_for_status`,
+        and UpstreamUnavailable when the guard refuses the call.
+        """
+        import httpx
+
+        attempt = 0
+        started = time.perf_counter()
+        try:
+            while True:
+                await self.guard.admit()
+                try:
+                    with self.guard.breaker.attempt():
+                        async with self._semaphore:
+                            timeout = self._attempt_timeout()
+                            attempt_start = time.perf_counter()
+                            try:
+                                response = await self._client.post(self._url(method), json=payload, timeout=timeout)
+                            except httpx.TransportError as e:
+                                seconds = time.perf_counter() - attempt_start
+                                UPSTREAM_SECONDS.labels(method, "error").observe(seconds)
+                                self._record_transport_error(e, seconds)
+                                raise
+                            seconds = time.perf_counter() - attempt_start
+                            UPSTREAM_SECONDS.labels(method, str(response.status_code)).observe(seconds)
+                            self.guard.record(response.status_code, seconds)
+                except httpx.TransportError as e:
+                    delay = self._retry_delay(attempt)
+                    if self._give_up(None, delay):
+                        raise
+                    UPSTREAM_RETRIES.labels(method, "transport").inc()
+                    logger.warning(f"Gemini transport error ({e!r}), retrying in {delay:.2f}s")
+                else:
+                    if response.is_success:
+                        return response
+                    delay = self._retry_delay(attempt, response)
+                    if self._give_up(response, delay):
+                        response.raise_for_status()
+                    UPSTREAM_RETRIES.labels(method, str(response.status_code)).inc()
+                    logger.warning(f"Gemini returned {response.status_code}, retrying in {delay:.2f}s")
+                attempt += 1
+                await asyncio.sleep(delay)
+        finally:
+            # Whole call including retries and backoff, as seen by the endpoint
+            observe_stage("upstream_ai", time.perf_counter() - started)
+
+    async def stream_generate_content(self, contents: List[Dict[str, Any]], json_response: bool = True) -> AsyncIterator[str]:
+        """
+        Call `streamGenerateContent` over SSE and yield text chunks as they arrive.
+
+        Retries only happen before the first chunk; once text has been yielded a
+        failure is raised to the caller. The concurrency slot is held for the
+        whole stream, and the request deadline caps each read's timeout.
+        """
+        import httpx
+
+        payload: Dict[str, Any] = {"contents": contents}
+        if json_response:
+            payload["generationConfig"] = {"response_mime_type": "application/json"}
+        url = self._url("streamGenerateContent")
+        attempt = 0
+        started = False
+        while True:
+            delay = None
+            await self.guard.admit()
+            answered = False
+            try:
+                with self.guard.breaker.attempt():
+                    async with self._semaphore:
+                        timeout = self._attempt_timeout()
+                        attempt_start = time.perf_counter()
+                        try:
+                            async with self._client.stream(
+                                "POST", url, params={"alt": "sse"}, json=payload, timeout=timeout
+                            ) as response:
+                                # Time to response headers; the body is streamed to the client
+                                seconds = time.perf_counter() - attempt_start
+                                answered = True
+                                UPSTREAM_SECONDS.labels("streamGenerateContent", str(response.status_code)).observe(seconds)
+                                self.guard.record(response.status_code, seconds)
+                                if response.is_success:
+                                    async for line in response.aiter_lines():
+                                        if not line.startswith("data:"):
+                                            continue
+                                        chunk = json.loads(line[len("data:"):])
+                                        for candidate in chunk.get("candidates", [])[:1]:
+                                            for part in candidate.get("content", {}).get("parts", []):
+                                                if part.get("text"):
+                                                    started = True
+                                                    yield part["text"]
+                                    return
+                                await response.aread()
+                                delay = self._retry_delay(attempt, response)
+                                if self._give_up(response, delay):
+                                    response.raise_for_status()
+                                UPSTREAM_RETRIES.labels("streamGenerateContent", str(response.status_code)).inc()
+                                logger.warning(f"Gemini stream returned {response.status_code}, retrying in {delay:.2f}s")
+                        except httpx.TransportError as e:
+                            if not answered:
+                                self._record_transport_error(e, time.perf_counter() - attempt_start)
+                            raise
+            except httpx.TransportError as e:
+                delay = None if started else self._retry_delay(attempt)
+                if self._give_up(None, delay):
+                    raise
+                UPSTREAM_RETRIES.labels("streamGenerateContent", "transport").inc()
+                logger.warning(f"Gemini stream transport error ({e!r}), retrying in {delay:.2f}s")
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def generate(self, contents: List[Dict[str, Any]], generation_config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Call `generateContent` and return the decoded JSON body."""
+        payload: Dict[str, Any] = {"contents": contents}
+        if generation_config is not None:
+            payload["generationConfig"] = generation_config
+        response = await self.post("generateContent", payload)
+        return response.json()
+
+    async def generate_content(self, contents: List[Dict[str, Any]], json_response: bool = True) -> str:
+        """Call `generateContent` and return the text of the first candidate."""
+        config = {"response_mime_type": "application/json"} if json_response else None
+        result = await self.generate(contents, config)
+        return result["candidates"][0]["content"]["parts"][0]["text"]
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+_client: Optional[GeminiClient] = None
+
+
+def init_gemini_client() -> GeminiClient:
+    """Create the app-wide client from env config."""
+    global _client
+    if _client is None:
+        _client = GeminiClient(
+            api_key=os.getenv("GEMINI_API_KEY"),
+            model=os.getenv("GEMINI_MODEL", DEFAULT_MODEL),
+            base_url=os.getenv("GEMINI_BASE_URL", GEMINI_BASE_URL),
+            max_concurrency=int(os.getenv("GEMINI_MAX_CONCURRENCY", "16")),
+            max_retries=int(os.getenv("GEMINI_MAX_RETRIES", "3")),
+            guard=guard_from_env(),
+        )
+    return _client
+
+
+def get_gemini_client() -> GeminiClient:
+    """Return the app-wide client, creating it on first use."""
+    return _client or init_gemini_client()
+
+
+async def close_gemini_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
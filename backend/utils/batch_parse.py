@@ -0,0 +1,188 @@
+# backend/utils/batch_parse.py
+"""
+Helpers for bulk CV parsing (/parse-cv/batch).
+
+Uploads are unpacked into (filename, spooled PDF) pairs under hard limits and
+then parsed concurrently; results are streamed as NDJSON in completion order.
+PDFs and zip members are copied in chunks (see utils.uploads), so a batch
+never sits in memory as a whole.
+
+- BATCH_MAX_FILES        max PDFs per batch, including zip members (default 50)
+- BATCH_MAX_BYTES        max total PDF bytes per batch (default 50 MiB)
+- BATCH_CONCURRENCY      PDFs of one batch parsed at once (default: PDF pool workers)
+"""
+
+import asyncio
+import os
+import zipfile
+import zlib
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+import orjson
+from fastapi import HTTPException, UploadFile
+from starlette.concurrency import run_in_threadpool
+
+from utils.uploads import SpooledPdf, spool_stream, spool_upload
+
+ZIP_CONTENT_TYPES = {"application/zip", "application/x-zip-compressed"}
+
+# A file of the batch: its spooled PDF, or the error reported for it instead
+BatchEntry = Tuple[str, Union[SpooledPdf, HTTPException]]
+
+
+class BatchLimits:
+    """Per-batch resource limits, read from the environment by default."""
+
+    def __init__(self, max_files: Optional[int] = None, max_bytes: Optional[int] = None, concurrency: Optional[int] = None):
+        self.max_files = max_files or int(os.getenv("BATCH_MAX_FILES", "50"))
+        self.max_bytes = max_bytes or int(os.getenv("BATCH_MAX_BYTES", str(50 * 1024 * 1024)))
+        concurrency = concurrency or os.getenv("BATCH_CONCURRENCY")
+        self.concurrency = int(concurrency) if concurrency else None
+
+
+def _is_zip(file: UploadFile) -> bool:
+    return file.content_type in ZIP_CONTENT_TYPES or (file.filename or "").lower().endswith(".zip")
+
+
+async def collect_batch_pdfs(files: List[UploadFile], limits: BatchLimits) -> List[BatchEntry]:
+    """
+    Unpack multipart PDFs and zip archives into (filename, SpooledPdf) pairs.
+
+    Raises 400/413 before any parsing if the batch exceeds its limits. Non-PDF
+    entries, and zip members that turn out larger than the batch allows or
+    corrupt, are kept with an HTTPException so they are reported as per-file
+    errors. Zip members are size-checked from the archive directory before
+    they are decompressed. The caller owns the returned entries and must close
+    them (stream_batch_results does).
+    """
+    entries: List[BatchEntry] = []
+    try:
+        await _collect(files, limits, entries)
+    except BaseException:
+        close_entries(entries)
+        raise
+    if not entries:
+        raise HTTPException(status_code=400, detail="No PDF files found in batch.")
+    return entries
+
+
+def close_entries(entries: List[BatchEntry]) -> None:
+    for _, upload in entries:
+        if isinstance(upload, SpooledPdf):
+            upload.close()
+
+
+async def _collect(files: List[UploadFile], limits: BatchLimits, entries: List[BatchEntry]) -> None:
+    total = 0
+
+    def admit(name: str, size: int) -> None:
+        nonlocal total
+        if len(entries) >= limits.max_files:
+            raise HTTPException(status_code=400, detail=f"Too many files in batch (max {limits.max_files}).")
+        total += size
+        if total > limits.max_bytes:
+            raise HTTPException(status_code=413, detail=f"Batch exceeds {limits.max_bytes} bytes.")
+
+    for file in files:
+        name = file.filename or "upload"
+        if _is_zip(file):
+            if file.size is not None and file.size > limits.max_bytes:
+                raise HTTPException(status_code=413, detail=f"Batch exceeds {limits.max_bytes} bytes.")
+            # Read the archive straight from the multipart spool file
+            await file.seek(0)
+            try:
+                archive = zipfile.ZipFile(file.file)
+            except zipfile.BadZipFile:
+                raise HTTPException(status_code=400, detail=f"{name} is not a valid zip archive.")
+            with archive:
+                for info in archive.infolist():
+                    if info.is_dir() or os.path.basename(info.filename).startswith("."):
+                        continue
+                    if not info.filename.lower().endswith(".pdf"):
+                        continue
+                    admit(info.filename, info.file_size)
+                    # Caps the decompressed size too, in case the directory lies
+                    budget = limits.max_bytes - total + info.file_size
+
+                    def extract(info=info, budget=budget) -> SpooledPdf:
+                        with archive.open(info) as member:
+                            upload = spool_stream(member, budget)
+                        upload.filename = info.filename
+                        return upload
+
+                    # A bad member fails on its own line; the rest of the batch still parses
+                    try:
+                        upload = await run_in_threadpool(extract)
+                    except HTTPException as e:
+                        if e.status_code != 413:
+                            raise
+                        entries.append((info.filename, HTTPException(
+                            status_code=413, detail=f"PDF exceeds the {limits.max_bytes} byte batch limit.",
+                        )))
+                        continue
+                    except (zipfile.BadZipFile, zlib.error, EOFError) as e:
+                        entries.append((info.filename, HTTPException(
+                            status_code=400, detail=f"Corrupt zip member: {e}",
+                        )))
+                        continue
+                    entries.append((info.filename, upload))
+                    total += upload.size - info.file_size
+        elif file.content_type == "application/pdf":
+            if file.size is not None and total + file.size > limits.max_bytes:
+                raise HTTPException(status_code=413, detail=f"Batch exceeds {limits.max_bytes} bytes.")
+            admit(name, 0)
+            try:
+                upload = await spool_upload(file, max_bytes=max(1, limits.max_bytes - total))
+            except HTTPException as e:
+                if e.status_code == 413:
+                    raise HTTPException(status_code=413, detail=f"Batch exceeds {limits.max_bytes} bytes.")
+                raise
+            entries.append((name, upload))
+            total += upload.size
+        else:
+            admit(name, 0)
+            entries.append((name, HTTPException(status_code=415, detail="Only PDF files are accepted.")))
+
+
+async def stream_batch_results(
+    entries: List[BatchEntry],
+    parse: Callable[[SpooledPdf], Awaitable[Dict]],
+    concurrency: int,
+) -> AsyncIterator[bytes]:
+    """
+    Parse every entry with at most `concurrency` in flight, yielding one NDJSON
+    line per file as it completes, then a summary line.
+
+    Pending work is cancelled if the consumer stops early (client disconnect),
+    and every entry is closed once the stream ends.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(index: int, name: str, data: Union[SpooledPdf, HTTPException]) -> Dict:
+        result: Dict = {"index": index, "filename": name}
+        if isinstance(data, HTTPException):
+            return {**result, "status": data.status_code, "error": data.detail}
+        async with semaphore:
+            try:
+                result["sections"] = await parse(data)
+                result["status"] = 200
+            except HTTPException as e:
+                result.update(status=e.status_code, error=e.detail)
+            except Exception as e:
+                result.update(status=500, error=f"Error processing PDF: {e}")
+        return result
+
+    tasks = [asyncio.create_task(run(i, name, data)) for i, (name, data) in enumerate(entries)]
+    succeeded = 0
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            result = await next_done
+            succeeded += result["status"] == 200
+            yield orjson.dumps(result) + b"\n"
+        yield orjson.dumps({"summary": {"files": len(entries), "succeeded": succeeded, "failed": len(entries) - succeeded}}) + b"\n"
+    finally:
+        for task in tasks:
+            task.cancel()
+        # Let cancelled parses unwind before their spool files are removed
+        await asyncio.gather(*tasks, return_exceptions=True)
+        close_entries(entries)
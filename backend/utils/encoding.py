@@ -0,0 +1,198 @@
+# backend/utils/encoding.py
+"""
+Response encoding: orjson bodies, compact parse results and compression.
+
+- `OrjsonResponse` renders JSON with orjson, which is several times faster than
+  `json.dumps` on parse results; it is the app's default response class
+- `shape_sections` applies `/parse-cv?fields=` and `?compact=true` to a
+  parse result. Compact items carry the title as [start, end] offsets into the
+  item text instead of repeating it. The canonical schema is `CvSections` in
+  main.py; these options only change how it is encoded
+- `CompressionMiddleware` compresses JSON/NDJSON/text bodies with brotli or gzip,
+  whichever the client prefers (brotli only when the `Brotli` package is
+  installed). Complete bodies are compressed when larger than
+  COMPRESSION_MIN_BYTES; streamed bodies (batch NDJSON) chunk by chunk with a
+  flush after each, so lines still arrive as they are produced. Server-Sent
+  Events are never compressed
+
+- COMPRESSION_MIN_BYTES   smallest complete body worth compressing (default 1024)
+- COMPRESSION_ENCODINGS   encodings offered, in order of preference (default "br,gzip"; empty disables)
+"""
+
+import os
+import zlib
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import orjson
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+
+FIELDS = ("title", "text")
+
+_COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "application/problem+json", "text/")
+GZIP_LEVEL = 6
+# Quality 11 (brotli's default) is far too slow for on-the-fly compression
+BROTLI_QUALITY = 4
+
+Sections = Dict[str, List[Dict[str, str]]]
+
+
+class OrjsonResponse(JSONResponse):
+    """JSONResponse rendered by orjson."""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content)
+
+
+def parse_fields_param(value: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Parse a `fields=title,text` query value; None means every field."""
+    if value is None or not value.strip():
+        return None
+    fields = tuple(dict.fromkeys(f.strip().lower() for f in value.split(",") if f.strip()))
+    unknown = [f for f in fields if f not in FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}. Valid fields: {', '.join(FIELDS)}")
+    return fields
+
+
+def title_span(item: Dict[str, str]) -> Optional[List[int]]:
+    """[start, end] of the item's title inside its text, or None if it is not a substring."""
+    start = item["text"].find(item["title"])
+    return None if start < 0 else [start, start + len(item["title"])]
+
+
+def shape_sections(parsed: Sections, fields: Optional[Sequence[str]] = None, compact: bool = False) -> Dict:
+    """
+    Encode a parse result for the wire.
+
+    `fields` keeps only those item fields. With `compact`, an item that keeps
+    its text gets its title as offsets into that text.
+    """
+    if fields is None and not compact:
+        return parsed
+    fields = FIELDS if fields is None else fields
+    keep_title, keep_text = "title" in fields, "text" in fields
+    shaped = {}
+    for name, items in parsed.items():
+        out = []
+        for item in items:
+            entry = {}
+            if keep_title:
+                span = title_span(item) if compact and keep_text else None
+                entry["title"] = item["title"] if span is None else span
+            if keep_text:
+                entry["text"] = item["text"]
+            out.append(entry)
+        shaped[name] = out
+    return shaped
+
+
+def _brotli_available() -> bool:
+    try:
+        import brotli  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def negotiate_encoding(accept_encoding: str, offered: Sequence[str]) -> Optional[str]:
+    """Pick the offered encoding with the highest q-value; ties go to the earlier offer."""
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            weights[name.strip().lower()] = q
+    best, best_q = None, 0.0
+    for encoding in offered:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class _Compressor:
+    """Incremental gzip or brotli stream."""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            import brotli
+
+            self._br = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._gz = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        if self.encoding == "br":
+            return self._br.process(data) + (self._br.finish() if final else self._br.flush())
+        return self._gz.compress(data) + self._gz.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+def _compressible(headers: Headers) -> bool:
+    if "content-encoding" in headers:
+        return False
+    content_type = headers.get("content-type", "").lower()
+    if content_type.startswith("text/event-stream"):
+        return False
+    return content_type.startswith(_COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    """Pure ASGI br/gzip compression that keeps streamed responses streaming."""
+
+    def __init__(self, app, min_bytes: Optional[int] = None, encodings: Optional[Sequence[str]] = None):
+        self.app = app
+        if min_bytes is None:
+            min_bytes = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+        if encodings is None:
+            encodings = [e.strip() for e in os.getenv("COMPRESSION_ENCODINGS", "br,gzip").split(",") if e.strip()]
+        self.min_bytes = min_bytes
+        self.encodings = [e for e in encodings if e == "gzip" or (e == "br" and _brotli_available())]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.encodings:
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor: Optional[_Compressor] = None
+
+        async def send_wrapper(message):
+            nonlocal start_message, compressor
+            if message["type"] == "http.response.start":
+                # Hold the headers until the first body chunk shows whether to compress
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start_message is not None:
+                headers = MutableHeaders(raw=start_message["headers"])
+                if _compressible(headers):
+                    headers.add_vary_header("Accept-Encoding")
+                    if more_body or len(body) >= self.min_bytes:
+                        compressor = _Compressor(encoding)
+                        headers["Content-Encoding"] = encoding
+                        if "content-length" in headers:
+                            del headers["content-length"]
+                await send(start_message)
+                start_message = None
+            if compressor is not None:
+                message = {"type": "http.response.body", "body": compressor.compress(body, not more_body),
+                           "more_body": more_body}
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
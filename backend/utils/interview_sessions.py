@@ -0,0 +1,187 @@
+# backend/utils/interview_sessions.py
+"""
+Server-held mock-interview sessions with bounded history.
+
+Replaying the full transcript every turn makes prompt size, token cost and
+latency grow linearly with the interview. A session instead keeps:
+
+- the most recent turns verbatim (INTERVIEW_KEEP_RECENT_TURNS, default 4)
+- a running summary of everything older, updated incrementally and cached on
+  the session, so each old turn is summarized once
+
+and folds further turns into the summary whenever the prompt would exceed
+INTERVIEW_PROMPT_BUDGET_CHARS. Clients send the `session_id` from the previous
+response plus their new answer instead of re-uploading the transcript.
+
+Sessions live in process memory (INTERVIEW_SESSION_TTL seconds,
+INTERVIEW_MAX_SESSIONS); a client whose session expired can resend its history.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from utils.ai_clients import GeminiClient
+
+logger = logging.getLogger(__name__)
+
+Turn = Dict[str, Optional[str]]
+
+
+def _turn_chars(turn: Turn) -> int:
+    return len(turn.get("question") or "") + len(turn.get("answer") or "")
+
+
+class InterviewSession:
+    """Transcript of one mock interview plus its compacted summary."""
+
+    def __init__(self, title: str, text: str, turns: Optional[List[Turn]] = None):
+        self.id = uuid.uuid4().hex
+        self.title = title
+        self.text = text
+        self.turns: List[Turn] = [dict(t) for t in turns or []]
+        self.summary = ""
+        # turns[:summarized_upto] are represented only by `summary`
+        self.summarized_upto = 0
+        # The last answer has not been answered by a response yet (its turn failed or is in flight)
+        self.awaiting_response = False
+        self.updated_at = time.time()
+        self.lock = asyncio.Lock()
+
+    def record_answer(self, answer: str) -> None:
+        """
+        Record the candidate's answer to the open question. An answer resent
+        before any response was recorded (a client retrying a failed turn)
+        replaces the previous one instead of adding a turn.
+        """
+        if self.turns and (not self.turns[-1].get("answer") or self.awaiting_response):
+            self.turns[-1]["answer"] = answer
+        else:
+            self.turns.append({"question": None, "answer": answer, "feedback": None})
+        self.awaiting_response = True
+
+    def record_response(self, result: Dict) -> None:
+        """Attach feedback to the answered turn and open the next question."""
+        if result.get("feedback") and self.turns:
+            self.turns[-1]["feedback"] = result["feedback"]
+        if result.get("next_question"):
+            self.turns.append({"question": result["next_question"], "answer": None, "feedback": None})
+        self.awaiting_response = False
+        self.updated_at = time.time()
+
+
+class InterviewSessionStore:
+    """In-memory LRU of interview sessions with idle expiry."""
+
+    def __init__(self, ttl: float = 3600.0, max_sessions: int = 10000):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, InterviewSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> Optional[InterviewSession]:
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            if session.updated_at + self.ttl < time.time():
+                del self._sessions[session_id]
+                return None
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def create(self, title: str, text: str, turns: Optional[List[Turn]] = None) -> InterviewSession:
+        session = InterviewSession(title, text, turns)
+        with self._lock:
+            self._sessions[session.id] = session
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return session
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+class HistoryCompactor:
+    """
+    Keeps recent turns verbatim and rolls older ones into the session summary.
+    """
+
+    def __init__(self, keep_recent: int = 4, budget_chars: int = 12000, summary_max_chars: int = 1500):
+        self.keep_recent = keep_recent
+        self.budget_chars = budget_chars
+        self.summary_max_chars = summary_max_chars
+
+    def _fold_point(self, session: InterviewSession) -> int:
+        """Index of the first turn to keep verbatim."""
+        turns = session.turns
+        fold = max(session.summarized_upto, len(turns) - self.keep_recent)
+        # Follow-up prompts carry the title, the summary and the last answer a
+        # second time, but not the section text (only the first question does)
+        last_answer = (turns[-1].get("answer") or "") if turns else ""
+        fixed = len(session.title) + len(last_answer) + self.summary_max_chars
+        recent = sum(_turn_chars(t) for t in turns[fold:])
+        # Always keep the latest turn; it carries the answer being evaluated
+        while fold < len(turns) - 1 and fixed + recent > self.budget_chars:
+            recent -= _turn_chars(turns[fold])
+            fold += 1
+        return fold
+
+    async def compact(self, session: InterviewSession, client: GeminiClient) -> Tuple[str, List[Turn]]:
+        """Return (summary, verbatim recent turns) that fit the prompt budget."""
+        async with session.lock:
+            fold = self._fold_point(session)
+            if fold > session.summarized_upto:
+                folded = session.turns[session.summarized_upto:fold]
+                session.summary = await self._summarize(session, folded, client)
+                session.summarized_upto = fold
+            return session.summary, session.turns[session.summarized_upto:]
+
+    async def _summarize(self, session: InterviewSession, folded: List[Turn], client: GeminiClient) -> str:
+        transcript = "\n".join(
+            f"Q: {t.get('question') or ''}\nA: {t.get('answer') or ''}" for t in folded
+        )
+        prompt = (
+            f"You are keeping notes for a mock technical interview about '{session.title}'. "
+            f"Current notes: '{session.summary or 'none'}'. "
+            f"Update the notes with these new exchanges, keeping the topics covered and how well "
+            f"the candidate answered. Reply with plain text under {self.summary_max_chars} characters.\n\n"
+            f"{transcript}"
+        )
+        try:
+            summary = await client.generate_content([{"parts": [{"text": prompt}]}], json_response=False)
+        except Exception as e:
+            logger.warning(f"History summarization failed, falling back to truncation: {e}")
+            summary = f"{session.summary}\n{transcript}".strip()
+        # Keep the most recent notes if the model (or the fallback) overshoots
+        return summary.strip()[-self.summary_max_chars:]
+
+
+_store: Optional[InterviewSessionStore] = None
+_compactor: Optional[HistoryCompactor] = None
+
+
+def get_session_store() -> InterviewSessionStore:
+    global _store
+    if _store is None:
+        _store = InterviewSessionStore(
+            ttl=float(os.getenv("INTERVIEW_SESSION_TTL", "3600")),
+            max_sessions=int(os.getenv("INTERVIEW_MAX_SESSIONS", "10000")),
+        )
+    return _store
+
+
+def get_history_compactor() -> HistoryCompactor:
+    global _compactor
+    if _compactor is None:
+        _compactor = HistoryCompactor(
+            keep_recent=int(os.getenv("INTERVIEW_KEEP_RECENT_TURNS", "4")),
+            budget_chars=int(os.getenv("INTERVIEW_PROMPT_BUDGET_CHARS", "12000")),
+            summary_max_chars=int(os.getenv("INTERVIEW_SUMMARY_MAX_CHARS", "1500")),
+        )
+    return _compactor
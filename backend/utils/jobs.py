@@ -0,0 +1,429 @@
+# backend/utils/jobs.py
+"""
+Background job queue for parse and AI work (`/jobs`).
+
+Long requests (large PDFs, slow Gemini calls) hold an HTTP connection for
+their whole duration. As a job, the work is queued and the client gets a job id
+back immediately, then polls `GET /jobs/{id}` or follows the SSE stream at
+`GET /jobs/{id}/events`.
+
+- Workers are asyncio tasks in the app's event loop; CPU-bound work still runs on
+  the PDF extraction pool and Gemini calls on the shared client
+- Higher priorities are always served first; within a priority, users are served
+  round-robin so one client's burst cannot starve the others
+- The queue is bounded overall (503) and per user (429)
+- Job state and results are stored in SQLite, so any worker sharing the file can
+  answer a poll. Jobs are stamped with the id of the queue that owns them, and
+  each queue heartbeats into the file; unfinished jobs of a queue that stopped
+  heartbeating, or that a restart on the same host replaced, are marked failed
+- SQLite reads and commits run in the threadpool, so a busy file (5 s busy
+  timeout) never stalls the event loop
+
+- JOBS_DB_PATH             SQLite file for job state and results; the `/jobs` routes
+                           answer 503 and no queue is started while unset (default unset)
+- JOBS_WORKERS             jobs run concurrently per worker process (default 4)
+- JOBS_MAX_QUEUE           queued jobs per worker process before 503 (default 256)
+- JOBS_MAX_PER_USER        queued jobs per user (the client address) before 429 (default 32)
+- JOBS_TRUST_USER_HEADER   "1" to take the user from the X-User-Id header instead, only
+                           behind a proxy that sets it (default "0")
+- JOBS_RESULT_TTL          seconds finished jobs are kept (default 86400)
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, NamedTuple, Optional
+
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from utils.metrics import JOB_QUEUE_DEPTH, JOB_SECONDS
+
+logger = logging.getLogger(__name__)
+
+PRIORITIES = ("high", "normal", "low")
+FINISHED_STATES = ("done", "failed")
+
+JobHandler = Callable[[Any], Awaitable[Any]]
+
+_PURGE_INTERVAL = 60.0
+_HEARTBEAT_INTERVAL = 10.0
+# A queue that has not heartbeated for this long is considered gone
+_OWNER_TIMEOUT = 60.0
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class JobStore:
+    """SQLite table of jobs, shared by every worker process using the same file."""
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, kind TEXT NOT NULL, user TEXT NOT NULL, priority TEXT NOT NULL, "
+            "state TEXT NOT NULL, pid INTEGER NOT NULL, owner TEXT, meta TEXT, result TEXT, error TEXT, "
+            "status_code INTEGER, created_at REAL NOT NULL, started_at REAL, finished_at REAL)"
+        )
+        if "owner" not in {row[1] for row in self._db.execute("PRAGMA table_info(jobs)")}:
+            # Files created before jobs were stamped with their queue's instance id
+            self._db.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_finished_at ON jobs (finished_at)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS job_owners ("
+            "instance TEXT PRIMARY KEY, host TEXT NOT NULL, pid INTEGER NOT NULL, heartbeat_at REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    def _execute(self, sql: str, params=()) -> None:
+        with self._lock:
+            self._db.execute(sql, params)
+            self._db.commit()
+
+    def create(
+        self, job_id: str, kind: str, user: str, priority: str, meta: Optional[Dict[str, Any]], owner: str
+    ) -> None:
+        self._execute(
+            "INSERT INTO jobs (id, kind, user, priority, state, pid, owner, meta, created_at) "
+            "VALUES (?, ?, ?, ?, 'queued', ?, ?, ?, ?)",
+            (job_id, kind, user, priority, os.getpid(), owner, json.dumps(meta) if meta else None, time.time()),
+        )
+
+    def mark_running(self, job_id: str) -> None:
+        self._execute("UPDATE jobs SET state = 'running', started_at = ? WHERE id = ?", (time.time(), job_id))
+
+    def finish(self, job_id: str, result: Any = None, error: Optional[str] = None, status_code: int = 200) -> None:
+        self._execute(
+            "UPDATE jobs SET state = ?, result = ?, error = ?, status_code = ?, finished_at = ? WHERE id = ?",
+            (
+                "failed" if error is not None else "done",
+                json.dumps(result) if error is None else None,
+                error,
+                status_code,
+                time.time(),
+                job_id,
+            ),
+        )
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, kind, priority, state, meta, result, error, status_code, created_at, started_at, finished_at "
+                "FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        job = dict(zip(
+            ("id", "kind", "priority", "state", "meta", "result", "error", "status_code",
+             "created_at", "started_at", "finished_at"),
+            row,
+        ))
+        job["meta"] = json.loads(job["meta"]) if job["meta"] else None
+        job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+        return job
+
+    def heartbeat(self, instance: str) -> None:
+        """Record that the queue `instance` is alive."""
+        self._execute(
+            "INSERT INTO job_owners (instance, host, pid, heartbeat_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (instance) DO UPDATE SET heartbeat_at = excluded.heartbeat_at",
+            (instance, socket.gethostname(), os.getpid(), time.time()),
+        )
+
+    def remove_owner(self, instance: str) -> None:
+        self._execute("DELETE FROM job_owners WHERE instance = ?", (instance,))
+
+    def fail_orphaned(self, instance: str, owner_timeout: float = _OWNER_TIMEOUT) -> int:
+        """
+        Fail unfinished jobs of other queues that are gone (crash or restart).
+
+        A queue is gone when it has not heartbeated for `owner_timeout` seconds,
+        or at once when it ran on this host and its process is dead or has this
+        process's pid (a restarted container usually gets the same pid back).
+        Jobs without an owner predate instance ids and are always failed.
+        """
+        now, host, pid = time.time(), socket.gethostname(), os.getpid()
+        with self._lock:
+            owners = self._db.execute(
+                "SELECT DISTINCT j.owner, o.host, o.pid, o.heartbeat_at FROM jobs j "
+                "LEFT JOIN job_owners o ON o.instance = j.owner "
+                "WHERE j.state IN ('queued', 'running') AND j.owner IS NOT ?",
+                (instance,),
+            ).fetchall()
+        dead = [
+            owner
+            for owner, owner_host, owner_pid, heartbeat_at in owners
+            if heartbeat_at is None
+            or heartbeat_at < now - owner_timeout
+            or (owner_host == host and (owner_pid == pid or not _pid_alive(owner_pid)))
+        ]
+        failed = 0
+        for owner in dead:
+            with self._lock:
+                failed += self._db.execute(
+                    "UPDATE jobs SET state = 'failed', error = ?, status_code = 503, finished_at = ? "
+                    "WHERE owner IS ? AND state IN ('queued', 'running')",
+                    ("Server restarted before the job finished.", now, owner),
+                ).rowcount
+                self._db.execute("DELETE FROM job_owners WHERE instance IS ?", (owner,))
+                self._db.commit()
+        return failed
+
+    def purge(self, older_than: float) -> None:
+        self._execute("DELETE FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?", (older_than,))
+
+    def close(self) -> None:
+        self._db.close()
+
+
+class _Pending(NamedTuple):
+    id: str
+    kind: str
+    payload: Any
+    user: str
+    priority: str
+    enqueued_at: float
+    cleanup: Optional[Callable[[], None]]
+
+
+class JobQueue:
+    """Bounded in-process queue with strict priorities and per-user round-robin."""
+
+    def __init__(self, store: JobStore, workers: int = 4, max_queue: int = 256, max_per_user: int = 32,
+                 result_ttl: float = 86400.0):
+        self.store = store
+        self.workers = workers
+        self.max_queue = max_queue
+        self.max_per_user = max_per_user
+        self.result_ttl = result_ttl
+        # Stamped on this queue's jobs; unlike the pid, never reused by a later process
+        self.instance = uuid.uuid4().hex
+        self._handlers: Dict[str, JobHandler] = {}
+        # priority -> user -> that user's queued jobs; a served user moves to the back
+        self._queues: Dict[str, "OrderedDict[str, Deque[_Pending]]"] = {p: OrderedDict() for p in PRIORITIES}
+        self._queued = 0
+        self._queued_per_user: Dict[str, int] = {}
+        self._available = asyncio.Semaphore(0)
+        self._running: Dict[str, _Pending] = {}
+        # Ids of jobs queued or running in this process
+        self._local = set()
+        self._changed: Dict[str, asyncio.Event] = {}
+        self._tasks = []
+        self._last_purge = 0.0
+        self._stats = {"submitted": 0, "rejected": 0, "done": 0, "failed": 0}
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        self._handlers[kind] = handler
+
+    async def start(self) -> None:
+        await run_in_threadpool(self.store.heartbeat, self.instance)
+        await self._fail_orphaned()
+        await run_in_threadpool(self.store.purge, time.time() - self.result_ttl)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._heartbeat()))
+
+    async def _fail_orphaned(self) -> None:
+        orphaned = await run_in_threadpool(self.store.fail_orphaned, self.instance)
+        if orphaned:
+            logger.warning(f"Marked {orphaned} unfinished job(s) of a stopped worker as failed")
+
+    async def _heartbeat(self) -> None:
+        """Keep this queue's jobs owned, and fail those of workers that died since startup."""
+        while True:
+            await asyncio.sleep(_HEARTBEAT_INTERVAL)
+            try:
+                await run_in_threadpool(self.store.heartbeat, self.instance)
+                await self._fail_orphaned()
+            except sqlite3.Error as e:
+                logger.error(f"Job queue heartbeat failed: {e}")
+
+    async def submit(
+        self,
+        kind: str,
+        payload: Any,
+        user: str,
+        priority: str = "normal",
+        meta: Optional[Dict[str, Any]] = None,
+        cleanup: Optional[Callable[[], None]] = None,
+    ) -> str:
+        """Queue a job and return its id; raises 503/429 when the queue is full."""
+        if kind not in self._handlers:
+            raise ValueError(f"No handler registered for job kind {kind!r}")
+        if self._queued >= self.max_queue:
+            self._stats["rejected"] += 1
+            raise HTTPException(status_code=503, detail="Job queue is full, please retry shortly.")
+        if self._queued_per_user.get(user, 0) >= self.max_per_user:
+            self._stats["rejected"] += 1
+            raise HTTPException(status_code=429, detail=f"Too many queued jobs (max {self.max_per_user} per user).")
+
+        job = _Pending(uuid.uuid4().hex, kind, payload, user, priority, time.time(), cleanup)
+        # Count the job before the insert so submits racing it see the caps
+        self._queued += 1
+        self._queued_per_user[user] = self._queued_per_user.get(user, 0) + 1
+        try:
+            await run_in_threadpool(self.store.create, job.id, kind, user, priority, meta, self.instance)
+        except BaseException:
+            self._queued -= 1
+            self._release_user(user)
+            raise
+        self._queues[priority].setdefault(user, deque()).append(job)
+        self._local.add(job.id)
+        self._stats["submitted"] += 1
+        JOB_QUEUE_DEPTH.labels(priority).inc()
+        self._available.release()
+        return job.id
+
+    def _next(self) -> _Pending:
+        for priority in PRIORITIES:
+            users = self._queues[priority]
+            if not users:
+                continue
+            user, jobs = users.popitem(last=False)
+            job = jobs.popleft()
+            if jobs:
+                users[user] = jobs
+            self._queued -= 1
+            self._release_user(user)
+            JOB_QUEUE_DEPTH.labels(priority).dec()
+            return job
+        raise RuntimeError("job semaphore released without a queued job")
+
+    def _release_user(self, user: str) -> None:
+        self._queued_per_user[user] -= 1
+        if not self._queued_per_user[user]:
+            del self._queued_per_user[user]
+
+    def _notify(self, job_id: str) -> None:
+        event = self._changed.pop(job_id, None)
+        if event is not None:
+            event.set()
+
+    def watch(self, job_id: str) -> Optional[asyncio.Event]:
+        """
+        Event set on the job's next state change, or None when the job is not
+        queued or running in this process (finished, or owned by another worker).
+        """
+        if job_id not in self._local:
+            return None
+        return self._changed.setdefault(job_id, asyncio.Event())
+
+    async def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await run_in_threadpool(self.store.get, job_id)
+
+    async def _worker(self) -> None:
+        while True:
+            await self._available.acquire()
+            job = self._next()
+            self._running[job.id] = job
+            started = time.perf_counter()
+            try:
+                await run_in_threadpool(self.store.mark_running, job.id)
+                self._notify(job.id)
+                JOB_SECONDS.labels(job.kind, "wait").observe(time.time() - job.enqueued_at)
+                result = await self._handlers[job.kind](job.payload)
+                await run_in_threadpool(self.store.finish, job.id, result)
+                self._stats["done"] += 1
+            except asyncio.CancelledError:
+                await run_in_threadpool(
+                    self.store.finish, job.id, error="Server shut down before the job finished.", status_code=503
+                )
+                raise
+            except HTTPException as e:
+                await run_in_threadpool(self.store.finish, job.id, error=str(e.detail), status_code=e.status_code)
+                self._stats["failed"] += 1
+            except Exception as e:
+                logger.error(f"Job {job.id} ({job.kind}) failed: {e!r}")
+                await run_in_threadpool(self.store.finish, job.id, error="Unexpected server error.", status_code=500)
+                self._stats["failed"] += 1
+            finally:
+                JOB_SECONDS.labels(job.kind, "run").observe(time.perf_counter() - started)
+                del self._running[job.id]
+                self._local.discard(job.id)
+                self._notify(job.id)
+                if job.cleanup is not None:
+                    job.cleanup()
+            await self._maybe_purge()
+
+    async def _maybe_purge(self) -> None:
+        now = time.time()
+        if now - self._last_purge >= _PURGE_INTERVAL:
+            self._last_purge = now
+            try:
+                await run_in_threadpool(self.store.purge, now - self.result_ttl)
+            except sqlite3.Error as e:
+                logger.error(f"Job purge failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "queued": {p: sum(len(jobs) for jobs in self._queues[p].values()) for p in PRIORITIES},
+            "running": len(self._running),
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "users_waiting": len(self._queued_per_user),
+            "instance": self.instance,
+        }
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        for priority in PRIORITIES:
+            for jobs in self._queues[priority].values():
+                for job in jobs:
+                    await run_in_threadpool(
+                        self.store.finish, job.id, error="Server shut down before the job started.", status_code=503
+                    )
+                    if job.cleanup is not None:
+                        job.cleanup()
+            self._queues[priority].clear()
+        await run_in_threadpool(self.store.remove_owner, self.instance)
+        self.store.close()
+
+
+_queue: Optional[JobQueue] = None
+
+
+def jobs_enabled() -> bool:
+    return bool(os.getenv("JOBS_DB_PATH"))
+
+
+def get_job_queue() -> JobQueue:
+    """Return the process-wide job queue, created from env config on first use."""
+    global _queue
+    if _queue is None:
+        if not jobs_enabled():
+            raise HTTPException(status_code=503, detail="Background jobs are disabled (JOBS_DB_PATH is unset).")
+        _queue = JobQueue(
+            JobStore(os.getenv("JOBS_DB_PATH")),
+            workers=int(os.getenv("JOBS_WORKERS", "4")),
+            max_queue=int(os.getenv("JOBS_MAX_QUEUE", "256")),
+            max_per_user=int(os.getenv("JOBS_MAX_PER_USER", "32")),
+            result_ttl=float(os.getenv("JOBS_RESULT_TTL", "86400")),
+        )
+    return _queue
+
+
+async def close_job_queue() -> None:
+    global _queue
+    if _queue is not None:
+        await _queue.close()
+        _queue = None
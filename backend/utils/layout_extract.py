@@ -0,0 +1,166 @@
+# backend/utils/layout_extract.py
+"""
+Layout-aware CV section extraction (`/parse-cv?mode=layout`).
+
+`page.get_text()` flattens the document, so the text splitter can only guess
+headings from capitalisation. Here every line keeps its font metrics from
+`page.get_text("dict")` and headings are found from those:
+
+- the body font size is the size that covers the most characters
+- lines set larger than body text (HEADING_SIZE_RATIO) are headings whatever
+  their case, and open the section their keywords name
+- bold or upper-case lines go through the text splitter's rules, so a bold
+  "Work Experience" is a heading while a bold job title is not
+- inside a section, remaining bold/larger lines start a new item
+
+Font metrics are classified in one numpy pass over per-line arrays. Extraction
+runs without image blocks or ligature preservation. A document with a single
+font size and no bold text carries no layout signal and is handed to the text
+splitter unchanged, so layout mode is never worse than text mode.
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from utils.pdf_utils import ExtractionCancelled
+from utils.section_splitter import default_splitter, split_items
+
+# A line at least this much larger than body text is typeset as a heading
+HEADING_SIZE_RATIO = 1.15
+# Longer lines are prose, not headings or item titles
+MAX_HEADING_CHARS = 60
+
+Sections = Dict[str, List[Dict[str, str]]]
+
+
+def _document_lines(doc, cancel_event: Optional[threading.Event]) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """Text, font size and bold flag of every non-empty line, in reading order."""
+    import fitz
+
+    # Clip to the page, no image blocks, ligatures expanded (no TEXT_PRESERVE_* flags)
+    flags = fitz.TEXT_MEDIABOX_CLIP
+    texts: List[str] = []
+    sizes: List[float] = []
+    bold: List[bool] = []
+    for page in doc:
+        if cancel_event is not None and cancel_event.is_set():
+            raise ExtractionCancelled()
+        for block in page.get_text("dict", flags=flags)["blocks"]:
+            for line in block.get("lines", ()):
+                spans = [span for span in line["spans"] if span["text"].strip()]
+                if not spans:
+                    continue
+                texts.append("".join(span["text"] for span in line["spans"]).strip())
+                sizes.append(max(span["size"] for span in spans))
+                bold.append(all(span["flags"] & fitz.TEXT_FONT_BOLD for span in spans))
+    return texts, np.asarray(sizes, dtype=float), np.asarray(bold, dtype=bool)
+
+
+def classify_lines(texts: List[str], sizes: np.ndarray, bold: np.ndarray) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Vectorized font-metric pass.
+
+    Returns (larger, emphasized) boolean masks over the lines, or None when the
+    document has no font variation to go on.
+    """
+    chars = np.fromiter((len(t) for t in texts), dtype=float, count=len(texts))
+    # Half-point buckets absorb rounding noise between otherwise equal fonts
+    buckets = np.round(sizes * 2) / 2
+    values, inverse = np.unique(buckets, return_inverse=True)
+    body_size = values[np.bincount(inverse, weights=chars).argmax()]
+    larger = buckets >= body_size * HEADING_SIZE_RATIO
+    # Bold only stands out when most of the text is regular
+    bold_stands_out = chars[bold].sum() < chars.sum() / 2
+    emphasized = (larger | (bold & bold_stands_out)) & (chars <= MAX_HEADING_CHARS)
+    if not emphasized.any():
+        return None
+    return larger & emphasized, emphasized
+
+
+def _items(lines: List[str], emphasized: List[bool]) -> List[Dict[str, str]]:
+    """Split a section's lines into items at emphasized lines (item titles)."""
+    if not any(emphasized[1:]):
+        return split_items("\n".join(lines))
+    groups: List[List[str]] = []
+    for line, starts_item in zip(lines, emphasized):
+        if starts_item or not groups:
+            groups.append([])
+        groups[-1].append(line)
+    items = []
+    for group in groups:
+        title = group[0].split("|")[0].strip() if "|" in group[0] else group[0]
+        items.append({"title": title, "text": "\n".join(group)})
+    return items
+
+
+def sections_from_lines(
+    texts: List[str], sizes: np.ndarray, bold: np.ndarray, sections: Optional[Sequence[str]] = None
+) -> Sections:
+    """
+    Build sections from classified lines. Same output shape and first-occurrence
+    rule as `SectionSplitter.split`.
+    """
+    masks = classify_lines(texts, sizes, bold) if texts else None
+    if masks is None:
+        return default_splitter.split("\n".join(texts), sections)
+    larger, emphasized = masks
+
+    # (line index, section) for every boundary; only emphasized or upper-case lines can be one
+    boundaries: List[Tuple[int, Optional[str]]] = []
+    for i in np.flatnonzero(emphasized | np.fromiter((t.isupper() for t in texts), dtype=bool, count=len(texts))):
+        if larger[i]:
+            is_boundary, section = default_splitter.classify_heading(texts[i])
+        else:
+            is_boundary, section = default_splitter.classify(texts[i])
+        if is_boundary:
+            boundaries.append((int(i), section))
+
+    wanted = default_splitter.section_names if sections is None else list(sections)
+    result: Sections = {name: [] for name in wanted}
+    seen = set()
+    for n, (start, section) in enumerate(boundaries):
+        if section is None or section in seen or section not in result:
+            continue
+        seen.add(section)
+        end = boundaries[n + 1][0] if n + 1 < len(boundaries) else len(texts)
+        body = range(start + 1, end)
+        result[section] = _items([texts[j] for j in body], [bool(emphasized[j]) for j in body])
+    return result
+
+
+def extract_layout_sections(
+    source: Union[bytes, str],
+    cancel_event: Optional[threading.Event] = None,
+    sections: Optional[Sequence[str]] = None,
+) -> Tuple[Optional[Sections], Dict[str, float]]:
+    """
+    Pool worker for PdfExtractor.run: open a PDF and return its sections.
+
+    The result is None when the PDF has no text layer.
+    """
+    started_at = time.time()
+    t0 = time.perf_counter()
+    import fitz  # PyMuPDF
+
+    if isinstance(source, str):
+        doc = fitz.open(source, filetype="pdf")
+    else:
+        doc = fitz.open(stream=source, filetype="pdf")
+    t1 = time.perf_counter()
+    try:
+        texts, sizes, bold = _document_lines(doc, cancel_event)
+        page_count = doc.page_count
+    finally:
+        doc.close()
+    result = sections_from_lines(texts, sizes, bold, sections) if texts else None
+    t2 = time.perf_counter()
+    return result, {
+        "started_at": started_at,
+        "open": t1 - t0,
+        "extract": t2 - t1,
+        "pages": page_count,
+        "page_count": page_count,
+    }
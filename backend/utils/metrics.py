@@ -0,0 +1,145 @@
+# backend/utils/metrics.py
+"""
+Prometheus metrics and per-request stage timings.
+
+`MetricsMiddleware` records request latency and response size per route and,
+when SERVER_TIMING_HEADER=1, adds a `Server-Timing` header listing the stages
+timed during that request. Hot paths report stages with `stage()` /
+`observe_stage()`, which feed both the `stage_seconds` histogram and the
+current request's Server-Timing entries.
+
+`start_event_loop_monitor()` samples event-loop lag (how late a periodic
+wake-up fires) every EVENT_LOOP_LAG_INTERVAL seconds (default 0.25, 0 disables);
+blocking work on the loop shows up there long before it shows in latency.
+"""
+
+import asyncio
+import contextvars
+import os
+import time
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+# Buckets covering sub-millisecond regex work up to the 90s AI timeout
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 90)
+SIZE_BUCKETS = (1e3, 1e4, 5e4, 1e5, 5e5, 1e6, 5e6, 1e7, 5e7)
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "route", "status"], buckets=LATENCY_BUCKETS
+)
+RESPONSE_BYTES = Histogram("http_response_size_bytes", "HTTP response body size", ["route"], buckets=SIZE_BUCKETS)
+STAGE_SECONDS = Histogram("stage_seconds", "Time spent in a request-handling stage", ["stage"], buckets=LATENCY_BUCKETS)
+PDF_BYTES = Histogram("pdf_upload_bytes", "Size of uploaded PDFs", buckets=SIZE_BUCKETS)
+PDF_PAGES = Histogram("pdf_pages", "Page count of parsed PDFs", buckets=(1, 2, 3, 5, 10, 20, 50, 100, 500))
+UPSTREAM_SECONDS = Histogram(
+    "upstream_ai_request_seconds", "Latency of each Gemini HTTP attempt", ["method", "status"], buckets=LATENCY_BUCKETS
+)
+UPSTREAM_RETRIES = Counter("upstream_ai_retries_total", "Gemini calls retried", ["method", "reason"])
+UPSTREAM_INFLIGHT = Gauge("upstream_ai_inflight", "Gemini HTTP attempts currently in flight")
+UPSTREAM_BREAKER_STATE = Gauge("upstream_ai_breaker_state", "Gemini circuit breaker state (0 closed, 1 half-open, 2 open)")
+UPSTREAM_RATE_LIMIT = Gauge("upstream_ai_rate_limit", "Current adaptive Gemini rate limit (attempts per second)")
+UPSTREAM_SHED = Counter("upstream_ai_shed_total", "Gemini calls refused before reaching the upstream", ["reason"])
+JOB_QUEUE_DEPTH = Gauge("jobs_queued", "Jobs waiting for a job worker", ["priority"])
+JOB_SECONDS = Histogram("job_seconds", "Job time spent queued (wait) and executing (run)", ["kind", "phase"], buckets=LATENCY_BUCKETS)
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "Delay of periodic event-loop wake-ups past their deadline",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+
+# Stage timings of the request currently being handled: list of (name, seconds)
+_request_stages: contextvars.ContextVar[Optional[List[Tuple[str, float]]]] = contextvars.ContextVar(
+    "request_stages", default=None
+)
+
+
+def observe_stage(name: str, seconds: float) -> None:
+    """Record a stage duration measured elsewhere (e.g. in a worker process)."""
+    STAGE_SECONDS.labels(name).observe(seconds)
+    stages = _request_stages.get()
+    if stages is not None:
+        stages.append((name, seconds))
+
+
+@contextmanager
+def stage(name: str):
+    """Time the enclosed block as stage `name`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(name, time.perf_counter() - start)
+
+
+async def _watch_event_loop(interval: float) -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.observe(max(0.0, loop.time() - expected))
+
+
+def start_event_loop_monitor() -> Optional["asyncio.Task"]:
+    """Start sampling loop lag on the running loop; cancel the task to stop."""
+    interval = float(os.getenv("EVENT_LOOP_LAG_INTERVAL", "0.25"))
+    if interval <= 0:
+        return None
+    return asyncio.create_task(_watch_event_loop(interval))
+
+
+def server_timing_header(stages: List[Tuple[str, float]]) -> str:
+    return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in stages)
+
+
+def metrics_response_body() -> Tuple[bytes, str]:
+    """Prometheus exposition payload and its content type."""
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware, so streaming responses (SSE, NDJSON) are measured
+    without being buffered.
+    """
+
+    def __init__(self, app, server_timing: Optional[bool] = None):
+        self.app = app
+        if server_timing is None:
+            server_timing = os.getenv("SERVER_TIMING_HEADER", "0") == "1"
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stages: List[Tuple[str, float]] = []
+        token = _request_stages.set(stages)
+        start = time.perf_counter()
+        status = 500
+        body_bytes = 0
+
+        async def send_wrapper(message):
+            nonlocal status, body_bytes
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing and stages:
+                    headers = list(message.get("headers", []))
+                    total = ("total", time.perf_counter() - start)
+                    headers.append((b"server-timing", server_timing_header(stages + [total]).encode("latin-1")))
+                    message = {**message, "headers": headers}
+            elif message["type"] == "http.response.body":
+                body_bytes += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_stages.reset(token)
+            route = scope.get("route")
+            # Label by route template, never the raw path, to bound cardinality
+            route_label = getattr(route, "path", "unmatched")
+            REQUEST_SECONDS.labels(scope["method"], route_label, str(status)).observe(time.perf_counter() - start)
+            RESPONSE_BYTES.labels(route_label).observe(body_bytes)
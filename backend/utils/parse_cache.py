@@ -0,0 +1,169 @@
+# backend/utils/parse_cache.py
+"""
+Content-addressed cache for parsed CV sections.
+
+Entries are keyed on sha256(pdf bytes) plus a parser-version tag, so a re-upload
+of the same CV skips PDF opening entirely and a parser change invalidates old
+results automatically. Two tiers:
+
+- an in-process LRU bounded by the total size of the cached JSON
+  (PARSE_CACHE_MAX_BYTES, default 64 MiB)
+- an optional SQLite file that survives restarts (PARSE_CACHE_PATH), holding
+  at most PARSE_CACHE_DISK_MAX_ENTRIES results (default 10000); the oldest are
+  deleted as new ones are written. Its reads and writes run in the threadpool,
+  under their own lock, so they never stall the event loop or memory-tier hits
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+
+def parse_cache_key_from_digest(sha256_hex: str, parser_version: str) -> str:
+    """Cache key for an upload whose sha256 was computed while it was spooled."""
+    return f"{sha256_hex}:{parser_version}"
+
+
+class ParseCache:
+    """
+    Two-tier parse-result cache: a byte-bounded LRU in front of an optional SQLite store.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, path: Optional[str] = None, disk_max_entries: int = 10000):
+        self.max_bytes = max_bytes
+        self.path = path
+        self.disk_max_entries = max(1, disk_max_entries)
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        # Guards the SQLite connection and _disk_rows
+        self._db_lock = threading.Lock()
+        self._stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "disk_evictions": 0}
+        self._db: Optional[sqlite3.Connection] = None
+        # Upper bound on the rows in the SQLite tier (replacing a row still counts one)
+        self._disk_rows = 0
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS parse_cache "
+                "(key TEXT PRIMARY KEY, value BLOB NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS parse_cache_created_at ON parse_cache (created_at)")
+            self._db.commit()
+            self._disk_rows = self._db.execute("SELECT count(*) FROM parse_cache").fetchone()[0]
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            blob = self._entries.get(key)
+            if blob is not None:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return json.loads(blob)
+        if self._db is not None:
+            blob = await run_in_threadpool(self._disk_get, key)
+            if blob is not None:
+                with self._lock:
+                    self._stats["disk_hits"] += 1
+                    self._insert(key, blob)
+                return json.loads(blob)
+        with self._lock:
+            self._stats["misses"] += 1
+        return None
+
+    async def put(self, key: str, value: Dict[str, Any]) -> None:
+        blob = json.dumps(value, separators=(",", ":")).encode("utf-8")
+        with self._lock:
+            self._insert(key, blob)
+        if self._db is not None:
+            await run_in_threadpool(self._disk_put, key, blob)
+
+    def _disk_get(self, key: str) -> Optional[bytes]:
+        with self._db_lock:
+            if self._db is None:
+                return None
+            row = self._db.execute("SELECT value FROM parse_cache WHERE key = ?", (key,)).fetchone()
+        return row[0] if row is not None else None
+
+    def _disk_put(self, key: str, blob: bytes) -> None:
+        with self._db_lock:
+            if self._db is None:
+                return
+            self._db.execute(
+                "INSERT OR REPLACE INTO parse_cache (key, value, created_at) VALUES (?, ?, ?)",
+                (key, blob, time.time()),
+            )
+            self._disk_rows += 1
+            if self._disk_rows > self.disk_max_entries:
+                self._prune_disk()
+            self._db.commit()
+
+    def _prune_disk(self) -> None:
+        # Caller holds the db lock; keeps the newest disk_max_entries rows
+        evicted = self._db.execute(
+            "DELETE FROM parse_cache WHERE key IN "
+            "(SELECT key FROM parse_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+            (self.disk_max_entries,),
+        ).rowcount
+        self._disk_rows = self._db.execute("SELECT count(*) FROM parse_cache").fetchone()[0]
+        with self._lock:
+            self._stats["disk_evictions"] += evicted
+
+    def _insert(self, key: str, blob: bytes) -> None:
+        # Caller holds the lock
+        if len(blob) > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._size -= len(old)
+        self._entries[key] = blob
+        self._size += len(blob)
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+            self._stats["evictions"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "disk": self.path,
+                "disk_entries": self._disk_rows if self._db is not None else 0,
+                "disk_max_entries": self.disk_max_entries,
+            }
+
+    def close(self) -> None:
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+_cache: Optional[ParseCache] = None
+
+
+def get_parse_cache() -> ParseCache:
+    """Return the process-wide parse cache, created from env config on first use."""
+    global _cache
+    if _cache is None:
+        _cache = ParseCache(
+            max_bytes=int(os.getenv("PARSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+            path=os.getenv("PARSE_CACHE_PATH") or None,
+            disk_max_entries=int(os.getenv("PARSE_CACHE_DISK_MAX_ENTRIES", "10000")),
+        )
+    return _cache
+
+
+def close_parse_cache() -> None:
+    global _cache
+    if _cache is not None:
+        _cache.close()
+        _cache = None
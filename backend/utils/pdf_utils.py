@@ -1,13 +1,342 @@
 # backend/utils/pdf_utils.py
-import fitz  # PyMuPDF
-from fastapi import UploadFile
+"""
+Shared PDF text extraction for every parse entry point.
 
-async def extract_text_from_pdf(file: UploadFile) -> str:
+PyMuPDF holds the GIL while it decodes a document, so running `fitz` inside an
+`async def` handler stalls the whole event loop. All extraction goes through a
+single bounded executor instead:
+
+- PDF_EXECUTOR      "process" (default) or "thread"
+- PDF_WORKERS       number of pool workers (default: min(4, cpu count))
+- PDF_MAX_QUEUE     jobs allowed to wait for a free worker before we return 503
+
+Jobs take either the PDF bytes or the path of a spooled upload (see
+utils.uploads); paths are opened from disk so large files are never copied
+into the worker as a whole. Callers that only need some sections pass
+`stop_after`, and the worker stops reading pages once those sections are
+complete (see utils.section_splitter.IncrementalSplitter).
+
+A worker process that dies (a MuPDF crash, an OOM kill) breaks the whole
+process pool; the job it was running gets a 503 and the pool is rebuilt for
+the next one.
+"""
+
+import asyncio
+import functools
+import logging
+import os
+import threading
+import time
+from concurrent.futures import BrokenExecutor, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple, Union
+
+from fastapi import HTTPException, Request
+
+from utils.metrics import PDF_BYTES, PDF_PAGES, observe_stage
+
+logger = logging.getLogger(__name__)
+
+# How often we check whether the client went away while a job is pending
+DISCONNECT_POLL_INTERVAL = 0.25
+
+
+class ExtractionCancelled(Exception):
+    """Raised inside a thread worker when the waiting client disconnected."""
+
+
+def _extract_text(
+    source: Union[bytes, str],
+    cancel_event: Optional[threading.Event] = None,
+    stop_after: Optional[Sequence[str]] = None,
+) -> Tuple[str, Dict[str, float]]:
     """
-    Read a PDF UploadFile and extract its full text asynchronously.
+    Open a PDF and join the text of its pages. Runs inside a pool worker.
+
+    With `stop_after`, pages are fed to an incremental section splitter and
+    reading stops once all of those sections are closed; the returned prefix
+    splits into exactly the same sections as the full text would.
+
+    Returns the text plus raw timings; `started_at` is wall-clock so the parent
+    process can derive queue wait even when the job ran in a child process.
     """
-    pdf_bytes = await file.read()
-    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-    text = "".join(page.get_text() for page in doc)
-    doc.close()
-    return text
+    started_at = time.time()
+    t0 = time.perf_counter()
+    import fitz  # PyMuPDF
+
+    if isinstance(source, str):
+        doc = fitz.open(source, filetype="pdf")
+    else:
+        doc = fitz.open(stream=source, filetype="pdf")
+    t1 = time.perf_counter()
+    try:
+        splitter = None
+        if stop_after is not None:
+            from utils.section_splitter import default_splitter
+
+            splitter = default_splitter.incremental(stop_after)
+        parts = []
+        for page in doc:
+            if cancel_event is not None and cancel_event.is_set():
+                raise ExtractionCancelled()
+            parts.append(page.get_text())
+            if splitter is not None and splitter.feed(parts[-1]):
+                break
+        page_count = doc.page_count
+    finally:
+        doc.close()
+    t2 = time.perf_counter()
+    return "".join(parts), {
+        "started_at": started_at,
+        "open": t1 - t0,
+        "extract": t2 - t1,
+        "pages": len(parts),
+        "page_count": page_count,
+    }
+
+
+class PdfExtractor:
+    """
+    Bounded pool that runs `fitz` extraction off the event loop.
+
+    At most `max_workers + max_queue` jobs are accepted at once; anything
+    beyond that is rejected with 503 so a burst of uploads cannot pile up
+    unbounded work behind the pool.
+    """
+
+    def __init__(self, kind: str = "process", max_workers: Optional[int] = None, max_queue: int = 16):
+        if kind not in ("process", "thread"):
+            raise ValueError(f"Unknown PDF executor kind: {kind!r}")
+        self.kind = kind
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.max_queue = max_queue
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0,
+            "cancelled": 0,
+            "early_stops": 0,
+            "pages_skipped": 0,
+            "pool_restarts": 0,
+        }
+        self._timings = {
+            stage: {"count": 0, "total_ms": 0.0, "max_ms": 0.0}
+            for stage in ("queue_wait", "open", "extract", "total")
+        }
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.kind == "process":
+                    self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pdf")
+            return self._executor
+
+    def _discard_executor(self, executor: Executor) -> None:
+        """
+        Drop a pool that a dead worker left unusable (a MuPDF crash or an OOM kill
+        breaks a ProcessPoolExecutor for good); the next job builds a new one.
+        """
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+            self._stats["pool_restarts"] += 1
+        logger.warning("PDF extraction pool is broken (a worker died); starting a new one")
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, func: Callable[..., Any], *args: Any) -> Tuple[Executor, Future]:
+        """Submit to the pool, replacing it once if it turns out to be broken."""
+        executor = self._get_executor()
+        try:
+            return executor, executor.submit(func, *args)
+        except BrokenExecutor:
+            self._discard_executor(executor)
+        executor = self._get_executor()
+        return executor, executor.submit(func, *args)
+
+    def _reserve_slot(self) -> None:
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self._stats["rejected"] += 1
+                raise HTTPException(status_code=503, detail="PDF processing queue is full, please retry shortly.")
+            self._pending += 1
+            self._stats["submitted"] += 1
+
+    def _release_slot(self, outcome: str) -> None:
+        with self._lock:
+            self._pending -= 1
+            self._stats[outcome] += 1
+
+    def _job_done(self, abandoned: threading.Event, future: Future) -> None:
+        """
+        Release the job's slot once the pool is done with it. A running process-pool
+        job cannot be cancelled, so releasing when the caller gives up would let
+        more work in than the queue bound allows while it keeps a worker busy.
+        """
+        if future.cancelled() or abandoned.is_set():
+            outcome = "cancelled"
+        elif future.exception() is not None:
+            outcome = "failed"
+        else:
+            outcome = "completed"
+        self._release_slot(outcome)
+
+    def _record(self, timings: Dict[str, float]) -> None:
+        with self._lock:
+            for stage, timing in self._timings.items():
+                ms = timings[stage] * 1000
+                timing["count"] += 1
+                timing["total_ms"] += ms
+                timing["max_ms"] = max(timing["max_ms"], ms)
+
+    async def extract_text(
+        self,
+        source: Union[bytes, str],
+        request: Optional[Request] = None,
+        stop_after: Optional[Sequence[str]] = None,
+    ) -> str:
+        """
+        Extract the text of a PDF (bytes or file path) without blocking the event loop.
+
+        `stop_after` names the sections the caller will split out of the text;
+        extraction may then end early (see `_extract_text`).
+
+        If `request` is given, the job is cancelled once the client disconnects
+        and the per-stage timings are stored on `request.state.pdf_timings`.
+        """
+        return await self.run(_extract_text, source, request, None if stop_after is None else tuple(stop_after))
+
+    async def run(
+        self,
+        func: Callable[..., Tuple[Any, Dict[str, float]]],
+        source: Union[bytes, str],
+        request: Optional[Request] = None,
+        *args: Any,
+    ) -> Any:
+        """
+        Run `func(source, cancel_event, *args)` on the pool and return its result.
+
+        `func` must be a picklable module-level function that returns
+        `(result, raw_timings)` with the same timing keys as `_extract_text`.
+        Queue bounds, cancellation and timing stats work as for `extract_text`.
+        """
+        self._reserve_slot()
+        cancel_event = threading.Event() if self.kind == "thread" else None
+        abandoned = threading.Event()
+        submitted_at = time.time()
+        t0 = time.perf_counter()
+        try:
+            executor, future = self._submit(func, source, cancel_event, *args)
+        except Exception:
+            self._release_slot("failed")
+            raise
+        future.add_done_callback(functools.partial(self._job_done, abandoned))
+
+        def abandon() -> None:
+            abandoned.set()
+            if cancel_event is not None:
+                cancel_event.set()
+            future.cancel()
+
+        try:
+            result, raw = await self._wait(asyncio.wrap_future(future), request)
+        except HTTPException as e:
+            if e.status_code == 499:
+                abandon()
+            raise
+        except asyncio.CancelledError:
+            abandon()
+            raise
+        except BrokenExecutor:
+            # The job (or one running next to it) killed its worker; this PDF is not retried
+            # in case it is the cause, but the next job gets a fresh pool
+            self._discard_executor(executor)
+            raise HTTPException(status_code=503, detail="PDF worker crashed while processing the file, please retry.")
+
+        timings = {
+            "queue_wait": max(0.0, raw["started_at"] - submitted_at),
+            "open": raw["open"],
+            "extract": raw["extract"],
+            "total": time.perf_counter() - t0,
+        }
+        self._record(timings)
+        if raw["pages"] < raw["page_count"]:
+            with self._lock:
+                self._stats["early_stops"] += 1
+                self._stats["pages_skipped"] += raw["page_count"] - raw["pages"]
+        PDF_BYTES.observe(os.path.getsize(source) if isinstance(source, str) else len(source))
+        PDF_PAGES.observe(raw["pages"])
+        for stage_name in ("queue_wait", "open", "extract"):
+            observe_stage(f"pdf_{stage_name}", timings[stage_name])
+        if request is not None:
+            request.state.pdf_timings = {**timings, "pages": raw["pages"], "page_count": raw["page_count"]}
+        logger.info(
+            f"PDF extracted: pages={raw['pages']}/{raw['page_count']} "
+            + " ".join(f"{stage}={value * 1000:.1f}ms" for stage, value in timings.items())
+        )
+        return result
+
+    @staticmethod
+    async def _wait(job: "asyncio.Future", request: Optional[Request]):
+        if request is None:
+            return await job
+        while True:
+            done, _ = await asyncio.wait({job}, timeout=DISCONNECT_POLL_INTERVAL)
+            if done:
+                return job.result()
+            if await request.is_disconnected():
+                job.cancel()
+                raise HTTPException(status_code=499, detail="Client disconnected before PDF extraction finished.")
+
+    def stats(self) -> Dict[str, object]:
+        """Snapshot of queue depth, outcome counters and per-stage timings."""
+        with self._lock:
+            stages = {
+                stage: {
+                    "count": t["count"],
+                    "avg_ms": round(t["total_ms"] / t["count"], 2) if t["count"] else 0.0,
+                    "max_ms": round(t["max_ms"], 2),
+                }
+                for stage, t in self._timings.items()
+            }
+            return {
+                "kind": self.kind,
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "pending": self._pending,
+                **self._stats,
+                "stages": stages,
+            }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+_extractor: Optional[PdfExtractor] = None
+
+
+def get_pdf_extractor() -> PdfExtractor:
+    """Return the process-wide extractor, creating it from env config on first use."""
+    global _extractor
+    if _extractor is None:
+        workers = os.getenv("PDF_WORKERS")
+        _extractor = PdfExtractor(
+            kind=os.getenv("PDF_EXECUTOR", "process"),
+            max_workers=int(workers) if workers else None,
+            max_queue=int(os.getenv("PDF_MAX_QUEUE", "16")),
+        )
+    return _extractor
+
+
+def shutdown_pdf_extractor() -> None:
+    global _extractor
+    if _extractor is not None:
+        _extractor.shutdown()
+        _extractor = None
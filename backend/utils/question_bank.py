@@ -0,0 +1,249 @@
+# backend/utils/question_bank.py
+"""
+Interview question bank precomputed in the background after `/parse-cv`.
+
+The first `/mock-interview` turn and `/quick-review` depend only on a CV entry,
+so once a CV is parsed its project and experience entries are sent to Gemini
+a few at a time (PRECOMPUTE_BATCH_SIZE entries per request) and asked for both
+the first question and the review bullets in one go. Results are written to
+the response cache under the same keys those endpoints use, so a later click
+is a cache read; entries already cached are skipped. Progress is tracked per
+CV hash (the SHA-256 of the uploaded PDF) and served by `/precompute/{cv_hash}`.
+
+- PRECOMPUTE_QUESTIONS          "1" to precompute after every parse (default "0";
+                                `/parse-cv?precompute=true` opts in per request)
+- PRECOMPUTE_BATCH_SIZE         entries per Gemini request (default 6)
+- PRECOMPUTE_MAX_CONCURRENCY    precompute requests in flight per worker, so
+                                background work leaves room for interactive calls (default 2)
+- PRECOMPUTE_MAX_JOBS           CV progress records kept per worker (default 1000)
+
+Entries missing from a batch answer are left to the on-demand path.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from utils.ai_clients import GeminiClient
+from utils.response_cache import ResponseCache, get_response_cache
+
+logger = logging.getLogger(__name__)
+
+_ENTRY_CHARS = 2000
+
+
+class PrecomputeItem(NamedTuple):
+    """One CV entry and the response-cache keys its answers are stored under."""
+
+    title: str
+    text: str
+    first_question_key: str
+    quick_review_key: str
+
+
+def precompute_enabled(requested: Optional[bool] = None) -> bool:
+    """Per-request opt-in/out, falling back to PRECOMPUTE_QUESTIONS."""
+    if requested is not None:
+        return requested
+    return os.getenv("PRECOMPUTE_QUESTIONS", "0") == "1"
+
+
+def build_batch_prompt(items: List[PrecomputeItem]) -> str:
+    entries = "\n\n".join(
+        f"Entry {n}:\nTitle: {item.title}\nContent:\n{item.text[:_ENTRY_CHARS]}" for n, item in enumerate(items, 1)
+    )
+    return (
+        "You are a senior technical interviewer preparing for an interview. For each numbered CV entry below, "
+        "write the first open-ended interview question about it, and 5 concise bullet points summarizing key "
+        "facts or concepts for quick review.\n\n"
+        f"{entries}\n\n"
+        "Respond ONLY with a JSON array containing one object per entry: "
+        '[{"entry": 1, "next_question": "Your question here.", "points": ["...", "..."]}]'
+    )
+
+
+def parse_batch_json(raw_text: str) -> Dict[int, Dict[str, Any]]:
+    """Entry number -> answer object; malformed entries are dropped."""
+    try:
+        answers = json.loads(raw_text)
+    except json.JSONDecodeError:
+        match = re.search(r"```json\n(.*)\n```", raw_text, re.DOTALL)
+        if not match:
+            return {}
+        answers = json.loads(match.group(1))
+    if isinstance(answers, dict):
+        answers = answers.get("entries", [])
+    parsed = {}
+    for answer in answers if isinstance(answers, list) else ():
+        if not isinstance(answer, dict) or not isinstance(answer.get("entry"), int):
+            continue
+        question, points = answer.get("next_question"), answer.get("points")
+        if isinstance(question, str) and question.strip() and isinstance(points, list) and points:
+            parsed[answer["entry"]] = {"next_question": question, "points": [str(p) for p in points]}
+    return parsed
+
+
+class PrecomputeJob:
+    """Progress of one CV's precompute run."""
+
+    def __init__(self, cv_hash: str, items: List[PrecomputeItem]):
+        self.cv_hash = cv_hash
+        self.items = list(items)
+        self.state = "pending"
+        self.cached = 0
+        self.done = 0
+        self.failed = 0
+        self.batches = 0
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.state in ("done", "failed")
+
+    def status(self) -> Dict[str, Any]:
+        total = len(self.items)
+        return {
+            "cv_hash": self.cv_hash,
+            "state": self.state,
+            "entries": total,
+            "cached": self.cached,
+            "done": self.done,
+            "failed": self.failed,
+            "progress": round((self.cached + self.done + self.failed) / total, 3) if total else 1.0,
+            "batches": self.batches,
+            "error": self.error,
+            "elapsed_s": round((self.finished_at or time.time()) - self.created_at, 3),
+        }
+
+
+class QuestionBank:
+    """Schedules precompute jobs and keeps their progress per CV hash."""
+
+    def __init__(self, cache: ResponseCache, batch_size: int = 6, max_concurrency: int = 2, max_jobs: int = 1000):
+        self.cache = cache
+        self.batch_size = max(1, batch_size)
+        self.max_jobs = max_jobs
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self._jobs: "OrderedDict[str, PrecomputeJob]" = OrderedDict()
+
+    def get(self, cv_hash: str) -> Optional[PrecomputeJob]:
+        return self._jobs.get(cv_hash)
+
+    def schedule(self, cv_hash: str, items: List[PrecomputeItem], client: GeminiClient) -> PrecomputeJob:
+        """
+        Start precomputing `items` for a CV in the background. Items a queued,
+        running or done job of the CV already covers are not scheduled again;
+        any others (the first parse asked for fewer sections, or used another
+        mode) are added to that job and run after its current work.
+        """
+        job = self._jobs.get(cv_hash)
+        if job is not None and job.state != "failed":
+            self._jobs.move_to_end(cv_hash)
+            known = {item.first_question_key for item in job.items}
+            extra = [item for item in items if item.first_question_key not in known]
+            if extra:
+                job.items.extend(extra)
+                job.state, job.finished_at = "pending", None
+                job.task = asyncio.ensure_future(self._run(job, extra, client, after=job.task))
+            return job
+        job = PrecomputeJob(cv_hash, items)
+        self._jobs[cv_hash] = job
+        self._evict()
+        job.task = asyncio.ensure_future(self._run(job, items, client))
+        return job
+
+    def _evict(self) -> None:
+        excess = len(self._jobs) - self.max_jobs
+        for cv_hash in [h for h, job in self._jobs.items() if job.finished][:max(0, excess)]:
+            del self._jobs[cv_hash]
+
+    async def _run(
+        self,
+        job: PrecomputeJob,
+        items: List[PrecomputeItem],
+        client: GeminiClient,
+        after: Optional[asyncio.Task] = None,
+    ) -> None:
+        if after is not None and not after.done():
+            try:
+                await asyncio.wait({after})
+            except asyncio.CancelledError:
+                after.cancel()
+                raise
+        pending = []
+        for item in items:
+            cached_question = await self.cache.peek(item.first_question_key)
+            if cached_question is not None and await self.cache.peek(item.quick_review_key) is not None:
+                job.cached += 1
+            else:
+                pending.append(item)
+        batches = [pending[i:i + self.batch_size] for i in range(0, len(pending), self.batch_size)]
+        job.state = "running"
+        try:
+            await asyncio.gather(*(self._run_batch(job, batch, client) for batch in batches))
+        except asyncio.CancelledError:
+            job.state, job.error = "failed", "cancelled"
+            raise
+        finally:
+            job.finished_at = time.time()
+        if job.failed and not job.done:
+            job.state = "failed"
+        else:
+            job.state = "done"
+        logger.info(f"Precompute for CV {job.cv_hash[:12]}: {job.status()}")
+
+    async def _run_batch(self, job: PrecomputeJob, batch: List[PrecomputeItem], client: GeminiClient) -> None:
+        async with self._semaphore:
+            try:
+                raw_text = await client.generate_content([{"parts": [{"text": build_batch_prompt(batch)}]}])
+                answers = parse_batch_json(raw_text)
+            except Exception as e:
+                logger.warning(f"Precompute batch of {len(batch)} entries failed: {e!r}")
+                job.error = f"{type(e).__name__}: {e}".splitlines()[0]
+                answers = {}
+        job.batches += 1
+        for n, item in enumerate(batch, 1):
+            answer = answers.get(n)
+            if answer is None:
+                job.failed += 1
+                continue
+            await self.cache.set(item.first_question_key, {"next_question": answer["next_question"]})
+            await self.cache.set(item.quick_review_key, {"points": answer["points"]})
+            job.done += 1
+
+    async def close(self) -> None:
+        tasks = [job.task for job in self._jobs.values() if job.task is not None and not job.task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+_bank: Optional[QuestionBank] = None
+
+
+def get_question_bank() -> QuestionBank:
+    """Return the process-wide question bank, created from env config on first use."""
+    global _bank
+    if _bank is None:
+        _bank = QuestionBank(
+            get_response_cache(),
+            batch_size=int(os.getenv("PRECOMPUTE_BATCH_SIZE", "6")),
+            max_concurrency=int(os.getenv("PRECOMPUTE_MAX_CONCURRENCY", "2")),
+            max_jobs=int(os.getenv("PRECOMPUTE_MAX_JOBS", "1000")),
+        )
+    return _bank
+
+
+async def close_question_bank() -> None:
+    global _bank
+    if _bank is not None:
+        await _bank.close()
+        _bank = None
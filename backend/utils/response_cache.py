@@ -0,0 +1,228 @@
+# backend/utils/response_cache.py
+"""
+Cache for AI responses that depend only on a CV section.
+
+`/quick-review` and the first `/mock-interview` turn are pure functions of the
+section's title and text, so their Gemini results are cached under a
+normalized section fingerprint plus the prompt-template version. Concurrent
+identical requests are coalesced onto one upstream call. The sqlite backend's
+reads and writes run in the threadpool, so they never stall the event loop.
+
+- RESPONSE_CACHE_BACKEND       "memory" (default) or "sqlite" (shared by workers)
+- RESPONSE_CACHE_PATH          SQLite file for the sqlite backend
+- RESPONSE_CACHE_TTL           seconds an entry stays valid (default 86400)
+- RESPONSE_CACHE_MAX_ENTRIES   LRU bound (default 2000)
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+_NON_WORD_RE = re.compile(r"[^\w]+")
+
+
+def section_fingerprint(title: str, text: str) -> str:
+    """
+    Hash of a section with case, punctuation and whitespace differences removed,
+    so near-identical sections share one cache entry.
+    """
+    normalized = [_NON_WORD_RE.sub(" ", part.lower()).split() for part in (title, text)]
+    return hashlib.sha256(json.dumps(normalized).encode("utf-8")).hexdigest()
+
+
+class MemoryBackend:
+    """In-process LRU with per-entry expiry."""
+
+    blocking = False
+
+    def __init__(self, max_entries: int = 2000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def close(self) -> None:
+        pass
+
+
+class SqliteBackend:
+    """SQLite-backed LRU so several uvicorn workers share one cache."""
+
+    # Calls wait on disk and on other workers' writes (5 s busy timeout)
+    blocking = True
+
+    def __init__(self, path: str, max_entries: int = 2000):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS response_cache "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS response_cache_last_used ON response_cache (last_used)")
+        self._db.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT value, expires_at FROM response_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] < now:
+                self._db.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+                self._db.commit()
+                return None
+            self._db.execute("UPDATE response_cache SET last_used = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            return json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO response_cache (key, value, expires_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now + ttl, now),
+            )
+            excess = len(self) - self.max_entries
+            if excess > 0:
+                self._db.execute(
+                    "DELETE FROM response_cache WHERE key IN "
+                    "(SELECT key FROM response_cache ORDER BY last_used LIMIT ?)",
+                    (excess,),
+                )
+                self.evictions += excess
+            self._db.commit()
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+
+    def close(self) -> None:
+        self._db.close()
+
+
+class ResponseCache:
+    """
+    TTL cache in front of a pluggable backend, with single-flight coalescing.
+    """
+
+    def __init__(self, backend, ttl: float = 86400.0):
+        self.backend = backend
+        self.ttl = ttl
+        self._inflight: Dict[str, "asyncio.Task"] = {}
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0}
+
+    async def _call(self, method: Callable[..., Any], *args) -> Any:
+        if self.backend.blocking:
+            return await run_in_threadpool(method, *args)
+        return method(*args)
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = await self._call(self.backend.get, key)
+        self._stats["hits" if value is not None else "misses"] += 1
+        return value
+
+    async def peek(self, key: str) -> Optional[Any]:
+        """Cached value without counting a hit or miss (for background work)."""
+        return await self._call(self.backend.get, key)
+
+    async def set(self, key: str, value: Any) -> None:
+        await self._call(self.backend.set, key, value, self.ttl)
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return the cached value for `key`, or run `compute` once for all
+        concurrent callers and cache its result. Failures are not cached.
+
+        The upstream call runs in its own task, so a caller that disconnects
+        does not cancel it for the others still waiting.
+        """
+        value = await self._call(self.backend.get, key)
+        if value is not None:
+            self._stats["hits"] += 1
+            return value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self._stats["coalesced"] += 1
+        else:
+            self._stats["misses"] += 1
+            task = asyncio.ensure_future(self._compute_and_store(key, compute))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._inflight.pop(key, None) if self._inflight.get(key) is t else None)
+            # Mark the exception as retrieved even if every waiter went away
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return await asyncio.shield(task)
+
+    async def _compute_and_store(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        value = await compute()
+        await self._call(self.backend.set, key, value, self.ttl)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "evictions": self.backend.evictions,
+            "entries": len(self.backend),
+            "inflight": len(self._inflight),
+            "backend": type(self.backend).__name__,
+        }
+
+    def close(self) -> None:
+        self.backend.close()
+
+
+_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """Return the process-wide response cache, created from env config on first use."""
+    global _cache
+    if _cache is None:
+        max_entries = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "2000"))
+        if os.getenv("RESPONSE_CACHE_BACKEND", "memory") == "sqlite":
+            backend = SqliteBackend(os.getenv("RESPONSE_CACHE_PATH", "response_cache.sqlite3"), max_entries)
+        else:
+            backend = MemoryBackend(max_entries)
+        _cache = ResponseCache(backend, ttl=float(os.getenv("RESPONSE_CACHE_TTL", "86400")))
+    return _cache
+
+
+def close_response_cache() -> None:
+    global _cache
+    if _cache is not None:
+        _cache.close()
+        _cache = None
@@ -0,0 +1,241 @@
+# backend/utils/search_index.py
+"""
+Full-text search over every parsed CV section (SQLite FTS5).
+
+Each fresh parse is handed to `SearchIndex.index()`, which replaces that CV's
+sections in the index on a single writer thread, so parsing never waits on
+SQLite. Entries live in a plain table keyed by CV hash (the SHA-256 of the
+PDF) and section, mirrored into an external-content FTS5 table by triggers;
+re-parsing a CV, or parsing more of its sections, replaces only the sections
+it returned. `search()` ranks matches with BM25, weighting titles above body
+text, and can be run from any thread. Matches are ranked first and only the
+returned page is joined with its CV and snippeted: doing that for every
+match of a common term costs several times more than the ranking itself.
+
+Off by default: the index keeps the full text of every uploaded CV and
+`/search` returns it to any caller, so only enable it where the API is not
+publicly reachable or sits behind access control.
+
+- SEARCH_INDEX_PATH   SQLite file of the index (default empty: indexing and
+                      `/search` disabled). Workers can share it
+"""
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+MAX_RESULTS = 100
+# BM25 column weights for (title, text): a hit in an entry's title ranks higher
+BM25_WEIGHTS = "4.0, 1.0"
+SNIPPET_TOKENS = 12
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS cvs (cv_hash TEXT PRIMARY KEY, filename TEXT, indexed_at REAL NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS entries "
+    "(id INTEGER PRIMARY KEY, cv_hash TEXT NOT NULL, section TEXT NOT NULL, position INTEGER NOT NULL, "
+    "title TEXT NOT NULL, text TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS entries_cv ON entries (cv_hash, section)",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5("
+    "title, text, content='entries', content_rowid='id', tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS entries_ai AFTER INSERT ON entries BEGIN "
+    "INSERT INTO entries_fts (rowid, title, text) VALUES (new.id, new.title, new.text); END",
+    "CREATE TRIGGER IF NOT EXISTS entries_ad AFTER DELETE ON entries BEGIN "
+    "INSERT INTO entries_fts (entries_fts, rowid, title, text) VALUES ('delete', old.id, old.title, old.text); END",
+)
+
+_RANK_SQL = (
+    f"SELECT f.rowid, bm25(entries_fts, {BM25_WEIGHTS}) AS score FROM entries_fts f{{section_join}} "
+    "WHERE entries_fts MATCH ?{section_filter} ORDER BY score LIMIT ? OFFSET ?"
+)
+_PAGE_SQL = (
+    "SELECT f.rowid, e.cv_hash, c.filename, e.section, e.position, e.title, "
+    f"snippet(entries_fts, 1, '**', '**', '...', {SNIPPET_TOKENS}) "
+    "FROM entries_fts f JOIN entries e ON e.id = f.rowid LEFT JOIN cvs c ON c.cv_hash = e.cv_hash "
+    "WHERE entries_fts MATCH ? AND f.rowid IN ({ids})"
+)
+
+_TERM_RE = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def build_match_query(query: str, match_all: bool = True) -> str:
+    """
+    Turn a user query into an FTS5 expression. Words and "quoted phrases" are
+    matched literally (FTS5 operators in the input have no effect); a trailing
+    `*` makes a word a prefix match. Raises ValueError if nothing is left.
+    """
+    terms = []
+    for phrase, word in _TERM_RE.findall(query):
+        prefix = word.endswith("*")
+        text = (phrase or word.rstrip("*")).strip()
+        if text:
+            terms.append('"' + text.replace('"', '""') + '"' + ("*" if prefix else ""))
+    if not terms:
+        raise ValueError("Search query is empty.")
+    return (" " if match_all else " OR ").join(terms)
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    db = sqlite3.connect(path, check_same_thread=False)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.execute("PRAGMA busy_timeout=5000")
+    return db
+
+
+class SearchIndex:
+    """SQLite FTS5 index of parsed CV sections with one writer thread and per-thread readers."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._writer = _connect(path)
+        with self._writer:
+            for statement in _SCHEMA:
+                self._writer.execute(statement)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="search-index")
+        self._readers = threading.local()
+        self._reader_list: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._stats = {"indexed_cvs": 0, "indexed_entries": 0, "index_errors": 0, "searches": 0}
+
+    def index(self, cv_hash: str, filename: Optional[str], parsed: Dict[str, List[Dict[str, str]]]) -> Future:
+        """Queue replacing the returned sections of a CV; returns the write's future."""
+        with self._lock:
+            self._pending += 1
+        return self._executor.submit(self._write, cv_hash, filename, parsed)
+
+    def _write(self, cv_hash: str, filename: Optional[str], parsed: Dict[str, List[Dict[str, str]]]) -> None:
+        rows = [
+            (cv_hash, section, position, item["title"], item["text"])
+            for section, items in parsed.items()
+            for position, item in enumerate(items)
+        ]
+        try:
+            with self._writer:
+                self._writer.executemany(
+                    "DELETE FROM entries WHERE cv_hash = ? AND section = ?", [(cv_hash, s) for s in parsed]
+                )
+                self._writer.executemany(
+                    "INSERT INTO entries (cv_hash, section, position, title, text) VALUES (?, ?, ?, ?, ?)", rows
+                )
+                # Keep a known filename when a later upload of the same PDF has none
+                self._writer.execute(
+                    "INSERT INTO cvs (cv_hash, filename, indexed_at) VALUES (?, ?, ?) ON CONFLICT (cv_hash) DO UPDATE "
+                    "SET filename = coalesce(excluded.filename, cvs.filename), indexed_at = excluded.indexed_at",
+                    (cv_hash, filename, time.time()),
+                )
+            with self._lock:
+                self._stats["indexed_cvs"] += 1
+                self._stats["indexed_entries"] += len(rows)
+        except sqlite3.Error as e:
+            logger.error(f"Search indexing failed for CV {cv_hash[:12]}: {e}")
+            with self._lock:
+                self._stats["index_errors"] += 1
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def flush(self) -> None:
+        """Block until every queued write is committed."""
+        self._executor.submit(lambda: None).result()
+
+    def _reader(self) -> sqlite3.Connection:
+        db = getattr(self._readers, "db", None)
+        if db is None:
+            db = self._readers.db = _connect(self.path)
+            with self._lock:
+                self._reader_list.append(db)
+        return db
+
+    def search(
+        self,
+        query: str,
+        sections: Optional[Sequence[str]] = None,
+        limit: int = 20,
+        offset: int = 0,
+        match_all: bool = True,
+    ) -> List[Dict[str, Any]]:
+        """
+        Ranked matches for `query` within `sections` (default: all), best first.
+        Raises ValueError for an empty query; `score` is the negated FTS5 BM25 rank, so higher is better.
+        """
+        expression = build_match_query(query, match_all)
+        sql = _RANK_SQL.format(
+            section_join=" JOIN entries e ON e.id = f.rowid" if sections else "",
+            section_filter=f" AND e.section IN ({', '.join('?' * len(sections))})" if sections else "",
+        )
+        db = self._reader()
+        params = (expression, *(sections or ()), max(1, min(limit, MAX_RESULTS)), max(0, offset))
+        # One read transaction, so a re-index committed between the two queries
+        # cannot remove ranked rows before their page is fetched
+        db.execute("BEGIN")
+        try:
+            ranked = db.execute(sql, params).fetchall()
+            page = {
+                row[0]: row[1:]
+                for row in db.execute(
+                    _PAGE_SQL.format(ids=", ".join("?" * len(ranked))), (expression, *(r for r, _ in ranked))
+                )
+            } if ranked else {}
+        finally:
+            db.rollback()
+        with self._lock:
+            self._stats["searches"] += 1
+        if not ranked:
+            return []
+        results = []
+        for rowid, score in ranked:
+            cv_hash, filename, section, position, title, snippet = page[rowid]
+            results.append({
+                "cv_hash": cv_hash,
+                "filename": filename,
+                "section": section,
+                "position": position,
+                "title": title,
+                "snippet": snippet,
+                "score": round(-score, 4) + 0.0,
+            })
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        reader = self._reader()
+        cvs = reader.execute("SELECT count(*) FROM cvs").fetchone()[0]
+        entries = reader.execute("SELECT count(*) FROM entries").fetchone()[0]
+        with self._lock:
+            return {**self._stats, "cvs": cvs, "entries": entries, "pending_writes": self._pending, "path": self.path}
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        self._writer.close()
+        with self._lock:
+            for db in self._reader_list:
+                db.close()
+            self._reader_list.clear()
+
+
+_index: Optional[SearchIndex] = None
+
+
+def get_search_index() -> Optional[SearchIndex]:
+    """Return the process-wide index, or None when SEARCH_INDEX_PATH is unset or empty."""
+    global _index
+    if _index is None:
+        path = os.getenv("SEARCH_INDEX_PATH", "")
+        if not path:
+            return None
+        _index = SearchIndex(path)
+    return _index
+
+
+def close_search_index() -> None:
+    global _index
+    if _index is not None:
+        _index.close()
+        _index = None
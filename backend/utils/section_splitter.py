@@ -0,0 +1,263 @@
+# backend/utils/section_splitter.py
+"""
+Single-pass CV section splitter.
+
+The old parsers ran one `re.search(r'HEADER\n(.*?)(?=\n[A-Z\s]{5,}\n|\Z)', ...)`
+per section. Each search rescans the whole text, and the lazy body plus
+lookahead backtracks heavily on long CVs. Here every header line is found in
+one linear `finditer` pass, and sections are sliced out by offset.
+
+A line counts as a header when it is short and header-like (letters, spaces,
+`&`, `/`, `-`, optional trailing colon):
+
+- if one of its words is in the header vocabulary (case-insensitive) and the
+  line is upper-case, or Title Case with the keyword last, it opens that
+  section ("PROJECTS", "Work Experience", "Positions of Responsibility")
+- otherwise, if it is upper-case and at least 5 characters long, it only closes
+  the previous section ("ACHIEVEMENTS", "CERTIFICATIONS")
+
+`IncrementalSplitter` runs the same scan over text that arrives page by page
+and reports when every requested section has been closed by a later header,
+so PDF extraction can stop before reading the remaining pages.
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Section name -> header words that open it. Extend to recognise new headers.
+DEFAULT_HEADERS: Dict[str, Tuple[str, ...]] = {
+    "projects": ("project", "projects"),
+    "experience": ("experience",),
+    "education": ("education",),
+    "skills": ("skill", "skills"),
+    "extracurricular": ("extracurricular", "extra-curricular", "activities", "position", "positions"),
+}
+
+# Candidate header line: short run of letters/spaces/&/- with an optional colon
+_HEADER_LINE_RE = re.compile(r"^[ \t]*([A-Za-z][A-Za-z &/\-]{3,60}):?[ \t]*$", re.MULTILINE)
+_WORD_SPLIT_RE = re.compile(r"[\s&/]+")
+# Connectors allowed in lower case inside a Title Case header ("Positions of Responsibility")
+_CONNECTORS = frozenset({"of", "and", "the", "in", "&"})
+
+# A new item starts at a "Title | tech stack" line, or at a "Role at Company" line after a blank line
+_ITEM_START_RE = re.compile(r"\n(?=[A-Z][a-zA-Z \t]*\||\n[A-Z][a-zA-Z \t]* at\b)")
+
+
+def _is_title_case(words: Sequence[str]) -> bool:
+    return all(w[:1].isupper() or w in _CONNECTORS for w in words)
+
+
+def split_items(content: str) -> List[Dict[str, str]]:
+    """Split a section body into {title, text} entries."""
+    items = _ITEM_START_RE.split(content)
+    if len(items) <= 1 and "\n\n" in content:
+        items = [p.strip() for p in content.split("\n\n") if p.strip()]
+
+    entries = []
+    for item in items:
+        item = item.strip()
+        if not item:
+            continue
+        first_line = item.split("\n", 1)[0].strip()
+        title = first_line.split("|")[0].strip() if "|" in first_line else first_line
+        entries.append({"title": title, "text": item})
+    return entries
+
+
+class SectionSplitter:
+    """
+    Splits CV text into sections using a configurable header vocabulary.
+
+    Build once and reuse; all patterns are precompiled.
+    """
+
+    def __init__(self, headers: Optional[Dict[str, Iterable[str]]] = None):
+        headers = DEFAULT_HEADERS if headers is None else headers
+        self.section_names: List[str] = list(headers)
+        self._keyword_to_section: Dict[str, str] = {}
+        for section, keywords in headers.items():
+            for keyword in keywords:
+                self._keyword_to_section.setdefault(keyword.lower(), section)
+
+    def classify(self, line: str) -> Tuple[bool, Optional[str]]:
+        """
+        Classify a candidate header line.
+
+        Returns (is_boundary, section_name); section_name is None for generic
+        upper-case headers that only close the previous section.
+        """
+        words = [w for w in _WORD_SPLIT_RE.split(line.strip()) if w]
+        if not words:
+            return False, None
+        upper = line.isupper()
+        title = not upper and len(words) <= 4 and _is_title_case(words)
+        if upper or title:
+            for i, word in enumerate(words):
+                section = self._keyword_to_section.get(word.lower())
+                if section is None:
+                    continue
+                # Title Case lines only count when the keyword ends the header
+                # ("Work Experience", "Positions of Responsibility"), so an item
+                # titled "Project Management Tool" does not open a section.
+                if upper or i == len(words) - 1 or words[i + 1] in _CONNECTORS:
+                    return True, section
+        return upper and len(line.strip()) >= 5, None
+
+    def classify_heading(self, line: str) -> Tuple[bool, Optional[str]]:
+        """
+        Classify a line already known to be set as a heading (e.g. by font size).
+
+        Any header-shaped line is a boundary, whatever its capitalisation; it
+        opens the section named by its first keyword, if any.
+        """
+        match = _HEADER_LINE_RE.match(line)
+        if match is None:
+            return False, None
+        for word in _WORD_SPLIT_RE.split(match.group(1)):
+            section = self._keyword_to_section.get(word.lower())
+            if section is not None:
+                return True, section
+        return True, None
+
+    def find_headers(self, text: str) -> List[Tuple[int, int, Optional[str]]]:
+        """
+        One linear scan for header lines.
+
+        Returns (line_start, body_start, section_name) for every boundary, in order.
+        """
+        headers = []
+        for match in _HEADER_LINE_RE.finditer(text):
+            is_boundary, section = self.classify(match.group(1))
+            if is_boundary:
+                headers.append((match.start(), match.end(), section))
+        return headers
+
+    def find_headers_in(self, text: str, pos: int, endpos: int) -> List[Tuple[int, int, Optional[str]]]:
+        """`find_headers` restricted to text[pos:endpos]; pos must start a line."""
+        headers = []
+        for match in _HEADER_LINE_RE.finditer(text, pos, endpos):
+            is_boundary, section = self.classify(match.group(1))
+            if is_boundary:
+                headers.append((match.start(), match.end(), section))
+        return headers
+
+    def split(self, cv_text: str, sections: Optional[Sequence[str]] = None) -> Dict[str, List[Dict[str, str]]]:
+        """
+        Return section name -> list of {title, text} entries.
+
+        `sections` limits the output to those names; headers of the other
+        sections still close the previous section. Every requested section is
+        present (empty if missing). If a header occurs more than once, the first
+        occurrence wins.
+        """
+        text = cv_text.replace("\r\n", "\n")
+        return self._assemble(text, self.find_headers(text), sections)
+
+    def incremental(self, sections: Optional[Sequence[str]] = None) -> "IncrementalSplitter":
+        return IncrementalSplitter(self, sections)
+
+    def _assemble(
+        self, text: str, headers: List[Tuple[int, int, Optional[str]]], sections: Optional[Sequence[str]]
+    ) -> Dict[str, List[Dict[str, str]]]:
+        wanted = self.section_names if sections is None else list(sections)
+        result: Dict[str, List[Dict[str, str]]] = {name: [] for name in wanted}
+        seen = set()
+        for i, (_, body_start, section) in enumerate(headers):
+            if section is None or section in seen or section not in result:
+                continue
+            seen.add(section)
+            body_end = headers[i + 1][0] if i + 1 < len(headers) else len(text)
+            result[section] = split_items(text[body_start:body_end].strip())
+        return result
+
+
+class IncrementalSplitter:
+    """
+    Section splitter fed one page of text at a time.
+
+    Only complete lines are scanned, so a header is classified exactly as in a
+    full-document `split`. `done` becomes true once the first occurrence of
+    every requested section is followed by another header: nothing after that
+    point can change the result, and `text` already holds everything `split`
+    needs to produce the same output as on the whole document.
+    """
+
+    def __init__(self, splitter: SectionSplitter, sections: Optional[Sequence[str]] = None):
+        self.splitter = splitter
+        self.sections = None if sections is None else list(sections)
+        self._pending = set(splitter.section_names if sections is None else sections)
+        self._parts: List[str] = []
+        self._text = ""
+        self._scanned = 0
+        self._carry = ""
+        self._open: Optional[str] = None
+        self._seen = set()
+        self.headers: List[Tuple[int, int, Optional[str]]] = []
+
+    @property
+    def done(self) -> bool:
+        return not self._pending
+
+    @property
+    def text(self) -> str:
+        """Normalized text fed so far."""
+        return self._text + self._carry
+
+    def feed(self, chunk: str) -> bool:
+        """Add the next page of text; returns `done`."""
+        chunk = self._carry + chunk
+        # Hold back a trailing "\r" in case the next page starts with "\n"
+        self._carry = "\r" if chunk.endswith("\r") else ""
+        if self._carry:
+            chunk = chunk[:-1]
+        self._text += chunk.replace("\r\n", "\n")
+        last_newline = self._text.rfind("\n")
+        if last_newline >= self._scanned:
+            self._scan(last_newline)
+            self._scanned = last_newline + 1
+        return self.done
+
+    def _scan(self, endpos: int) -> None:
+        for header in self.splitter.find_headers_in(self._text, self._scanned, endpos):
+            self.headers.append(header)
+            # Any boundary closes the section opened by the previous header
+            if self._open is not None:
+                self._pending.discard(self._open)
+                self._open = None
+            section = header[2]
+            if section is not None and section not in self._seen:
+                self._seen.add(section)
+                self._open = section
+
+    def result(self) -> Dict[str, List[Dict[str, str]]]:
+        """Split of everything fed so far; equals `split` on the full text once `done`."""
+        text = self.text
+        if len(text) > self._scanned:
+            self._scan(len(text))
+            self._scanned = len(text)
+        return self.splitter._assemble(text, self.headers, self.sections)
+
+
+default_splitter = SectionSplitter()
+
+
+def split_sections(cv_text: str, sections: Optional[Sequence[str]] = None) -> Dict[str, List[Dict[str, str]]]:
+    """Split CV text with the default header vocabulary."""
+    return default_splitter.split(cv_text, sections)
+
+
+def parse_sections_param(value: Optional[str], allowed: Optional[Sequence[str]] = None) -> Optional[Tuple[str, ...]]:
+    """
+    Parse a comma-separated `sections=` query value.
+
+    Returns None when unset; raises ValueError for names outside `allowed`
+    (the default vocabulary by default).
+    """
+    if value is None or not value.strip():
+        return None
+    allowed = default_splitter.section_names if allowed is None else allowed
+    names = tuple(dict.fromkeys(name.strip().lower() for name in value.split(",") if name.strip()))
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown section(s): {', '.join(unknown)}. Choose from: {', '.join(allowed)}.")
+    return names
@@ -0,0 +1,209 @@
+# backend/utils/spacy_parser.py
+"""
+spaCy section parser (`PARSER_STRATEGY=spacy` or `/parse-cv?mode=spacy`).
+
+Finds the projects and experience headers with a rule-based Matcher over the
+tokenized text. spaCy and its model are imported on the first parse (or by
+`warm_up()` at startup when spaCy is the default strategy), so apps using
+another strategy never load them; if either is missing, that parse raises
+SpacyUnavailable.
+
+A /parse-cv/batch in spacy mode tokenizes its PDFs through `SpacyPipeGroup`,
+in nlp.pipe batches rather than one `make_doc` per CV.
+
+- SPACY_MODEL   pipeline to tokenize with (default en_core_web_sm; "blank:en" needs no download)
+"""
+
+import asyncio
+import os
+import re
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Set, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+# Matching section headers only needs tokens, so every trained pipe is excluded
+# and their weights are never loaded. Override the model with SPACY_MODEL.
+SPACY_MODEL = os.getenv("SPACY_MODEL", "en_core_web_sm")
+UNUSED_PIPES = ["tok2vec", "tagger", "morphologizer", "parser", "senter", "attribute_ruler", "lemmatizer", "ner"]
+
+# Bump whenever parse_cv_with_spacy output changes so cached parses are invalidated
+PARSER_VERSION = "spacy-1"
+
+# Define patterns for different ways people write section headers
+HEADER_PATTERNS = {
+    "PROJECTS": [
+        [{"LOWER": "projects"}],
+        [{"LOWER": "personal"}, {"LOWER": "projects"}],
+        [{"LOWER": "publications"}]
+    ],
+    "EXPERIENCE": [
+        [{"LOWER": "experience"}],
+        [{"LOWER": "work"}, {"LOWER": "experience"}],
+        [{"LOWER": "employment"}]
+    ],
+}
+
+_nlp = None
+_matcher = None
+
+class SpacyUnavailable(RuntimeError):
+    """spaCy, or the SPACY_MODEL pipeline, is not installed."""
+
+def get_nlp():
+    """Load the spaCy pipeline on first use rather than at import time."""
+    global _nlp
+    if _nlp is None:
+        try:
+            import spacy
+            _nlp = spacy.load(SPACY_MODEL, exclude=UNUSED_PIPES)
+        except (ImportError, OSError) as e:
+            raise SpacyUnavailable(
+                f"spaCy model '{SPACY_MODEL}' could not be loaded. Install it with "
+                f"`python -m spacy download {SPACY_MODEL}`, or set SPACY_MODEL=blank:en."
+            ) from e
+    return _nlp
+
+def get_matcher():
+    """Build the header Matcher once and reuse it for every CV."""
+    global _matcher
+    if _matcher is None:
+        from spacy.matcher import Matcher
+        matcher = Matcher(get_nlp().vocab)
+        for label, patterns in HEADER_PATTERNS.items():
+            matcher.add(label, patterns)
+        _matcher = matcher
+    return _matcher
+
+def warm_up() -> None:
+    """Load the model and Matcher eagerly, e.g. from an app startup hook."""
+    get_matcher()
+
+def _sections_from_doc(doc) -> Dict[str, List[Dict[str, str]]]:
+    nlp = get_nlp()
+    matches = get_matcher()(doc)
+    
+    # Sort matches by their start position in the document
+    matches.sort(key=lambda x: x[1])
+
+    parsed_sections = {"projects": [], "experience": []}
+    
+    for i, match in enumerate(matches):
+        match_id, start_token, end_token = match
+        section_name_str = nlp.vocab.strings[match_id]
+        
+        # Determine the span of the section's content
+        section_start = end_token
+        section_end = len(doc)
+        if i + 1 < len(matches):
+            next_match_start = matches[i+1][1]
+            section_end = next_match_start
+            
+        section_content = doc[section_start:section_end].text.strip()
+        
+        # Now, split the content of this section into individual items
+        items_text = re.split(r'\n(?=[A-Z][a-zA-Z\s]+\s*\||\n[A-Z][a-zA-Z\s]+ at|\n\n)', section_content)
+        
+        for item_text in items_text:
+            if not item_text.strip():
+                continue
+            
+            first_line = item_text.split('\n')[0].strip()
+            title = first_line.split('|')[0].strip() if '|' in first_line else first_line
+            
+            if section_name_str == "PROJECTS":
+                parsed_sections["projects"].append({"title": title, "text": item_text.strip()})
+            elif section_name_str == "EXPERIENCE":
+                parsed_sections["experience"].append({"title": title, "text": item_text.strip()})
+
+    return parsed_sections
+
+def parse_cv_with_spacy(cv_text: str) -> Dict[str, List[Dict[str, str]]]:
+    """
+    Parses CV text into structured sections using spaCy's rule-based Matcher.
+    This is much more reliable than complex regex for finding section headers.
+    """
+    # Tokenizer only: the Matcher works on LOWER, which needs no trained pipes
+    doc = get_nlp().make_doc(cv_text.replace('\r\n', '\n'))
+    return _sections_from_doc(doc)
+
+def parse_cvs_with_spacy(cv_texts: Sequence[str], batch_size: int = 32) -> List[Dict[str, List[Dict[str, str]]]]:
+    """
+    Batch variant of parse_cv_with_spacy for many CVs, using nlp.pipe.
+    """
+    texts = (text.replace('\r\n', '\n') for text in cv_texts)
+    return [_sections_from_doc(doc) for doc in get_nlp().pipe(texts, batch_size=batch_size)]
+
+class SpacyPipeGroup:
+    """
+    nlp.pipe batching for one /parse-cv/batch request.
+
+    Each PDF joins the group while it is parsed (`with group.member() as m`) and
+    then either hands its text to `await m.parse(text)` or leaves without one
+    (cache hit, extraction error). Once no member is still extracting, the
+    texts handed in are tokenized in one nlp.pipe call off the event loop.
+    Under the batch's concurrency limit that is one call per wave of PDFs.
+    """
+
+    def __init__(self, batch_size: int = 32):
+        self.batch_size = batch_size
+        self._extracting = 0
+        self._pending: List[Tuple[str, "asyncio.Future"]] = []
+        self._runs: Set["asyncio.Task"] = set()
+        self._stats = {"parses": 0, "pipe_calls": 0}
+
+    @contextmanager
+    def member(self) -> Iterator["_PipeMember"]:
+        self._extracting += 1
+        member = _PipeMember(self)
+        try:
+            yield member
+        finally:
+            member.leave()
+
+    def _maybe_run(self) -> None:
+        if self._extracting or not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        self._runs.add(task)
+        task.add_done_callback(self._runs.discard)
+
+    async def _run(self, batch: List[Tuple[str, "asyncio.Future"]]) -> None:
+        # Members that went away (client disconnect) are not parsed
+        batch = [(text, future) for text, future in batch if not future.done()]
+        if not batch:
+            return
+        self._stats["parses"] += len(batch)
+        self._stats["pipe_calls"] += 1
+        try:
+            results = await run_in_threadpool(parse_cvs_with_spacy, [text for text, _ in batch], self.batch_size)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self._stats)
+
+class _PipeMember:
+    def __init__(self, group: SpacyPipeGroup):
+        self._group = group
+        self._left = False
+
+    async def parse(self, cv_text: str) -> Dict[str, List[Dict[str, str]]]:
+        """Sections of `cv_text`, tokenized together with the rest of the group."""
+        future = asyncio.get_running_loop().create_future()
+        self._group._pending.append((cv_text, future))
+        self.leave()
+        return await future
+
+    def leave(self) -> None:
+        if not self._left:
+            self._left = True
+            self._group._extracting -= 1
+            self._group._maybe_run()
@@ -0,0 +1,233 @@
+# backend/utils/uploads.py
+"""
+Bounded, streamed handling of uploaded PDFs.
+
+`await file.read()` used to copy every upload into one `bytes` object, so
+resident memory grew with the number of in-flight uploads. Uploads are now
+copied in fixed-size chunks: small files stay in memory, larger ones are
+spooled to a temp file that PyMuPDF opens from disk (pages are read on demand,
+the parent process never holds the whole document). The sha256 used as the
+parse-cache key is computed while copying.
+
+- PDF_MAX_UPLOAD_BYTES      largest accepted PDF; bigger uploads get 413 (default 20 MiB)
+- UPLOAD_SPOOL_THRESHOLD    uploads above this many bytes are spooled to disk (default 1 MiB)
+- UPLOAD_SPOOL_DIR          directory for spooled uploads (default: system temp dir)
+
+`UploadLimitMiddleware` enforces the size limit on the raw request body, so
+an oversized upload is cut off with 413 as soon as the limit is crossed instead
+of being received and spooled in full first.
+"""
+
+import hashlib
+import os
+import tempfile
+from typing import BinaryIO, Dict, Optional, Union
+
+from fastapi import HTTPException, UploadFile
+from starlette.concurrency import run_in_threadpool
+
+CHUNK_SIZE = 1024 * 1024
+# Room for multipart boundaries and part headers on top of the file itself
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+def max_upload_bytes() -> int:
+    return int(os.getenv("PDF_MAX_UPLOAD_BYTES", str(20 * 1024 * 1024)))
+
+
+def _too_large(limit: int) -> HTTPException:
+    return HTTPException(status_code=413, detail=f"PDF exceeds the {limit} byte upload limit.")
+
+
+class SpooledPdf:
+    """
+    An uploaded PDF held either in memory (`data`) or in a temp file (`path`).
+
+    Use as a context manager, or call `close()`, to remove the temp file.
+    `filename` is the client's name for the file, when it sent one.
+    """
+
+    def __init__(self, data: Optional[bytes], path: Optional[str], size: int, sha256: str, filename: Optional[str] = None):
+        self.data = data
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+        self.filename = filename
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "SpooledPdf":
+        return cls(data, None, len(data), hashlib.sha256(data).hexdigest())
+
+    @property
+    def source(self) -> Union[bytes, str]:
+        """What to hand to the PDF extractor: the bytes, or the temp file path."""
+        return self.data if self.data is not None else self.path
+
+    def close(self) -> None:
+        if self.path is not None:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+            self.path = None
+        self.data = None
+
+    def __enter__(self) -> "SpooledPdf":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class _SpoolWriter:
+    """Accumulates chunks, hashing them and rolling over to disk past `threshold`."""
+
+    def __init__(self, max_bytes: int, threshold: int):
+        self.max_bytes = max_bytes
+        self.threshold = threshold
+        self.size = 0
+        self._hash = hashlib.sha256()
+        self._buffer = bytearray()
+        self._file: Optional[BinaryIO] = None
+
+    def write(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            self.discard()
+            raise _too_large(self.max_bytes)
+        self._hash.update(chunk)
+        if self._file is None and self.size > self.threshold:
+            self._file = tempfile.NamedTemporaryFile(
+                prefix="upload-", suffix=".pdf", dir=os.getenv("UPLOAD_SPOOL_DIR") or None, delete=False
+            )
+            self._file.write(self._buffer)
+            self._buffer = bytearray()
+        if self._file is not None:
+            self._file.write(chunk)
+        else:
+            self._buffer += chunk
+
+    def finish(self) -> SpooledPdf:
+        if self._file is None:
+            return SpooledPdf(bytes(self._buffer), None, self.size, self._hash.hexdigest())
+        self._file.close()
+        return SpooledPdf(None, self._file.name, self.size, self._hash.hexdigest())
+
+    def discard(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            os.unlink(self._file.name)
+            self._file = None
+        self._buffer = bytearray()
+
+
+async def spool_upload(file: UploadFile, max_bytes: Optional[int] = None, threshold: Optional[int] = None) -> SpooledPdf:
+    """
+    Copy an UploadFile in CHUNK_SIZE pieces into a SpooledPdf.
+
+    Raises 413 before reading anything if the multipart part declares a size
+    over the limit, and otherwise as soon as the running total exceeds it.
+    """
+    max_bytes = max_bytes or max_upload_bytes()
+    if threshold is None:
+        threshold = int(os.getenv("UPLOAD_SPOOL_THRESHOLD", str(CHUNK_SIZE)))
+    if file.size is not None and file.size > max_bytes:
+        raise _too_large(max_bytes)
+
+    writer = _SpoolWriter(max_bytes, threshold)
+    try:
+        while chunk := await file.read(CHUNK_SIZE):
+            await run_in_threadpool(writer.write, chunk)
+    except BaseException:
+        writer.discard()
+        raise
+    upload = writer.finish()
+    upload.filename = file.filename
+    return upload
+
+
+def spool_stream(stream: BinaryIO, max_bytes: int, threshold: Optional[int] = None) -> SpooledPdf:
+    """Blocking variant of `spool_upload` for file-like sources such as zip members."""
+    if threshold is None:
+        threshold = int(os.getenv("UPLOAD_SPOOL_THRESHOLD", str(CHUNK_SIZE)))
+    writer = _SpoolWriter(max_bytes, threshold)
+    try:
+        while chunk := stream.read(CHUNK_SIZE):
+            writer.write(chunk)
+    except BaseException:
+        writer.discard()
+        raise
+    return writer.finish()
+
+
+class UploadLimitMiddleware:
+    """
+    Rejects request bodies larger than a per-path upload limit with 413.
+
+    `limits` are the configured file byte limits; bodies get MULTIPART_OVERHEAD
+    on top for the multipart framing, and the 413 reports the configured limit.
+    A declared Content-Length over the cap is refused before the body is read;
+    otherwise the body is counted as it streams in and the request is cut off
+    once it crosses the cap.
+    """
+
+    def __init__(self, app, limits: Dict[str, int]):
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope, receive, send):
+        upload_limit = self.limits.get(scope.get("path")) if scope["type"] == "http" else None
+        if upload_limit is None:
+            await self.app(scope, receive, send)
+            return
+        limit = upload_limit + MULTIPART_OVERHEAD
+
+        headers = dict(scope.get("headers") or [])
+        content_length = headers.get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > limit:
+            await self._reject(send, upload_limit)
+            return
+
+        received = 0
+        exceeded = False
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received, exceeded
+            if exceeded:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Looks like a disconnect to the form parser, which stops reading
+                    exceeded = True
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message):
+            nonlocal response_started
+            if exceeded and not response_started:
+                # Drop the app's error response for the aborted body; 413 is sent below
+                return
+            response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not exceeded or response_started:
+                raise
+        if exceeded and not response_started:
+            await self._reject(send, upload_limit)
+
+    @staticmethod
+    async def _reject(send, limit: int) -> None:
+        body = ('{"detail":"Upload exceeds the %d byte limit."}' % limit).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()),
+                        (b"connection", b"close")],
+        })
+        await send({"type": "http.response.body", "body": body})
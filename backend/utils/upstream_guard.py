@@ -0,0 +1,339 @@
+# backend/utils/upstream_guard.py
+"""
+Admission control for Gemini calls: adaptive rate limit, circuit breaker and deadlines.
+
+Every upstream attempt made by `GeminiClient` goes through an `UpstreamGuard`:
+
+- `AdaptiveRateLimiter` is a token bucket whose rate follows the upstream
+  (AIMD). A 429, or a success slower than GEMINI_LATENCY_TARGET, cuts the rate;
+  fast successes raise it back towards GEMINI_RATE_LIMIT. It also tracks an
+  average attempt latency, used to shed calls that cannot finish in time.
+- `CircuitBreaker` opens after GEMINI_BREAKER_THRESHOLD consecutive failed
+  attempts (transport errors, timeouts, 429 and 5xx; a timeout is not counted
+  when a request deadline shorter than GEMINI_LATENCY_TARGET cut the attempt
+  off). While open, calls fail at once; after GEMINI_BREAKER_COOLDOWN seconds
+  one probe is let through and its outcome closes or re-opens the breaker.
+- Deadlines: `DeadlineMiddleware` gives each AI request a deadline of
+  GEMINI_DEADLINE seconds, shortened by an `X-Request-Timeout` header. Gemini
+  calls made while handling the request (including coalesced cache fills) cap
+  their timeouts and retry backoff at the time left, and are shed before
+  waiting when they could not finish anyway.
+
+Calls that are refused raise `UpstreamUnavailable`, which carries a
+Retry-After hint; endpoints answer it with 503 or a degraded answer. State is
+per worker process.
+
+- GEMINI_RATE_LIMIT          max upstream attempts per second (default 50)
+- GEMINI_RATE_MIN            floor the adaptive rate never drops below (default 0.5)
+- GEMINI_RATE_BURST          token bucket size (default 20)
+- GEMINI_LATENCY_TARGET      attempts slower than this many seconds cut the rate (default 10)
+- GEMINI_BREAKER_THRESHOLD   consecutive failed attempts that open the breaker (default 5)
+- GEMINI_BREAKER_COOLDOWN    seconds the breaker stays open before a probe (default 30)
+- GEMINI_DEADLINE            default deadline of an AI request in seconds (default 30)
+"""
+
+import asyncio
+import contextvars
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Optional
+
+from starlette.datastructures import Headers
+
+from utils.metrics import UPSTREAM_BREAKER_STATE, UPSTREAM_RATE_LIMIT, UPSTREAM_SHED
+
+DEADLINE_HEADER = "x-request-timeout"
+
+# Absolute time.monotonic() by which the current request must be answered
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("upstream_deadline", default=None)
+
+
+class UpstreamUnavailable(Exception):
+    """A Gemini call was refused before reaching the upstream."""
+
+    def __init__(self, reason: str, retry_after: float = 1.0):
+        super().__init__(f"Gemini call refused: {reason}")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def deadline_remaining() -> Optional[float]:
+    """Seconds left before the current request's deadline, or None without one."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+@contextmanager
+def request_deadline(seconds: float):
+    """Run the enclosed block with a deadline `seconds` from now (never extends an outer one)."""
+    deadline = time.monotonic() + seconds
+    outer = _deadline.get()
+    token = _deadline.set(deadline if outer is None else min(outer, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def parse_timeout_header(value: Optional[str]) -> Optional[float]:
+    try:
+        seconds = float(value) if value else None
+    except ValueError:
+        return None
+    return seconds if seconds is not None and seconds > 0 else None
+
+
+class DeadlineMiddleware:
+    """
+    Sets the upstream deadline for requests to `paths`: GEMINI_DEADLINE seconds,
+    or the client's `X-Request-Timeout` when that is shorter.
+    """
+
+    def __init__(self, app, paths: Iterable[str], default_seconds: Optional[float] = None):
+        self.app = app
+        self.paths = frozenset(paths)
+        if default_seconds is None:
+            default_seconds = float(os.getenv("GEMINI_DEADLINE", "30"))
+        self.default_seconds = default_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("path") not in self.paths:
+            await self.app(scope, receive, send)
+            return
+        requested = parse_timeout_header(Headers(scope=scope).get(DEADLINE_HEADER))
+        seconds = self.default_seconds if requested is None else min(requested, self.default_seconds)
+        with request_deadline(seconds):
+            await self.app(scope, receive, send)
+
+
+class AdaptiveRateLimiter:
+    """Token bucket with an AIMD rate driven by 429s and attempt latency."""
+
+    # Rate cuts are applied at most this often, so one burst of 429s from
+    # concurrent calls counts as a single congestion signal
+    DECREASE_INTERVAL = 1.0
+
+    def __init__(
+        self,
+        rate: float = 50.0,
+        min_rate: float = 0.5,
+        burst: float = 20.0,
+        latency_target: float = 10.0,
+    ):
+        self.max_rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.latency_target = latency_target
+        self.latency_ewma: Optional[float] = None
+        self.throttled = 0
+        self.shed = 0
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._last_decrease = 0.0
+        UPSTREAM_RATE_LIMIT.set(self.rate)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, remaining: Optional[float] = None) -> None:
+        """
+        Take a token, waiting for it if the bucket is empty. Raises
+        UpstreamUnavailable if the wait plus a typical attempt would overrun
+        `remaining` seconds.
+        """
+        self._refill()
+        self._tokens -= 1
+        if self._tokens >= 0:
+            return
+        # The token is reserved: later callers queue behind this one
+        wait = -self._tokens / self.rate
+        if remaining is not None and wait + (self.latency_ewma or 0.0) > remaining:
+            self._tokens += 1
+            self.shed += 1
+            UPSTREAM_SHED.labels("rate_limited").inc()
+            raise UpstreamUnavailable("rate_limited", retry_after=wait)
+        await asyncio.sleep(wait)
+
+    def _decrease(self, factor: float) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease < self.DECREASE_INTERVAL:
+            return
+        self._last_decrease = now
+        self._refill()
+        self.rate = max(self.min_rate, self.rate * factor)
+        UPSTREAM_RATE_LIMIT.set(self.rate)
+
+    def on_throttled(self) -> None:
+        """The upstream answered 429: halve the rate."""
+        self.throttled += 1
+        self._decrease(0.5)
+
+    def on_success(self, seconds: float) -> None:
+        self.latency_ewma = seconds if self.latency_ewma is None else 0.8 * self.latency_ewma + 0.2 * seconds
+        if seconds > self.latency_target:
+            self._decrease(0.9)
+        elif self.rate < self.max_rate:
+            self._refill()
+            # Recover to the full rate over ~50 fast successes
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 50)
+            UPSTREAM_RATE_LIMIT.set(self.rate)
+
+    def status(self) -> Dict[str, Any]:
+        self._refill()
+        return {
+            "rate": round(self.rate, 3),
+            "max_rate": self.max_rate,
+            "tokens": round(self._tokens, 3),
+            "burst": self.burst,
+            "latency_ewma_s": None if self.latency_ewma is None else round(self.latency_ewma, 3),
+            "throttled": self.throttled,
+            "shed": self.shed,
+        }
+
+
+class CircuitBreaker:
+    """Closed -> open after consecutive failures -> half-open probe after a cooldown."""
+
+    CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+    _GAUGE = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(self, failure_threshold: int = 5, cooldown: float = 30.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.times_opened = 0
+        self.rejected = 0
+        self._probe_inflight = False
+        UPSTREAM_BREAKER_STATE.set(0)
+
+    def _set_state(self, state: str) -> None:
+        self.state = state
+        UPSTREAM_BREAKER_STATE.set(self._GAUGE[state])
+
+    def retry_after(self) -> float:
+        if self.state != self.OPEN or self.opened_at is None:
+            return 1.0
+        return max(1.0, self.opened_at + self.cooldown - time.monotonic())
+
+    def check(self) -> None:
+        """Raise UpstreamUnavailable if a call would be refused right now."""
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+            self._set_state(self.HALF_OPEN)
+        if self.state == self.OPEN or (self.state == self.HALF_OPEN and self._probe_inflight):
+            self.rejected += 1
+            UPSTREAM_SHED.labels("circuit_open").inc()
+            raise UpstreamUnavailable("circuit_open", retry_after=self.retry_after())
+
+    @contextmanager
+    def attempt(self):
+        """Admit one upstream attempt; in half-open state only one probe at a time."""
+        self.check()
+        probe = self.state == self.HALF_OPEN
+        self._probe_inflight = self._probe_inflight or probe
+        try:
+            yield
+        finally:
+            if probe:
+                self._probe_inflight = False
+
+    def record_success(self) -> None:
+        self.consecutive_failures = 0
+        if self.state != self.CLOSED:
+            self._set_state(self.CLOSED)
+            self.opened_at = None
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or (
+            self.state == self.CLOSED and self.consecutive_failures >= self.failure_threshold
+        ):
+            self._set_state(self.OPEN)
+            self.opened_at = time.monotonic()
+            self.times_opened += 1
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "failure_threshold": self.failure_threshold,
+            "cooldown_s": self.cooldown,
+            "retry_after_s": round(self.retry_after(), 3) if self.state == self.OPEN else None,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
+
+
+class UpstreamGuard:
+    """Deadline check, breaker and rate limiter applied before each upstream attempt."""
+
+    def __init__(self, limiter: Optional[AdaptiveRateLimiter] = None, breaker: Optional[CircuitBreaker] = None):
+        self.limiter = limiter or AdaptiveRateLimiter()
+        self.breaker = breaker or CircuitBreaker()
+        # Calls refused by the guard itself, by reason ("deadline", "throttled")
+        self.shed: Dict[str, int] = {}
+
+    def check_deadline(self, needed: float = 0.0) -> Optional[float]:
+        """
+        Seconds left for an attempt that should take about `needed` seconds,
+        None without a deadline; raises UpstreamUnavailable if it cannot fit.
+        """
+        remaining = deadline_remaining()
+        if remaining is not None and remaining <= needed:
+            raise self.refuse("deadline")
+        return remaining
+
+    def refuse(self, reason: str, retry_after: float = 1.0) -> UpstreamUnavailable:
+        """Count a refused call and return the exception to raise."""
+        self.shed[reason] = self.shed.get(reason, 0) + 1
+        UPSTREAM_SHED.labels(reason).inc()
+        return UpstreamUnavailable(reason, retry_after=retry_after)
+
+    def fits(self, delay: float) -> bool:
+        """Whether sleeping `delay` seconds before a retry still leaves time for the attempt."""
+        remaining = deadline_remaining()
+        return remaining is None or delay + (self.limiter.latency_ewma or 0.0) < remaining
+
+    async def admit(self) -> None:
+        """Wait for a rate-limit token, failing fast on an open breaker or a hopeless deadline."""
+        self.breaker.check()
+        remaining = self.check_deadline(self.limiter.latency_ewma or 0.0)
+        await self.limiter.acquire(remaining)
+
+    def record(self, status: Optional[int], seconds: float) -> None:
+        """Outcome of one attempt: an HTTP status, or None for a transport error or timeout."""
+        if status == 429:
+            self.limiter.on_throttled()
+        if status is None or status == 429 or status >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+            if status < 400:
+                self.limiter.on_success(seconds)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "breaker": self.breaker.status(),
+            "limiter": self.limiter.status(),
+            "shed": self.shed,
+        }
+
+
+def guard_from_env() -> UpstreamGuard:
+    return UpstreamGuard(
+        AdaptiveRateLimiter(
+            rate=float(os.getenv("GEMINI_RATE_LIMIT", "50")),
+            min_rate=float(os.getenv("GEMINI_RATE_MIN", "0.5")),
+            burst=float(os.getenv("GEMINI_RATE_BURST", "20")),
+            latency_target=float(os.getenv("GEMINI_LATENCY_TARGET", "10")),
+        ),
+        CircuitBreaker(
+            failure_threshold=int(os.getenv("GEMINI_BREAKER_THRESHOLD", "5")),
+            cooldown=float(os.getenv("GEMINI_BREAKER_COOLDOWN", "30")),
+        ),
+    )
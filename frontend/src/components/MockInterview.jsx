@@ -3,17 +3,21 @@
  * Interactive mock interview UI:
  * - Show interviewer questions,
  * - Accept user's typed answer,
- * - Submit to backend /mock-interview,
- * - Show feedback + next question.
+ * - Submit to backend /mock-interview/stream,
+ * - Show the AI response as it streams, then feedback + next question.
  */
 
 import React, { useState, useEffect, useRef } from "react";
+import { mockInterviewStreamApi } from "../services/api";
 
 export default function MockInterview({ section, onBack }) {
   const [history, setHistory] = useState([]);
   const [answer, setAnswer] = useState("");
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState("");
+  const [streamingText, setStreamingText] = useState("");
+  // Server-held transcript; once we have it only the new answer is sent each turn
+  const [sessionId, setSessionId] = useState(null);
 
   const lastTurn = history.length ? history[history.length - 1] : null;
 
@@ -24,37 +28,42 @@ export default function MockInterview({ section, onBack }) {
     }
   }, []);
 
-  const fetchNextQuestion = async (currentHistory) => {
-    isLoading(true);
+  const fetchNextQuestion = async (currentHistory, newAnswer = null) => {
+    setLoading(true);
     setError("");
+    setStreamingText("");
     try {
-      const res = await fetch("/mock-interview", {
-        method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ section, history: currentHistory }),
-      });
-      if (!res.ok) {
-        const text = await res.text();
-        throw new Error(text || "Failed to get mock interview question");
+      const onToken = (token) => setStreamingText((text) => text + token);
+      let data;
+      try {
+        data = await mockInterviewStreamApi(
+          section,
+          sessionId ? [] : currentHistory,
+          onToken,
+          sessionId ? { session_id: sessionId, answer: newAnswer } : {}
+        );
+      } catch (e) {
+        if (!sessionId || e.status !== 404) throw e;
+        // Session expired on the server: resend the full transcript once
+        data = await mockInterviewStreamApi(section, currentHistory, onToken);
       }
-      const data = await res.json();
-      if (data.next_question) {
-        setHistory([...currentHistory, { question: data.next_question, answer: null }]);
-        setAnswer("");
-      } else if (data.feedback && data.next_question) {
-        // This is follow-up response with feedback
-        const newHistory = [...currentHistory];
-        newHistory[newHistory.length - 1].feedback = data.feedback;
-        newHistory.push({ question: data.next_question, answer: null, feedback: null });
-        setHistory(newHistory);
-        setAnswer("");
-      } else {
+      if (data.session_id) setSessionId(data.session_id);
+      if (!data.next_question) {
         throw new Error("Unexpected AI response format.");
       }
+      const newHistory = [...currentHistory];
+      if (data.feedback && newHistory.length) {
+        // Follow-up response: attach feedback to the answered turn
+        newHistory[newHistory.length - 1].feedback = data.feedback;
+      }
+      newHistory.push({ question: data.next_question, answer: null, feedback: null });
+      setHistory(newHistory);
+      setAnswer("");
     } catch (e) {
       setError(e.message);
     } finally {
-      isLoading(false);
+      setStreamingText("");
+      setLoading(false);
     }
   };
 
@@ -62,7 +71,7 @@ export default function MockInterview({ section, onBack }) {
     if (!answer.trim()) return;
     const updatedHistory = [...history];
     updatedHistory[updatedHistory.length - 1].answer = answer.trim();
-    fetchNextQuestion(updatedHistory);
+    fetchNextQuestion(updatedHistory, answer.trim());
   };
 
   return (
@@ -86,6 +95,10 @@ export default function MockInterview({ section, onBack }) {
         </div>
       ))}
 
+      {loading && streamingText && (
+        <p className="mb-4 text-gray-500 italic whitespace-pre-wrap">{streamingText}</p>
+      )}
+
       <textarea
         disabled={loading}
         rows={4}
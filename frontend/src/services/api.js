@@ -42,3 +42,53 @@ export const mockInterviewApi = async (section, history) => {
     }
     return response.json();
 };
+
+/**
+ * Streams the mock interview response over Server-Sent Events.
+ * Tokens are passed to `onToken` as they arrive so the UI can render
+ * progress long before the full response is ready.
+ * @param {object} section - The section object containing title and text.
+ * @param {Array} history - The conversation history (may be empty when resuming a session).
+ * @param {function} onToken - Called with each text chunk from the AI.
+ * @param {object} [session] - { session_id, answer } to continue a server-held session
+ *   without re-uploading the transcript.
+ * @returns {Promise<object>} The final { feedback, next_question, session_id } object.
+ */
+export const mockInterviewStreamApi = async (section, history, onToken, session = {}) => {
+    const response = await fetch(`${API_URL}/mock-interview/stream`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ section, history, ...session }),
+    });
+
+    if (!response.ok) {
+        const errorData = await response.json();
+        const error = new Error(errorData.detail || 'Failed to get interview response.');
+        error.status = response.status;
+        throw error;
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    for (;;) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        // SSE frames are separated by a blank line
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const frame = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+            const event = frame.match(/^event: (.*)$/m)?.[1];
+            const data = frame.match(/^data: (.*)$/m)?.[1];
+            if (!event || data === undefined) continue;
+            const payload = JSON.parse(data);
+            if (event === 'token') onToken?.(payload.text);
+            else if (event === 'result') return payload;
+            else if (event === 'error') throw new Error(payload.detail || 'Failed to get interview response.');
+        }
+    }
+    throw new Error('Interview stream ended unexpectedly.');
+};